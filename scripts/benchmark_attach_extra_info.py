@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#
+# Benchmark of the user stories list query (taiga.projects.userstories.utils.attach_extra_info)
+# with the watchers and points attached with lateral subqueries against the previous
+# implementation (one correlated subquery per attached field). It creates a project with a
+# lot of user stories inside a transaction that is rolled back at the end so it has to be
+# run against a development database, inside the taiga-back git root directory:
+#
+#  $ python scripts/benchmark_attach_extra_info.py --user-stories 5000 --page-size 1000
+
+import os
+import random
+import sys
+import timeit
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+django.setup()
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from taiga.projects.attachments.utils import attach_basic_attachments
+from taiga.projects.history.utils import attach_total_comments_to_queryset
+from taiga.projects.models import Project
+from taiga.projects.notifications.models import Watched
+from taiga.projects.userstories.models import RolePoints, UserStory
+from taiga.projects.userstories.utils import attach_epics, attach_extra_info
+from taiga.projects.votes.utils import attach_is_voter_to_queryset, attach_total_voters_to_queryset
+from taiga.users.models import User
+
+
+def legacy_attach_extra_info(queryset, user):
+    type = ContentType.objects.get_for_model(queryset.model)
+    tbl = queryset.model._meta.db_table
+    queryset = queryset.extra(select={
+        "total_points_attr": """SELECT SUM(projects_points.value)
+                                  FROM userstories_rolepoints
+                            INNER JOIN projects_points ON userstories_rolepoints.points_id = projects_points.id
+                                 WHERE userstories_rolepoints.user_story_id = {tbl}.id""".format(tbl=tbl),
+        "role_points_attr": """SELECT FORMAT('{{%%s}}',
+                                             STRING_AGG(format('"%%s":%%s',
+                                                               TO_JSON(userstories_rolepoints.role_id),
+                                                               TO_JSON(userstories_rolepoints.points_id)), ','))::json
+                                 FROM userstories_rolepoints
+                                WHERE userstories_rolepoints.user_story_id = {tbl}.id""".format(tbl=tbl),
+        "watchers": """SELECT array(SELECT user_id
+                                      FROM notifications_watched
+                                     WHERE notifications_watched.content_type_id = {type_id}
+                                       AND notifications_watched.object_id = {tbl}.id)""".format(type_id=type.id,
+                                                                                                  tbl=tbl),
+        "total_watchers": """SELECT count(*)
+                               FROM notifications_watched
+                              WHERE notifications_watched.content_type_id = {type_id}
+                                AND notifications_watched.object_id = {tbl}.id""".format(type_id=type.id, tbl=tbl),
+        "is_watcher": """SELECT CASE WHEN (SELECT count(*)
+                                             FROM notifications_watched
+                                            WHERE notifications_watched.content_type_id = {type_id}
+                                              AND notifications_watched.object_id = {tbl}.id
+                                              AND notifications_watched.user_id = {user_id}) > 0
+                                     THEN TRUE
+                                     ELSE FALSE
+                                END""".format(type_id=type.id, tbl=tbl, user_id=user.id),
+    })
+    queryset = attach_epics(queryset)
+    queryset = attach_total_voters_to_queryset(queryset)
+    queryset = attach_is_voter_to_queryset(queryset, user)
+    queryset = attach_total_comments_to_queryset(queryset)
+    return queryset
+
+
+def _create_user_stories(project, users, total):
+    user_stories = UserStory.objects.bulk_create([
+        UserStory(project=project, owner=project.owner, subject="User story {}".format(i), ref=i,
+                  status=project.default_us_status)
+        for i in range(total)
+    ], batch_size=5000)
+    user_stories = list(UserStory.objects.filter(project=project))
+
+    roles = list(project.roles.filter(computable=True))
+    points = list(project.points.all())
+    RolePoints.objects.bulk_create([
+        RolePoints(user_story=user_story, role=role, points=random.choice(points))
+        for user_story in user_stories for role in roles
+    ], batch_size=5000)
+
+    type = ContentType.objects.get_for_model(UserStory)
+    Watched.objects.bulk_create([
+        Watched(content_type=type, object_id=user_story.id, user=user, project=project)
+        for user_story in user_stories for user in random.sample(users, random.randint(0, len(users)))
+    ], batch_size=5000)
+
+
+def _run(fn, queryset, user, page_size, repeat):
+    def _stmt():
+        list(fn(queryset, user)[:page_size])
+    return min(timeit.repeat(_stmt, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--user-stories", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--watchers", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    with transaction.atomic():
+        users = [User.objects.create(username="attach-benchmark-{}".format(i),
+                                     email="attach-benchmark-{}@taiga.io".format(i))
+                 for i in range(options.watchers)]
+        project = Project.objects.create(name="Attach benchmark", slug="attach-benchmark",
+                                         description="Attach benchmark", owner=users[0])
+        _create_user_stories(project, users, options.user_stories)
+
+        queryset = UserStory.objects.filter(project=project).order_by("backlog_order", "id")
+        current = list(attach_extra_info(queryset, user=users[0])[:options.page_size])
+        legacy = list(legacy_attach_extra_info(queryset, users[0])[:options.page_size])
+        for attr in ["total_points_attr", "role_points_attr", "total_watchers", "is_watcher"]:
+            assert [getattr(us, attr) for us in current] == [getattr(us, attr) for us in legacy], attr
+        assert [sorted(us.watchers) for us in current] == [sorted(us.watchers) for us in legacy]
+
+        legacy_time = _run(legacy_attach_extra_info, queryset, users[0], options.page_size, options.repeat)
+        current_time = _run(lambda qs, user: attach_extra_info(qs, user=user),
+                            queryset, users[0], options.page_size, options.repeat)
+
+        print("User stories: {}, page size: {}".format(options.user_stories, options.page_size))
+        print("legacy:  {:.2f} ms".format(legacy_time * 1000))
+        print("current: {:.2f} ms".format(current_time * 1000))
+
+        transaction.set_rollback(True)
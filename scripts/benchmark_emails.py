@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+#
+# Benchmark of the change notification emails rendered for every user (as
+# the test_emails command does) against InlineCSSTemplateMail.make_email_objects_for_users,
+# that renders them, and inlines their CSS, only once by language. It reads the
+# data from a development database (with sample data) and doesn't send any email,
+# run it inside the taiga-back git root directory:
+#
+#  $ python scripts/benchmark_emails.py --users 40
+
+import os
+import sys
+import timeit
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+django.setup()
+
+from django.contrib.auth import get_user_model
+
+from taiga.base.mails import InlineCSSTemplateMail
+from taiga.projects.history.models import HistoryEntry
+from taiga.projects.models import Project
+
+TEMPLATES = [
+    "userstories/userstory-change",
+    "tasks/task-change",
+    "issues/issue-change",
+    "wiki/wikipage-change",
+]
+
+
+def _make_users(total, langs):
+    User = get_user_model()
+    return [User(username="user{}".format(i), full_name="User {}".format(i),
+                 email="user{}@taiga.io".format(i), lang=langs[i % len(langs)])
+            for i in range(total)]
+
+
+def _legacy(email, users, context):
+    for user in users:
+        context["user"] = user
+        context["lang"] = user.lang
+        email.make_email_object(user.email, context)
+
+
+def _current(email, users, context):
+    list(email.make_email_objects_for_users(users, context))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--langs", default="en")
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    users = _make_users(options.users, options.langs.split(","))
+    context = {
+        "project": Project.objects.all().order_by("?").first(),
+        "changer": get_user_model().objects.all().order_by("?").first(),
+        "history_entries": list(HistoryEntry.objects.all().order_by("?")[0:5]),
+        "snapshot": {"subject": "Tests subject", "ref": 123123, "name": "Tests name", "slug": "test-slug"},
+    }
+
+    print("Users: {} ({})".format(options.users, options.langs))
+    for template_name in TEMPLATES:
+        email = type("InlineCSSTemplateMail", (InlineCSSTemplateMail,), {"name": template_name})()
+
+        legacy_time = min(timeit.repeat(lambda: _legacy(email, users, dict(context)),
+                                        number=1, repeat=options.repeat))
+        current_time = min(timeit.repeat(lambda: _current(email, users, dict(context)),
+                                         number=1, repeat=options.repeat))
+
+        print(template_name)
+        print("  legacy:  {:.2f} ms".format(legacy_time * 1000))
+        print("  current: {:.2f} ms".format(current_time * 1000))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+#
+# Benchmark of the JSON rendering of the user stories, issues and tasks list
+# endpoints with the taiga.base.api.renderers.JSONRenderer (compact separators and
+# the known types encoded by their exact type) against the previous implementation
+# (json.dumps with the generic JSONEncoder.default). The pages are serialized once
+# from a development database (with sample data), so only the rendering is
+# measured. Run it inside the taiga-back git root directory:
+#
+#  $ python scripts/benchmark_json_renderer.py --page-size 1000
+
+import os
+import sys
+import json
+import timeit
+from argparse import ArgumentParser
+from itertools import cycle, islice
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+django.setup()
+
+from django.contrib.auth import get_user_model
+
+from taiga.base.api.renderers import JSONRenderer
+from taiga.base.api.utils import encoders
+from taiga.projects.issues.models import Issue
+from taiga.projects.issues.serializers import IssueListSerializer
+from taiga.projects.issues.utils import attach_extra_info as attach_issues_extra_info
+from taiga.projects.tasks.models import Task
+from taiga.projects.tasks.serializers import TaskListSerializer
+from taiga.projects.tasks.utils import attach_extra_info as attach_tasks_extra_info
+from taiga.projects.userstories.models import UserStory
+from taiga.projects.userstories.serializers import UserStoryListSerializer
+from taiga.projects.userstories.utils import attach_extra_info as attach_userstories_extra_info
+
+
+class LegacyJSONEncoder(encoders.JSONEncoder):
+    type_encoders = {}
+
+
+def _get_data(serializer_class, queryset, page_size):
+    rows = list(queryset[:page_size])
+    assert rows, "There is no {} in the database".format(queryset.model._meta.verbose_name)
+    return serializer_class(list(islice(cycle(rows), page_size)), many=True).data
+
+
+def _legacy(data):
+    return json.dumps(data, cls=LegacyJSONEncoder, ensure_ascii=True).encode("utf-8")
+
+
+def _current(data):
+    return JSONRenderer().render(data)
+
+
+def _streaming(data):
+    return b"".join(JSONRenderer().render_iter(data))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    user = get_user_model().objects.filter(is_system=False).order_by("id").first()
+    cases = [
+        (UserStoryListSerializer,
+         attach_userstories_extra_info(UserStory.objects.select_related("milestone", "project", "status",
+                                                                        "owner", "assigned_to",
+                                                                        "generated_from_issue"), user=user)),
+        (IssueListSerializer,
+         attach_issues_extra_info(Issue.objects.select_related("owner", "assigned_to", "status",
+                                                               "project"), user=user)),
+        (TaskListSerializer,
+         attach_tasks_extra_info(Task.objects.select_related("milestone", "project", "status",
+                                                             "owner", "assigned_to"), user=user)),
+    ]
+
+    print("Page size: {}".format(options.page_size))
+    for serializer_class, queryset in cases:
+        data = _get_data(serializer_class, queryset.order_by("id"), options.page_size)
+        assert json.loads(_legacy(data).decode("utf-8")) == json.loads(_current(data).decode("utf-8"))
+        assert _current(data) == _streaming(data)
+
+        print(serializer_class.__name__)
+        for name, fn in [("legacy", _legacy), ("current", _current), ("streaming", _streaming)]:
+            time = min(timeit.repeat(lambda: fn(data), number=1, repeat=options.repeat))
+            print("  {:<10} {:.2f} ms ({} KB)".format(name + ":", time * 1000, len(fn(data)) // 1024))
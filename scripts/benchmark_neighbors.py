@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+#
+# Benchmark of taiga.base.neighbors.get_neighbors (keyset queries) against the
+# previous implementation (a window over the whole results set). It creates a
+# project with a lot of issues inside a transaction that is rolled back at the
+# end so it has to be run against a development database, inside the
+# taiga-back git root directory:
+#
+#  $ python scripts/benchmark_neighbors.py --issues 50000
+
+import os
+import random
+import sys
+import timeit
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+django.setup()
+
+from django.db import transaction
+
+from taiga.base.neighbors import get_neighbors, _get_neighbors_by_window, _get_project_results_set
+from taiga.projects.issues.models import Issue
+from taiga.projects.models import Project
+from taiga.users.models import User
+
+ORDERINGS = [
+    [],
+    ["status", "-id"],
+    ["-priority", "-id"],
+    ["-assigned_to__full_name", "-id"],
+]
+
+
+def _create_issues(project, owner, total):
+    statuses = list(project.issue_statuses.all())
+    priorities = list(project.priorities.all())
+    severities = list(project.severities.all())
+    types = list(project.issue_types.all())
+
+    Issue.objects.bulk_create([
+        Issue(project=project, owner=owner, subject="Issue {}".format(i), ref=i,
+              status=random.choice(statuses), priority=random.choice(priorities),
+              severity=random.choice(severities), type=random.choice(types),
+              assigned_to=random.choice([owner, None]))
+        for i in range(total)
+    ], batch_size=5000)
+
+
+def _run(fn, obj, results_set, repeat):
+    def _stmt():
+        fn(obj, _get_project_results_set(obj, results_set))
+    return min(timeit.repeat(_stmt, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--issues", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    with transaction.atomic():
+        owner = User.objects.create(username="neighbors-benchmark", email="neighbors-benchmark@taiga.io")
+        project = Project.objects.create(name="Neighbors benchmark", slug="neighbors-benchmark",
+                                         description="Neighbors benchmark", owner=owner)
+        _create_issues(project, owner, options.issues)
+        obj = Issue.objects.filter(project=project).order_by("id")[options.issues // 2]
+
+        print("Issues: {}".format(options.issues))
+        for ordering in ORDERINGS:
+            results_set = Issue.objects.filter(project=project)
+            if ordering:
+                results_set = results_set.order_by(*ordering)
+
+            assert (get_neighbors(obj, results_set) ==
+                    _get_neighbors_by_window(obj, _get_project_results_set(obj, results_set))), \
+                "Both implementations must return the same neighbors"
+
+            legacy_time = _run(_get_neighbors_by_window, obj, results_set, options.repeat)
+            current_time = _run(get_neighbors, obj, results_set, options.repeat)
+
+            print("order by {}".format(", ".join(ordering) or "default"))
+            print("  legacy:  {:.2f} ms".format(legacy_time * 1000))
+            print("  current: {:.2f} ms".format(current_time * 1000))
+
+        transaction.set_rollback(True)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+#
+# Benchmark of taiga.projects.services.apply_order_updates against the
+# previous implementation (one pass over all the elements per moved element).
+# It has to be run inside the taiga-back git root directory:
+#
+#  $ python scripts/benchmark_order_updates.py --elements 5000 --moved 50
+
+import os
+import random
+import sys
+import timeit
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+django.setup()
+
+from taiga.projects.services import apply_order_updates
+
+
+def legacy_apply_order_updates(base_orders: dict, new_orders: dict):
+    updated_order_ids = set()
+
+    invalid_keys = new_orders.keys() - base_orders.keys()
+    [new_orders.pop(id, None) for id in invalid_keys]
+
+    sorted_new_orders = sorted(new_orders.items(), key=lambda e: e[1])
+
+    for new_order in sorted_new_orders:
+        old_order = base_orders[new_order[0]]
+        new_order = new_order[1]
+        for id, order in base_orders.items():
+            moving_backward = new_order <= old_order and order >= new_order and order < old_order
+            moving_forward = new_order >= old_order and order >= new_order
+            if moving_backward or moving_forward:
+                base_orders[id] += 1
+                updated_order_ids.add(id)
+
+    for id, order in new_orders.items():
+        if base_orders[id] != order:
+            base_orders[id] = order
+            updated_order_ids.add(id)
+
+    removing_keys = [id for id in base_orders if id not in updated_order_ids]
+    [base_orders.pop(id, None) for id in removing_keys]
+
+
+def _run(fn, base_orders, new_orders, repeat):
+    def _stmt():
+        fn(dict(base_orders), dict(new_orders))
+    return min(timeit.repeat(_stmt, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--elements", type=int, default=5000)
+    parser.add_argument("--moved", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    base_orders = {id: id for id in range(options.elements)}
+    new_orders = {random.randrange(options.elements): random.randrange(options.elements)
+                  for _ in range(options.moved)}
+
+    result, legacy_result = dict(base_orders), dict(base_orders)
+    apply_order_updates(result, dict(new_orders))
+    legacy_apply_order_updates(legacy_result, dict(new_orders))
+    assert result == legacy_result, "Both implementations must return the same orders"
+
+    legacy_time = _run(legacy_apply_order_updates, base_orders, new_orders, options.repeat)
+    current_time = _run(apply_order_updates, base_orders, new_orders, options.repeat)
+
+    print("Elements: {}, moved: {}".format(options.elements, options.moved))
+    print("legacy:  {:.2f} ms".format(legacy_time * 1000))
+    print("current: {:.2f} ms".format(current_time * 1000))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# Benchmark of the list serializers of the user stories, issues and tasks compiled
+# with taiga.base.api.serializers.compile_serializer against the serpy generic
+# serialization (a loop over the fields of the serializer for every row). The rows
+# are read once from a development database (with sample data) and repeated to fill
+# the page, so only the serialization is measured. Run it inside the taiga-back git
+# root directory:
+#
+#  $ python scripts/benchmark_serializers.py --page-size 1000
+
+import os
+import sys
+import timeit
+from argparse import ArgumentParser
+from itertools import cycle, islice
+from unittest import mock
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+django.setup()
+
+import serpy
+
+from django.contrib.auth import get_user_model
+
+from taiga.base.api.serializers import LightSerializer
+from taiga.projects.issues.models import Issue
+from taiga.projects.issues.serializers import IssueListSerializer
+from taiga.projects.issues.utils import attach_extra_info as attach_issues_extra_info
+from taiga.projects.tasks.models import Task
+from taiga.projects.tasks.serializers import TaskListSerializer
+from taiga.projects.tasks.utils import attach_extra_info as attach_tasks_extra_info
+from taiga.projects.userstories.models import UserStory
+from taiga.projects.userstories.serializers import UserStoryListSerializer
+from taiga.projects.userstories.utils import attach_extra_info as attach_userstories_extra_info
+
+
+def _get_page(queryset, page_size):
+    rows = list(queryset[:page_size])
+    assert rows, "There is no {} in the database".format(queryset.model._meta.verbose_name)
+    return list(islice(cycle(rows), page_size))
+
+
+def _legacy(serializer_class, page):
+    with mock.patch.object(LightSerializer, "to_value", serpy.Serializer.to_value):
+        return serializer_class(page, many=True).data
+
+
+def _current(serializer_class, page):
+    return serializer_class(page, many=True).data
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    user = get_user_model().objects.filter(is_system=False).order_by("id").first()
+    cases = [
+        (UserStoryListSerializer,
+         attach_userstories_extra_info(UserStory.objects.select_related("milestone", "project", "status",
+                                                                        "owner", "assigned_to",
+                                                                        "generated_from_issue"), user=user)),
+        (IssueListSerializer,
+         attach_issues_extra_info(Issue.objects.select_related("owner", "assigned_to", "status",
+                                                               "project"), user=user)),
+        (TaskListSerializer,
+         attach_tasks_extra_info(Task.objects.select_related("milestone", "project", "status",
+                                                             "owner", "assigned_to"), user=user)),
+    ]
+
+    print("Page size: {}".format(options.page_size))
+    for serializer_class, queryset in cases:
+        page = _get_page(queryset.order_by("id"), options.page_size)
+        assert _legacy(serializer_class, page) == _current(serializer_class, page)
+
+        legacy_time = min(timeit.repeat(lambda: _legacy(serializer_class, page),
+                                        number=1, repeat=options.repeat))
+        current_time = min(timeit.repeat(lambda: _current(serializer_class, page),
+                                         number=1, repeat=options.repeat))
+
+        print(serializer_class.__name__)
+        print("  legacy:  {:.2f} ms".format(legacy_time * 1000))
+        print("  current: {:.2f} ms".format(current_time * 1000))
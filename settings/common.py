@@ -513,10 +513,38 @@ FEEDBACK_EMAIL = "support@taiga.io"
 STATS_ENABLED = False
 STATS_CACHE_TIMEOUT = 60*60  # In second
 
+# Cache of the users of the token authentication. It must be a cache shared
+# by all the processes (Redis, Memcached...), not a per process LocMemCache,
+# so the deactivated and deleted users are seen by all
+USER_CACHE_TIMEOUT = 0  # In seconds, 0 disables it
+USER_CACHE_LOCAL_TIMEOUT = 5  # In seconds
+USER_CACHE_LOCAL_SIZE = 1000
+
+# Cache of the permissions of the members of the projects. It must be a cache
+# shared by all the processes (Redis, Memcached...), not a per process
+# LocMemCache, so the changes of the memberships and roles are seen by all
+PERMISSIONS_CACHE_TIMEOUT = 0  # In seconds, 0 disables it
+
+# Answer the list and retrieve requests of the resources of the projects with
+# an ETag and with 304 Not Modified while the project doesn't change. The
+# project data and permissions versions must be in a cache shared by all the
+# processes (Redis, Memcached...), not in a per process LocMemCache
+CONDITIONAL_GET_ENABLED = False
+
+# Cache of the responses of the public projects to the anonymous users
+# (the project detail, user stories, issues, wiki pages and timeline). It must
+# be a cache shared by all the processes (Redis, Memcached...), not a per
+# process LocMemCache, so the changes of the projects are seen by all
+PUBLIC_RESPONSES_CACHE_TIMEOUT = 0  # In seconds, 0 disables it
+PUBLIC_RESPONSES_CACHE_LOCK_TIMEOUT = 10  # In seconds
+PUBLIC_RESPONSES_CACHE_LOCK_WAIT = 0.2  # In seconds
+
 # 0 notifications will work in a synchronous way
 # >0 an external process will check the pending notifications and will send them
 # collapsed during that interval
 CHANGE_NOTIFICATIONS_MIN_INTERVAL = 0 #seconds
+# Number of notifications claimed, rendered and sent at once
+CHANGE_NOTIFICATIONS_BATCH_SIZE = 100
 
 
 # List of functions called for filling correctly the ProjectModulesConfig associated to a project
@@ -23,6 +23,11 @@ CELERY_ALWAYS_EAGER = True
 
 MEDIA_ROOT = "/tmp"
 
+# Tests change users and memberships with the model signals disconnected
+USER_CACHE_TIMEOUT = 0
+PERMISSIONS_CACHE_TIMEOUT = 0
+FILTERS_DATA_CACHE_TIMEOUT = 0
+
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 INSTALLED_APPS = INSTALLED_APPS + [
     "tests",
@@ -22,6 +22,8 @@ from django.apps import apps
 from django.core import signing
 from django.utils.translation import ugettext as _
 
+from taiga.users import cache as users_cache
+
 
 def get_token_for_user(user, scope):
     """
@@ -32,7 +34,7 @@ def get_token_for_user(user, scope):
     return signing.dumps(data)
 
 
-def get_user_for_token(token, scope, max_age=None):
+def get_user_for_token(token, scope, max_age=None, use_cache=False):
     """
     Given a selfcontained token and a scope try to parse and
     unsign it.
@@ -41,7 +43,8 @@ def get_user_for_token(token, scope, max_age=None):
 
     If token passes a validation, returns
     a user instance corresponding with user_id stored
-    in the incoming token.
+    in the incoming token. If use_cache is True the
+    user is get from the users cache (see taiga.users.cache).
     """
     try:
         data = signing.loads(token, max_age=max_age)
@@ -51,7 +54,11 @@ def get_user_for_token(token, scope, max_age=None):
     model_cls = get_user_model()
 
     try:
-        user = model_cls.objects.get(pk=data["user_%s_id" % (scope)])
+        user_id = data["user_%s_id" % (scope)]
+        if use_cache:
+            user = users_cache.get_user(user_id)
+        else:
+            user = model_cls.objects.get(pk=user_id)
     except (model_cls.DoesNotExist, KeyError):
         raise exc.NotAuthenticated(_("Invalid token"))
     else:
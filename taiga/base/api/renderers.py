@@ -57,11 +57,44 @@ from django.template import RequestContext, loader, Template
 from django.test.client import encode_multipart
 from django.utils import six
 
+from .settings import api_settings
 from .utils import encoders
 
 import json
 
 
+class StdlibJSONBackend(object):
+    """
+    Encode the data with the json module of the standard library. Without
+    indentation it uses its C encoder and the most compact separators.
+    """
+    # Number of items of an array encoded in every chunk by `iter_dumps`
+    chunk_size = 100
+
+    def __init__(self, encoder_class=encoders.JSONEncoder):
+        self.encoder_class = encoder_class
+
+    def dumps(self, data, indent=None, ensure_ascii=True):
+        separators = (",", ":") if indent is None else None
+        return json.dumps(data, cls=self.encoder_class, indent=indent,
+                          ensure_ascii=ensure_ascii, separators=separators)
+
+    def iter_dumps(self, data, indent=None, ensure_ascii=True):
+        """
+        Encode the data in chunks, a list of items is encoded `chunk_size`
+        items at a time.
+        """
+        if not isinstance(data, list) or indent is not None:
+            yield self.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
+            return
+
+        yield "["
+        for start in range(0, len(data), self.chunk_size):
+            chunk = self.dumps(data[start:start + self.chunk_size], ensure_ascii=ensure_ascii)
+            yield ("," if start else "") + chunk[1:-1]
+        yield "]"
+
+
 class BaseRenderer(object):
     """
     All renderers should extend this class, setting the `media_type`
@@ -110,6 +143,12 @@ class JSONRenderer(BaseRenderer):
 
         return indent
 
+    def get_json_backend(self):
+        """
+        Return the backend that encodes the data, the `JSON_BACKEND` setting.
+        """
+        return api_settings.JSON_BACKEND(encoder_class=self.encoder_class)
+
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """
         Render `data` into JSON.
@@ -119,8 +158,7 @@ class JSONRenderer(BaseRenderer):
 
         indent = self._get_indent(accepted_media_type, renderer_context)
 
-        ret = json.dumps(data, cls=self.encoder_class,
-            indent=indent, ensure_ascii=self.ensure_ascii)
+        ret = self.get_json_backend().dumps(data, indent=indent, ensure_ascii=self.ensure_ascii)
 
         # On python 2.x json.dumps() returns bytestrings if ensure_ascii=True,
         # but if ensure_ascii=False, the return type is underspecified,
@@ -130,6 +168,19 @@ class JSONRenderer(BaseRenderer):
             return bytes(ret.encode("utf-8"))
         return ret
 
+    def render_iter(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON as an iterator of chunks of bytes, for the
+        streaming responses.
+        """
+        if data is None:
+            return
+
+        indent = self._get_indent(accepted_media_type, renderer_context)
+
+        for chunk in self.get_json_backend().iter_dumps(data, indent=indent, ensure_ascii=self.ensure_ascii):
+            yield chunk.encode("utf-8")
+
     def render_to_file(self, data, outputfile, accepted_media_type=None, renderer_context=None):
         """
         Render `data` into a file with JSON format.
@@ -184,6 +235,17 @@ class JSONPRenderer(JSONRenderer):
                                                  renderer_context)
         return callback.encode(self.charset) + b"(" + json + b");"
 
+    def render_iter(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders into jsonp as an iterator of chunks of bytes.
+        """
+        renderer_context = renderer_context or {}
+        callback = self.get_callback(renderer_context)
+        yield callback.encode(self.charset) + b"("
+        yield from super(JSONPRenderer, self).render_iter(data, accepted_media_type,
+                                                          renderer_context)
+        yield b");"
+
 
 class TemplateHTMLRenderer(BaseRenderer):
     """
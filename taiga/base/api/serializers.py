@@ -68,6 +68,8 @@ from collections import OrderedDict
 import copy
 import datetime
 import inspect
+import keyword
+import operator
 import types
 import serpy
 
@@ -1251,6 +1253,101 @@ class HyperlinkedModelSerializer(ModelSerializer):
         return self._default_view_name % format_kwargs
 
 
+_compiled_serializers = {}
+
+
+def _get_default_getter_expression(serializer_cls, attr):
+    """
+    Return the source of the expression that gets `attr` from the instance,
+    if the serializer uses the default getters, else None.
+    """
+    if serializer_cls.default_getter is operator.itemgetter:
+        return "instance[{!r}]".format(attr)
+
+    if serializer_cls.default_getter is operator.attrgetter:
+        names = attr.split(".")
+        if all(name.isidentifier() and not keyword.iskeyword(name) for name in names):
+            return "instance.{}".format(attr)
+
+    return None
+
+
+def compile_serializer(serializer_cls):
+    """
+    Return a function `serialize(serializer, instance)` specialized for the
+    fields of a serpy serializer class, that returns the same dict than
+    `serializer._serialize(instance, serializer._compiled_fields)`.
+
+    serpy walks the list of fields of the serializer for every instance;
+    the function instead gets every field with its own statement, the
+    attributes read with the default getters are inlined and the method
+    fields, the getters and the to_value functions are resolved only
+    once, when the serializer class is compiled.
+    """
+    serialize = _compiled_serializers.get(serializer_cls, None)
+    if serialize is not None:
+        return serialize
+
+    namespace = {}
+    lines = ["def serialize(self, instance):",
+             "    result = {}"]
+
+    for i, (name, field) in enumerate(serializer_cls._field_map.items()):
+        label = field.label or name
+        getter = field.as_getter(name, serializer_cls)
+
+        if field.getter_takes_serializer:
+            namespace["getter_{}".format(i)] = getter
+            lines.append("    result[{!r}] = getter_{}(self, instance)".format(label, i))
+            continue
+
+        value = None
+        if getter is None:
+            value = _get_default_getter_expression(serializer_cls, field.attr or name)
+            getter = serializer_cls.default_getter(field.attr or name)
+
+        if value is None:
+            namespace["getter_{}".format(i)] = getter
+            value = "getter_{}(instance)".format(i)
+
+        # Like serpy, the not required fields are omitted if the instance
+        # doesn't have them
+        indent = "    "
+        if not field.required:
+            lines.append("    try:")
+            lines.append("        value = {}".format(value))
+            lines.append("    except (KeyError, AttributeError):")
+            lines.append("        pass")
+            lines.append("    else:")
+            indent = "        "
+            value = "value"
+
+        to_value = field.to_value if field._is_to_value_overridden() else None
+        if to_value is None and not field.call:
+            lines.append("{}result[{!r}] = {}".format(indent, label, value))
+            continue
+
+        if value != "value":
+            lines.append("{}value = {}".format(indent, value))
+        inner_indent = indent
+        if not field.required:
+            lines.append("{}if value is not None:".format(indent))
+            inner_indent = indent + "    "
+        if field.call:
+            lines.append("{}value = value()".format(inner_indent))
+        if to_value is not None:
+            namespace["to_value_{}".format(i)] = to_value
+            lines.append("{}value = to_value_{}(value)".format(inner_indent, i))
+        lines.append("{}result[{!r}] = value".format(indent, label))
+
+    lines.append("    return result")
+
+    exec(compile("\n".join(lines), "<compiled {}>".format(serializer_cls.__name__), "exec"), namespace)
+    serialize = namespace["serialize"]
+    _compiled_serializers[serializer_cls] = serialize
+    return serialize
+
+
 class LightSerializer(serpy.Serializer):
     def __init__(self, *args, **kwargs):
         kwargs.pop("read_only", None)
@@ -1262,6 +1359,12 @@ class LightSerializer(serpy.Serializer):
         self.context = context
         self.view = view
 
+    def to_value(self, instance):
+        serialize = compile_serializer(self.__class__)
+        if self.many:
+            return [serialize(self, obj) for obj in instance]
+        return serialize(self, instance)
+
 
 class LightDictSerializer(serpy.DictSerializer):
     def __init__(self, *args, **kwargs):
@@ -1273,3 +1376,9 @@ class LightDictSerializer(serpy.DictSerializer):
         super().__init__(*args, **kwargs)
         self.context = context
         self.view = view
+
+    def to_value(self, instance):
+        serialize = compile_serializer(self.__class__)
+        if self.many:
+            return [serialize(self, obj) for obj in instance]
+        return serialize(self, instance)
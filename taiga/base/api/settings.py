@@ -94,6 +94,12 @@ DEFAULTS = {
     "DEFAULT_CONTENT_NEGOTIATION_CLASS":
         "taiga.base.api.negotiation.DefaultContentNegotiation",
 
+    # JSON rendering
+    "JSON_BACKEND": "taiga.base.api.renderers.StdlibJSONBackend",
+    # The responses with a list of at least this number of items are streamed
+    # (None to never stream them)
+    "STREAMING_RESPONSE_MIN_ITEMS": None,
+
     # Genric view behavior
     "DEFAULT_MODEL_SERIALIZER_CLASS":
         "taiga.base.api.serializers.ModelSerializer",
@@ -170,6 +176,7 @@ IMPORT_STRINGS = (
     "DEFAULT_THROTTLE_CLASSES",
     "DEFAULT_CONTENT_NEGOTIATION_CLASS",
     "DEFAULT_MODEL_SERIALIZER_CLASS",
+    "JSON_BACKEND",
     "DEFAULT_FILTER_BACKENDS",
     "EXCEPTION_HANDLER",
     "FILTER_BACKEND",
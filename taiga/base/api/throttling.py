@@ -82,7 +82,11 @@ class SimpleRateThrottle(BaseThrottle):
 
     Period should be one of: ("s", "sec", "m", "min", "h", "hour", "d", "day")
 
-    Previous request information used for throttling is stored in the cache.
+    The requests are counted with a sliding window counter: one counter per
+    period in the cache, incremented atomically with `cache.incr`, and the
+    counter of the previous period weighted by how much of it is still
+    inside the window. So every request costs a constant amount of work
+    whatever the rate, and concurrent requests don't lose updates.
     """
 
     cache = default_cache
@@ -132,6 +136,27 @@ class SimpleRateThrottle(BaseThrottle):
         duration = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
         return (num_requests, duration)
 
+    def get_window_cache_key(self, window):
+        """
+        Return the cache key of the counter of a period.
+        """
+        return "%s_%d" % (self.key, window)
+
+    def incr_window_counter(self, window):
+        """
+        Atomically increment the counter of a period and return its new
+        value. The counter is kept two periods, while it can be the
+        previous one.
+        """
+        window_key = self.get_window_cache_key(window)
+        self.cache.add(window_key, 0, self.duration * 2)
+        try:
+            return self.cache.incr(window_key)
+        except ValueError:
+            # Expired between the add and the incr
+            self.cache.set(window_key, 1, self.duration * 2)
+            return 1
+
     def allow_request(self, request, view):
         """
         Implement the check to see if the request should be throttled.
@@ -146,46 +171,62 @@ class SimpleRateThrottle(BaseThrottle):
         if self.key is None:
             return True
 
-        self.history = self.cache.get(self.key, [])
         self.now = self.timer()
+        self.window = int(self.now // self.duration)
+        self.elapsed = self.now - self.window * self.duration
+        self.previous_count = self.cache.get(self.get_window_cache_key(self.window - 1), 0)
+        self.current_count = self.incr_window_counter(self.window)
 
-        # Drop any requests from the history which have now passed the
-        # throttle duration
-        while self.history and self.history[-1] <= self.now - self.duration:
-            self.history.pop()
-        if len(self.history) >= self.num_requests:
+        if self.get_estimated_count() > self.num_requests:
             return self.throttle_failure()
         return self.throttle_success()
 
+    def get_estimated_count(self):
+        """
+        Return the estimated number of requests in the last `duration`
+        seconds, this one included.
+        """
+        previous_weight = (self.duration - self.elapsed) / self.duration
+        return self.previous_count * previous_weight + self.current_count
+
     def throttle_success(self):
         """
-        Inserts the current request's timestamp along with the key
-        into the cache.
+        Called when the request is allowed. It is already counted.
         """
-        self.history.insert(0, self.now)
-        self.cache.set(self.key, self.history, self.duration)
         return True
 
     def throttle_failure(self):
         """
         Called when a request to the API has failed due to throttling.
+
+        The rejected requests are not counted.
         """
+        try:
+            self.cache.decr(self.get_window_cache_key(self.window))
+        except ValueError:
+            pass
+        self.current_count -= 1
         return False
 
     def wait(self):
         """
         Returns the recommended next request time in seconds.
         """
-        if self.history:
-            remaining_duration = self.duration - (self.now - self.history[-1])
-        else:
-            remaining_duration = self.duration
-
-        available_requests = self.num_requests - len(self.history) + 1
-        if available_requests <= 0:
+        # The estimated count must drop to `num_requests - 1` to allow one more
+        allowed = self.num_requests - 1
+        if allowed < 0:
             return None
 
-        return remaining_duration / float(available_requests)
+        remaining_duration = self.duration - self.elapsed
+
+        if self.current_count <= allowed:
+            # Wait for the previous period to leave the window
+            if not self.previous_count:
+                return 0
+            return max(remaining_duration - (allowed - self.current_count) * self.duration / self.previous_count, 0)
+
+        # Wait for the next period and for the current one to leave the window
+        return remaining_duration + self.duration * (1 - allowed / self.current_count)
 
 
 class AnonRateThrottle(SimpleRateThrottle):
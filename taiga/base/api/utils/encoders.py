@@ -56,34 +56,64 @@ import types
 import json
 
 
+def _encode_datetime(o):
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:23] + r[26:]
+    if r.endswith("+00:00"):
+        r = r[:-6] + "Z"
+    return r
+
+
+def _encode_date(o):
+    return o.isoformat()
+
+
+def _encode_time(o):
+    if timezone and timezone.is_aware(o):
+        raise ValueError("JSON can't represent timezone-aware times.")
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:12]
+    return r
+
+
+def _encode_timedelta(o):
+    return str(o.total_seconds())
+
+
 class JSONEncoder(json.JSONEncoder):
     """
     JSONEncoder subclass that knows how to encode date/time/timedelta,
     decimal types, and generators.
     """
+    # Encoders looked up by the exact type of the object, before the
+    # generic checks, for the types found in almost every response.
+    type_encoders = {
+        datetime.datetime: _encode_datetime,
+        datetime.date: _encode_date,
+        datetime.time: _encode_time,
+        datetime.timedelta: _encode_timedelta,
+        decimal.Decimal: str,
+    }
+
     def default(self, o):
+        encode = self.type_encoders.get(type(o), None)
+        if encode is not None:
+            return encode(o)
+
         # For Date Time string spec, see ECMA 262
         # http://ecma-international.org/ecma-262/5.1/#sec-15.9.1.15
         if isinstance(o, Promise):
             return force_text(o)
         elif isinstance(o, datetime.datetime):
-            r = o.isoformat()
-            if o.microsecond:
-                r = r[:23] + r[26:]
-            if r.endswith("+00:00"):
-                r = r[:-6] + "Z"
-            return r
+            return _encode_datetime(o)
         elif isinstance(o, datetime.date):
-            return o.isoformat()
+            return _encode_date(o)
         elif isinstance(o, datetime.time):
-            if timezone and timezone.is_aware(o):
-                raise ValueError("JSON can't represent timezone-aware times.")
-            r = o.isoformat()
-            if o.microsecond:
-                r = r[:12]
-            return r
+            return _encode_time(o)
         elif isinstance(o, datetime.timedelta):
-            return str(o.total_seconds())
+            return _encode_timedelta(o)
         elif isinstance(o, decimal.Decimal):
             return str(o)
         elif isinstance(o, QuerySet):
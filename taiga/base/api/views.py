@@ -370,6 +370,18 @@ class APIView(View):
         neg = self.perform_content_negotiation(request)
         request.accepted_renderer, request.accepted_media_type = neg
 
+    def is_streamable_response(self, response):
+        """
+        Return `True` if the response data is a list long enough to be
+        streamed, see the `STREAMING_RESPONSE_MIN_ITEMS` setting.
+        """
+        min_items = api_settings.STREAMING_RESPONSE_MIN_ITEMS
+        return (min_items is not None and
+                not response.exception and
+                isinstance(response.data, list) and
+                len(response.data) >= min_items and
+                hasattr(response.accepted_renderer, "render_iter"))
+
     def finalize_response(self, request, response, *args, **kwargs):
         """
         Returns the final response object.
@@ -388,6 +400,9 @@ class APIView(View):
             response.accepted_media_type = request.accepted_media_type
             response.renderer_context = self.get_renderer_context()
 
+            if self.is_streamable_response(response):
+                response = response.to_streaming_response()
+
         for key, value in self.headers.items():
             response[key] = value
 
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+LEFT JOIN LATERAL subqueries for querysets.
+
+A lateral subquery computes several values of the same relation (for example
+the list of watchers, the number of watchers and if the current user is one of
+them) in only one pass, instead of one correlated subquery in the SELECT clause
+for every value.
+"""
+
+from django.db.models.sql.constants import LOUTER
+
+
+class LateralJoin(object):
+    """
+    A `LEFT JOIN LATERAL (<sql>) <alias> ON TRUE` entry for the `alias_map` of a
+    Django query (see django.db.models.sql.datastructures.Join).
+
+    `sql` must return only one row. `{tbl}` in `sql` is replaced with the alias of
+    the table it's joined to.
+
+    The join is omitted if none of the `fields` (the extra select fields that use
+    it) are selected or used to sort, so it doesn't slow down the `count()` queries
+    or the querysets used as subqueries.
+    """
+    join_type = LOUTER
+    nullable = True
+
+    def __init__(self, table_name, parent_alias, sql, params, fields, table_alias=None):
+        self.table_name = table_name
+        self.parent_alias = parent_alias
+        self.table_alias = table_alias
+        self.sql = sql
+        self.params = tuple(params)
+        self.fields = tuple(fields)
+
+    def is_used(self, query):
+        ordering = [field.lstrip("-") for field in query.order_by if isinstance(field, str)]
+        return any(field in query.extra_select or field in ordering for field in self.fields)
+
+    def as_sql(self, compiler, connection):
+        if not self.is_used(compiler.query):
+            return "", []
+
+        qn = compiler.quote_name_unless_alias
+        sql = self.sql.format(tbl=qn(self.parent_alias))
+        return "LEFT JOIN LATERAL ({}) {} ON TRUE".format(sql, qn(self.table_alias)), list(self.params)
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(self.table_name, change_map.get(self.parent_alias, self.parent_alias),
+                              self.sql, self.params, self.fields,
+                              table_alias=change_map.get(self.table_alias, self.table_alias))
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return (self.table_name == other.table_name and
+                    self.parent_alias == other.parent_alias and
+                    self.sql == other.sql and
+                    self.params == other.params)
+        return False
+
+    def __hash__(self):
+        return hash((self.table_name, self.parent_alias, self.sql, self.params))
+
+    def demote(self):
+        return self.relabeled_clone({})
+
+    def promote(self):
+        return self.relabeled_clone({})
+
+
+def attach_lateral(queryset, name, sql, select, params=()):
+    """Join a lateral subquery to the queryset and attach some of its columns
+    to each object.
+
+    :param queryset: A Django queryset object.
+    :param name: Base name of the alias of the subquery. The same subquery (same
+        `name`, `sql` and `params`) is joined only once.
+    :param sql: SQL of the subquery, it must return one row. `{tbl}` is the alias
+        of the queryset table.
+    :param select: Dict with the fields to attach and their SQL expressions; `{alias}`
+        is the alias of the subquery.
+    :param params: Params of `sql`.
+
+    :return: Queryset object with the additional fields.
+    """
+    queryset = queryset.all()
+    query = queryset.query
+    join = LateralJoin(name, query.get_initial_alias(), sql, params, select.keys())
+    alias = query.join(join)
+
+    # If the join is reused it has to know the new fields that use it
+    join = query.alias_map[alias]
+    fields = join.fields + tuple(field for field in select if field not in join.fields)
+    query.alias_map[alias] = LateralJoin(join.table_name, join.parent_alias, join.sql, join.params,
+                                         fields, table_alias=alias)
+
+    qn = query.get_compiler(queryset.db).quote_name_unless_alias
+    return queryset.extra(select={field: expression.format(alias=qn(alias))
+                                  for field, expression in select.items()})
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from django.db import models
+
+
+class CachedFieldsModelMixin(models.Model):
+    """
+    Generic model mixin for the fields that cache data of other tables
+    (declared in `cached_fields`). They are kept up to date by the services
+    that change that data, with their own queries, so the save() of an
+    instance never updates them: an outdated instance can't overwrite them.
+    """
+    cached_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def get_cached_fields(self):
+        return {name for cls in type(self).__mro__ for name in cls.__dict__.get("cached_fields", ())}
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # Only the UPDATE skips them: if the row doesn't exist the save()
+        # inserts it with all the fields, like for any other model
+        cached_fields = self.get_cached_fields()
+        values = [value for value in values if value[0].attname not in cached_fields]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
@@ -119,6 +119,33 @@ class FilterBackend(OrderByFilterMixin):
 # Permissions filters
 #####################################################################
 
+def get_member_project_ids_queryset(user, permission, project_id=None):
+    """
+    Return a queryset (to be used as a subquery) with the ids of the projects
+    where the user is member with `permission` (or admin).
+    """
+    membership_model = apps.get_model("projects", "Membership")
+    memberships_qs = membership_model.objects.filter(user=user)
+    if project_id:
+        memberships_qs = memberships_qs.filter(project_id=project_id)
+    memberships_qs = memberships_qs.filter(Q(role__permissions__contains=[permission]) |
+                                           Q(is_admin=True))
+    return memberships_qs.values("project_id")
+
+
+def get_public_project_ids_queryset(permission, anon=False):
+    """
+    Return a queryset (to be used as a subquery) with the ids of the projects
+    where registered (or anonymous if `anon` is True) users have `permission`.
+
+    NOTE: See migration projects.0057_permissions_gin_indexes
+    """
+    project_model = apps.get_model("projects", "Project")
+    if anon:
+        return project_model.objects.filter(anon_permissions__contains=[permission]).values("id")
+    return project_model.objects.filter(public_permissions__contains=[permission]).values("id")
+
+
 class PermissionBasedFilterBackend(FilterBackend):
     permission = None
 
@@ -139,19 +166,14 @@ class PermissionBasedFilterBackend(FilterBackend):
         if request.user.is_authenticated() and request.user.is_superuser:
             qs = qs
         elif request.user.is_authenticated():
-            membership_model = apps.get_model('projects', 'Membership')
-            memberships_qs = membership_model.objects.filter(user=request.user)
-            if project_id:
-                memberships_qs = memberships_qs.filter(project_id=project_id)
-            memberships_qs = memberships_qs.filter(Q(role__permissions__contains=[self.permission]) |
-                                                   Q(is_admin=True))
-
-            projects_list = [membership.project_id for membership in memberships_qs]
-
-            qs = qs.filter(Q(project_id__in=projects_list) |
-                           Q(project__public_permissions__contains=[self.permission]))
+            member_project_ids = get_member_project_ids_queryset(request.user, self.permission,
+                                                                 project_id=project_id)
+            public_project_ids = get_public_project_ids_queryset(self.permission)
+            qs = qs.filter(Q(project_id__in=member_project_ids) |
+                           Q(project_id__in=public_project_ids))
         else:
-            qs = qs.filter(project__anon_permissions__contains=[self.permission])
+            anon_project_ids = get_public_project_ids_queryset(self.permission, anon=True)
+            qs = qs.filter(project_id__in=anon_project_ids)
 
         return super().filter_queryset(request, qs, view)
 
@@ -248,26 +270,20 @@ class MembersFilterBackend(PermissionBasedFilterBackend):
         if request.user.is_authenticated() and request.user.is_superuser:
             qs = qs
         elif request.user.is_authenticated():
-            Membership = apps.get_model('projects', 'Membership')
-            memberships_qs = Membership.objects.filter(user=request.user)
-            if project_id:
-                memberships_qs = memberships_qs.filter(project_id=project_id)
-            memberships_qs = memberships_qs.filter(Q(role__permissions__contains=[self.permission]) |
-                                                   Q(is_admin=True))
-
-            projects_list = [membership.project_id for membership in memberships_qs]
+            member_project_ids = get_member_project_ids_queryset(request.user, self.permission,
+                                                                 project_id=project_id)
 
             if project:
-                is_member = project.id in projects_list
                 has_project_public_view_permission = "view_project" in project.public_permissions
-                if not is_member and not has_project_public_view_permission:
+                if not has_project_public_view_permission and not member_project_ids.exists():
                     qs = qs.none()
 
-            q = Q(memberships__project_id__in=projects_list) | Q(id=request.user.id)
+            q = Q(memberships__project_id__in=member_project_ids) | Q(id=request.user.id)
 
             # If there is no selected project we want access to users from public projects
             if not project:
-                q = q | Q(memberships__project__public_permissions__contains=[self.permission])
+                public_project_ids = get_public_project_ids_queryset(self.permission)
+                q = q | Q(memberships__project_id__in=public_project_ids)
 
             qs = qs.filter(q)
 
@@ -16,9 +16,14 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import copy
+import uuid
+from html import escape as escape_html
+
 from django.conf import settings
 
 from djmail import template_mail
+from markupsafe import escape
 import premailer
 
 import logging
@@ -29,6 +34,21 @@ if not getattr(settings, "DEBUG", False):
     premailer.premailer.cssutils.log.setLevel(logging.CRITICAL)
 
 
+class _RecipientPlaceholder:
+    """
+    Stands for the user of the context while the templates are rendered
+    for several users. It is replaced by the name of every user later.
+    """
+    def __init__(self):
+        self.token = "taigarecipient{}".format(uuid.uuid4().hex)
+
+    def __str__(self):
+        return self.token
+
+    def get_full_name(self):
+        return self.token
+
+
 class InlineCSSTemplateMail(template_mail.TemplateMail):
     def _render_message_body_as_html(self, context):
         html = super()._render_message_body_as_html(context)
@@ -36,6 +56,46 @@ class InlineCSSTemplateMail(template_mail.TemplateMail):
         # Transform CSS into line style attributes
         return premailer.transform(html)
 
+    def make_email_objects_for_users(self, users, context, **kwargs):
+        """
+        A generator of the email objects for every user.
+
+        The templates are rendered, and their CSS inlined, only once for every
+        language. So they can't use the `user` of the context but to print its
+        full name ({{ user }} or user.get_full_name()).
+        """
+        placeholder = _RecipientPlaceholder()
+        emails_by_lang = {}
+
+        for user in users:
+            lang = user.lang or settings.LANGUAGE_CODE
+            if lang not in emails_by_lang:
+                lang_context = dict(context, user=placeholder, lang=lang)
+                emails_by_lang[lang] = self.make_email_object(user.email, lang_context, **kwargs)
+
+            yield self._personalize_email_object(emails_by_lang[lang], placeholder, user)
+
+    def _personalize_email_object(self, email, placeholder, user):
+        full_name = user.get_full_name()
+        # The templates escape the name and premailer serializes the html
+        # with only &, < and > escaped
+        escaped_full_name = str(escape(full_name))
+        html_full_name = escape_html(full_name, quote=False)
+
+        email = copy.copy(email)
+        email.to = [user.email]
+        email.subject = email.subject.replace(placeholder.token, escaped_full_name)
+
+        if email.content_subtype == "html":
+            email.body = email.body.replace(placeholder.token, html_full_name)
+        else:
+            email.body = email.body.replace(placeholder.token, escaped_full_name)
+
+        if getattr(email, "alternatives", None):
+            email.alternatives = [(content.replace(placeholder.token, html_full_name), mimetype)
+                                  for content, mimetype in email.alternatives]
+        return email
+
 
 class MagicMailBuilder(template_mail.MagicMailBuilder):
     pass
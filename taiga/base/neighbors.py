@@ -17,42 +17,164 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 from collections import namedtuple
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
 from django.db.models.sql.datastructures import EmptyResultSet
+from django.utils.encoding import force_bytes
 from taiga.base.api import serializers
 from taiga.base.fields import Field, MethodField
 
 Neighbor = namedtuple("Neighbor", "left right")
+OrderingKey = namedtuple("OrderingKey", "path descending nullable")
+CachedNeighbor = namedtuple("CachedNeighbor", "id ref subject")
 
+# Max depth of relations followed when the ordering of a related model
+# refers to other related models
+MAX_ORDERING_DEPTH = 5
 
-def get_neighbors(obj, results_set=None):
-    """Get the neighbors of a model instance.
 
-    The neighbors are the objects that are at the left/right of `obj` in the results set.
+class UnsupportedOrdering(Exception):
+    pass
 
-    :param obj: The object you want to know its neighbors.
-    :param results_set: Find the neighbors applying the constraints of this set (a Django queryset
-        object).
 
-    :return: Tuple `<left neighbor>, <right neighbor>`. Left and right neighbors can be `None`.
+def get_ordering_keys(model, ordering, prefix="", descending=False, nullable=False):
+    """Expand an ordering (as accepted by `QuerySet.order_by`) to the concrete fields it
+    sorts by, following the default ordering of the related models as Django does.
+
+    :return: List of `OrderingKey`.
+
+    :raises UnsupportedOrdering: If the ordering can't be expressed as a list of field paths
+        (expressions, annotations, random ordering, multivalued relations...).
     """
-    if results_set is None:
-        results_set = type(obj).objects.get_queryset()
+    if prefix.count(LOOKUP_SEP) > MAX_ORDERING_DEPTH:
+        raise UnsupportedOrdering("Too deep ordering: {}".format(prefix))
 
-    # Neighbors calculation is at least at project level
-    results_set = results_set.filter(project_id=obj.project.id)
+    keys = []
+    for item in ordering:
+        if not isinstance(item, str) or item == "?" or "." in item:
+            raise UnsupportedOrdering(item)
+
+        item_descending = item.startswith("-")
+        opts = model._meta
+        parts = []
+        item_nullable = nullable
+        field = None
+        names = item.lstrip("-").split(LOOKUP_SEP)
+        for i, name in enumerate(names):
+            if name == "pk":
+                name = opts.pk.name
+
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                raise UnsupportedOrdering(item)
+
+            if not field.concrete or field.many_to_many:
+                raise UnsupportedOrdering(item)
+
+            parts.append(name)
+            item_nullable = item_nullable or field.null
+
+            if i < len(names) - 1:
+                if not field.is_relation:
+                    raise UnsupportedOrdering(item)
+                opts = field.related_model._meta
+
+        path = prefix + LOOKUP_SEP.join(parts)
+        key_descending = item_descending != descending
+        if field.is_relation and field.related_model._meta.ordering and parts[-1] != field.attname:
+            keys += get_ordering_keys(field.related_model, field.related_model._meta.ordering,
+                                      prefix=path + LOOKUP_SEP, descending=key_descending,
+                                      nullable=item_nullable)
+        else:
+            keys.append(OrderingKey(path, key_descending, item_nullable))
+
+    return keys
+
+
+def _get_results_set_ordering_keys(model, results_set):
+    query = results_set.query
+    if query.extra_order_by:
+        raise UnsupportedOrdering(query.extra_order_by)
 
+    if query.order_by:
+        ordering = query.order_by
+    elif query.default_ordering:
+        ordering = model._meta.ordering
+    else:
+        ordering = []
+
+    pk_name = model._meta.pk.name
+    keys = []
+    for key in get_ordering_keys(model, ordering):
+        # Everything in the results set belongs to the same project so sorting by
+        # it (or by the project of a related status, priority...) is useless
+        if set(key.path.split(LOOKUP_SEP)) & {"project", "project_id"}:
+            continue
+
+        # A repeated key doesn't change the sort
+        if key.path in [k.path for k in keys]:
+            continue
+
+        keys.append(key)
+
+        # The sort is total after the primary key
+        if key.path == pk_name:
+            break
+    else:
+        keys.append(OrderingKey(pk_name, False, False))
+
+    return keys
+
+
+def _key_after(key, value, descending):
+    # In PostgreSQL NULL values are sorted as if they were bigger than any other
+    if descending:
+        if value is None:
+            return Q(**{"{}__isnull".format(key.path): False})
+        return Q(**{"{}__lt".format(key.path): value})
+
+    if value is None:
+        return None
+
+    after = Q(**{"{}__gt".format(key.path): value})
+    if key.nullable:
+        after |= Q(**{"{}__isnull".format(key.path): True})
+    return after
+
+
+def _key_equal(key, value):
+    if value is None:
+        return Q(**{"{}__isnull".format(key.path): True})
+    return Q(**{key.path: value})
+
+
+def _get_neighbor(results_set, keys, values, backward=False):
+    condition = None
+    equal = Q()
+    for key, value in zip(keys, values):
+        after = _key_after(key, value, key.descending != backward)
+        if after is not None:
+            condition = (equal & after) if condition is None else (condition | (equal & after))
+        equal &= _key_equal(key, value)
+
+    if condition is None:
+        return None
+
+    ordering = ["{}{}".format("-" if key.descending != backward else "", key.path) for key in keys]
+    return results_set.filter(condition).order_by(*ordering).first()
+
+
+def _get_neighbors_by_window(obj, results_set):
     compiler = results_set.query.get_compiler('default')
-    try:
-        base_sql, base_params = compiler.as_sql(with_col_aliases=True)
-    except EmptyResultSet:
-        # Generate a not empty queryset
-        results_set = type(obj).objects.get_queryset().filter(project_id=obj.project.id)
-        compiler = results_set.query.get_compiler('default')
-        base_sql, base_params = compiler.as_sql(with_col_aliases=True)
+    base_sql, base_params = compiler.as_sql(with_col_aliases=True)
 
     query = """
         SELECT * FROM
@@ -88,6 +210,87 @@ def get_neighbors(obj, results_set=None):
     return Neighbor(left, right)
 
 
+def _get_project_results_set(obj, results_set):
+    if results_set is None:
+        results_set = type(obj).objects.get_queryset()
+
+    # Neighbors calculation is at least at project level
+    results_set = results_set.filter(project_id=obj.project_id)
+
+    try:
+        results_set.query.get_compiler(results_set.db).as_sql()
+    except EmptyResultSet:
+        # Generate a not empty queryset
+        results_set = type(obj).objects.get_queryset().filter(project_id=obj.project_id)
+
+    return results_set
+
+
+def get_neighbors(obj, results_set=None):
+    """Get the neighbors of a model instance.
+
+    The neighbors are the objects that are at the left/right of `obj` in the results set.
+    They are found with two keyset queries (`WHERE <sort keys> before/after <obj sort keys>
+    ORDER BY <sort keys> LIMIT 1`) instead of numbering the whole results set.
+
+    :param obj: The object you want to know its neighbors.
+    :param results_set: Find the neighbors applying the constraints of this set (a Django queryset
+        object).
+
+    :return: Tuple `<left neighbor>, <right neighbor>`. Left and right neighbors can be `None`.
+    """
+    results_set = _get_project_results_set(obj, results_set)
+
+    try:
+        keys = _get_results_set_ordering_keys(type(obj), results_set)
+    except UnsupportedOrdering:
+        return _get_neighbors_by_window(obj, results_set)
+
+    values = results_set.filter(id=obj.id).values_list(*[key.path for key in keys]).first()
+    if values is None:
+        return Neighbor(None, None)
+
+    left = _get_neighbor(results_set, keys, values, backward=True)
+    right = _get_neighbor(results_set, keys, values)
+    return Neighbor(left, right)
+
+
+def _get_cached_neighbor_data(neighbor):
+    if neighbor is None:
+        return None
+    return CachedNeighbor(neighbor.id, neighbor.ref, neighbor.subject)
+
+
+def get_cached_neighbors(obj, results_set=None):
+    """Same as `get_neighbors` but the result is cached for `NEIGHBORS_CACHE_TIMEOUT` seconds
+    for every results set (the hash of its SQL), object and version of the project data, so
+    any change in the project discards it.
+
+    Only the data shown of every neighbor is cached, so they are `CachedNeighbor` tuples
+    instead of model instances.
+    """
+    timeout = getattr(settings, "NEIGHBORS_CACHE_TIMEOUT", 30)
+    if not timeout:
+        return Neighbor(*map(_get_cached_neighbor_data, get_neighbors(obj, results_set=results_set)))
+
+    from taiga.projects.services.data_version import get_project_data_version
+
+    project_results_set = _get_project_results_set(obj, results_set)
+    sql, params = project_results_set.query.get_compiler(project_results_set.db).as_sql()
+    query_hash = hashlib.sha1(force_bytes(repr((sql, params)))).hexdigest()
+    key = "neighbors-{}-{}-{}-{}".format(obj._meta.label_lower, obj.id,
+                                         get_project_data_version(obj.project_id), query_hash)
+
+    neighbors = cache.get(key)
+    if neighbors is None:
+        neighbors = get_neighbors(obj, results_set=project_results_set)
+        neighbors = Neighbor(*map(_get_cached_neighbor_data, neighbors))
+        cache.set(key, tuple(tuple(n) if n else None for n in neighbors), timeout=timeout)
+        return neighbors
+
+    return Neighbor(*(CachedNeighbor(*n) if n else None for n in neighbors))
+
+
 class NeighborSerializer(serializers.LightSerializer):
     id = Field()
     ref = Field()
@@ -106,7 +309,7 @@ class NeighborsSerializerMixin(serializers.LightSerializer):
         view, request = self.context.get("view", None), self.context.get("request", None)
         if view and request:
             queryset = view.filter_queryset(view.get_queryset())
-            left, right = get_neighbors(obj, results_set=queryset)
+            left, right = get_cached_neighbors(obj, results_set=queryset)
         else:
             left = right = None
 
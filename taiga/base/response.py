@@ -89,13 +89,7 @@ class Response(SimpleTemplateResponse):
         context["response"] = self
 
         charset = renderer.charset
-        content_type = self.content_type
-
-        if content_type is None and charset is not None:
-            content_type = "{0}; charset={1}".format(media_type, charset)
-        elif content_type is None:
-            content_type = media_type
-        self["Content-Type"] = content_type
+        self["Content-Type"] = self._get_content_type(renderer, media_type)
 
         ret = renderer.render(self.data, media_type, context)
         if isinstance(ret, six.text_type):
@@ -108,6 +102,32 @@ class Response(SimpleTemplateResponse):
 
         return ret
 
+    def _get_content_type(self, renderer, media_type):
+        if self.content_type is not None:
+            return self.content_type
+        if renderer.charset is not None:
+            return "{0}; charset={1}".format(media_type, renderer.charset)
+        return media_type
+
+    def to_streaming_response(self):
+        """
+        Return a StreamingHttpResponse with the data rendered in chunks by
+        the `render_iter` method of the renderer, and the headers of this
+        response.
+        """
+        renderer = self.accepted_renderer
+        media_type = self.accepted_media_type
+        context = self.renderer_context
+        context["response"] = self
+
+        content = renderer.render_iter(self.data, media_type, context)
+        response = http.StreamingHttpResponse(content, status=self.status_code)
+        for name, value in self.items():
+            response[name] = value
+        response["Content-Type"] = self._get_content_type(renderer, media_type)
+        response.data = self.data
+        return response
+
     @property
     def status_text(self):
         """
@@ -18,7 +18,6 @@
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import connection
-from django.db import DatabaseError
 from django.db import transaction
 from django.shortcuts import _get_queryset
 
@@ -124,42 +123,78 @@ def update_in_bulk(instances, list_of_new_values, callback=None, precall=None):
 
 
 @transaction.atomic
+def update_attrs_in_bulk_for_ids(values, attrs, model, chunk_size=1000):
+    """Update some attributes of a table using a list of ids.
+
+    The rows are updated in chunks, in id order (and locked in that order
+    before the update) to avoid deadlocks between concurrent bulk updates.
+
+    :params values: Dict of new values where the key is the pk of the element to update
+                    and the value is a tuple with the new values of `attrs` (in the same order).
+    :params attrs: tuple of attrs to update
+    :params model: Model of the ids.
+    :params chunk_size: Max number of rows updated per statement.
+
+    :return: Number of updated rows.
+    """
+    if not values:
+        return 0
+
+    tbl = model._meta.db_table
+    pk_field = model._meta.pk
+    fields = [model._meta.get_field(attr) for attr in attrs]
+
+    # rel_db_type because db_type of an AutoField is "serial"
+    row_sql = "({})".format(", ".join(
+        "%s::{}".format(field.rel_db_type(connection)) for field in [pk_field] + fields
+    ))
+    lock_sql = """
+        SELECT "{tbl}"."{pk}"
+          FROM "{tbl}"
+         WHERE "{tbl}"."{pk}" IN %s
+      ORDER BY "{tbl}"."{pk}"
+           FOR UPDATE
+    """
+    update_sql = """
+        UPDATE "{tbl}"
+           SET {assignments}
+          FROM (VALUES {rows}) AS update_values ("{pk}", {columns})
+         WHERE "{tbl}"."{pk}" = update_values."{pk}"
+    """
+    assignments = ", ".join('"{col}" = update_values."{col}"'.format(col=field.column) for field in fields)
+    columns = ", ".join('"{}"'.format(field.column) for field in fields)
+
+    updated = 0
+    ids = sorted(values.keys())
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+
+            cursor.execute(lock_sql.format(tbl=tbl, pk=pk_field.column), [tuple(chunk)])
+
+            params = []
+            for id in chunk:
+                params.append(id)
+                params.extend(values[id])
+
+            cursor.execute(update_sql.format(tbl=tbl, pk=pk_field.column, assignments=assignments,
+                                             columns=columns, rows=", ".join([row_sql] * len(chunk))),
+                           params)
+            updated += cursor.rowcount
+
+    return updated
+
+
 def update_attr_in_bulk_for_ids(values, attr, model):
     """Update a table using a list of ids.
 
     :params values: Dict of new values where the key is the pk of the element to update.
     :params attr: attr to update
     :params model: Model of the ids.
-    """
-    if not values:
-        return
 
-    values = [str((id, order)) for id, order in values.items()]
-    sql = """
-        UPDATE "{tbl}"
-        SET "{attr}"=update_values.column2
-        FROM (
-          VALUES
-            {values}
-        ) AS update_values
-        WHERE "{tbl}"."id"=update_values.column1;
-    """.format(tbl=model._meta.db_table,
-               values=', '.join(values),
-               attr=attr)
-
-    cursor = connection.cursor()
-
-    # We can have deadlocks with multiple updates over the same object
-    # In that situation we just retry
-    def _run_sql(retries=0, max_retries=3):
-        try:
-            cursor.execute(sql)
-        except DatabaseError:
-            print("retries", 0)
-            if retries < max_retries:
-                _run_sql(retries + 1)
-
-    transaction.on_commit(_run_sql)
+    :return: Number of updated rows.
+    """
+    return update_attrs_in_bulk_for_ids({id: (value,) for id, value in values.items()}, (attr,), model)
 
 
 def to_tsquery(term):
@@ -17,6 +17,8 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import csv
+
 from functools import wraps, partial
 from django.core.paginator import Paginator
 
@@ -58,3 +60,33 @@ def iter_queryset(queryset, itersize:int=20):
         page = paginator.page(page_num)
         for element in page.object_list:
             yield element
+
+
+def iter_queryset_in_chunks(queryset, chunk_size:int=500):
+    """
+    Iterate over all the objects of an ordered queryset loading them in
+    chunks of chunk_size objects. The prefetched relations are loaded by
+    chunk too, so only one chunk is in memory at any time.
+    """
+    ids = list(queryset.values_list("id", flat=True))
+    for start in range(0, len(ids), chunk_size):
+        yield from queryset.filter(id__in=ids[start:start + chunk_size])
+
+
+class _Echo:
+    """
+    A file-like object that returns what is written to it.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_csv(fieldnames, rows):
+    """
+    A generator of the lines of a CSV file with a header and a line
+    for every dict of rows.
+    """
+    writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+    yield writer.writerow(dict(zip(fieldnames, fieldnames)))
+    for row in rows:
+        yield writer.writerow(row)
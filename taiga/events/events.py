@@ -94,6 +94,10 @@ def emit_event_for_ids(ids, content_type:str, projectid:int, *,
     assert isinstance(ids, collections.Iterable)
     assert content_type, "'content_type' parameter is mandatory"
 
+    # The bulk updates don't send the model signals
+    from taiga.projects.services.data_version import bump_project_data_version
+    bump_project_data_version(projectid)
+
     app_name, model_name = content_type.split(".", 1)
     routing_key = "changes.project.{0}.{1}".format(projectid, app_name)
 
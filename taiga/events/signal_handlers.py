@@ -21,16 +21,42 @@ from django.db.models import signals
 from django.dispatch import receiver
 
 from taiga.base.utils.db import get_typename_for_model_instance
+from taiga.projects.services.data_version import bump_project_data_version
 
 from . import middleware as mw
 from . import events
 
 
+def _bump_project_data_version_for_model(instance, content_type):
+    if content_type == "projects.project":
+        project_id = instance.id
+    else:
+        project_id = getattr(instance, "project_id", None)
+
+    if project_id is not None:
+        bump_project_data_version(project_id)
+
+
+def _bump_project_data_version_for_user(instance, update_fields):
+    # The users data (name, photo...) is in the responses of their projects,
+    # but not the last login
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+
+    for project_id in instance.memberships.values_list("project_id", flat=True):
+        bump_project_data_version(project_id)
+
+
 def on_save_any_model(sender, instance, created, **kwargs):
+    content_type = get_typename_for_model_instance(instance)
+    _bump_project_data_version_for_model(instance, content_type)
+
+    if content_type == "users.user" and not created:
+        _bump_project_data_version_for_user(instance, kwargs.get("update_fields", None))
+
     # Ignore any object that can not have project_id
     if not hasattr(instance, "project_id"):
         return
-    content_type = get_typename_for_model_instance(instance)
 
     # Ignore any other events
     if content_type not in events.watched_types:
@@ -48,6 +74,7 @@ def on_save_any_model(sender, instance, created, **kwargs):
 def on_delete_any_model(sender, instance, **kwargs):
     # Ignore any object that can not have project_id
     content_type = get_typename_for_model_instance(instance)
+    _bump_project_data_version_for_model(instance, content_type)
 
     # Ignore any other changes
     if content_type not in events.watched_types:
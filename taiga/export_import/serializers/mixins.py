@@ -49,12 +49,12 @@ class HistoryExportSerializerMixin(serializers.LightSerializer):
     history = MethodField("get_history")
 
     def get_history(self, obj):
-        history_qs = history_service.get_history_queryset_by_model_instance(
+        history_entries = history_service.get_history_by_model_instance(
             obj,
             types=(history_models.HistoryType.change, history_models.HistoryType.create,)
         )
 
-        return HistoryExportSerializer(history_qs, many=True).data
+        return HistoryExportSerializer(history_entries, many=True).data
 
 
 class AttachmentExportSerializer(serializers.LightSerializer):
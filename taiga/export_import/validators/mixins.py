@@ -74,20 +74,9 @@ class WatcheableObjectModelValidatorMixin(validators.ModelValidator):
         return instance
 
     def save_watchers(self):
-        new_watcher_emails = set(self._watchers)
-        old_watcher_emails = set(self.object.get_watchers().values_list("email", flat=True))
-        adding_watcher_emails = list(new_watcher_emails.difference(old_watcher_emails))
-        removing_watcher_emails = list(old_watcher_emails.difference(new_watcher_emails))
-
         User = get_user_model()
-        adding_users = User.objects.filter(email__in=adding_watcher_emails)
-        removing_users = User.objects.filter(email__in=removing_watcher_emails)
-
-        for user in adding_users:
-            notifications_services.add_watcher(self.object, user)
-
-        for user in removing_users:
-            notifications_services.remove_watcher(self.object, user)
+        watcher_ids = User.objects.filter(email__in=set(self._watchers)).values_list("id", flat=True)
+        notifications_services.set_watchers(self.object, watcher_ids)
 
         self.object.watchers = [user.email for user in self.object.get_watchers()]
 
@@ -22,28 +22,54 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
+import re
+
 from django.contrib.auth import get_user_model
 
 from markdown.extensions import Extension
 from markdown.inlinepatterns import Pattern
+from markdown.preprocessors import Preprocessor
 from markdown.util import etree, AtomicString
 
 
+MENTION_RE = r"(@)([\w.-]+)"
+
+
 class MentionsExtension(Extension):
     def extendMarkdown(self, md, md_globals):
-        MENTION_RE = r"(@)([\w.-]+)"
+        md.mentioned_users = {}
+        md.preprocessors.add("mentions", MentionsPreprocessor(md), "_end")
+
         mentionsPattern = MentionsPattern(MENTION_RE)
         mentionsPattern.md = md
         md.inlinePatterns.add("mentions", mentionsPattern, "_end")
 
 
+class MentionsPreprocessor(Preprocessor):
+    """
+    Collect every candidate username of the text and resolve all of them
+    with one query, so the inline pattern doesn't hit the database per match.
+    """
+    def run(self, lines):
+        pattern = re.compile(MENTION_RE)
+
+        usernames = set()
+        for line in lines:
+            usernames.update(m.group(2) for m in pattern.finditer(line))
+
+        if usernames:
+            users = get_user_model().objects.filter(username__in=usernames)
+            self.markdown.mentioned_users = {user.username: user for user in users}
+
+        return lines
+
+
 class MentionsPattern(Pattern):
     def handleMatch(self, m):
         username = m.group(3)
 
-        try:
-            user = get_user_model().objects.get(username=username)
-        except get_user_model().DoesNotExist:
+        user = self.md.mentioned_users.get(username, None)
+        if user is None:
             return "@{}".format(username)
 
         url = "/profile/{}".format(username)
@@ -23,26 +23,58 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import re
+
 from markdown.extensions import Extension
 from markdown.inlinepatterns import Pattern
+from markdown.preprocessors import Preprocessor
 from markdown.util import etree
 
-from taiga.projects.references.services import get_instance_by_ref
+from taiga.projects.references.services import get_instances_by_refs
 from taiga.front.templatetags.functions import resolve
 
 
+TAIGA_REFERENCE_RE = r'(?<=^|(?<=[^a-zA-Z0-9-\[]))#(\d+)'
+
+
 class TaigaReferencesExtension(Extension):
     def __init__(self, project, *args, **kwargs):
         self.project = project
         return super().__init__(*args, **kwargs)
 
     def extendMarkdown(self, md, md_globals):
-        TAIGA_REFERENCE_RE = r'(?<=^|(?<=[^a-zA-Z0-9-\[]))#(\d+)'
+        md.referenced_instances = {}
+        md.preprocessors.add('taiga-references',
+                             TaigaReferencesPreprocessor(md, self.project),
+                             '_end')
+
         referencesPattern = TaigaReferencesPattern(TAIGA_REFERENCE_RE, self.project)
         referencesPattern.md = md
         md.inlinePatterns.add('taiga-references', referencesPattern, '_begin')
 
 
+class TaigaReferencesPreprocessor(Preprocessor):
+    """
+    Collect every candidate ref of the text and resolve all of them (and their
+    content objects) at once, so the inline pattern only reads from the map.
+    """
+    def __init__(self, md, project):
+        self.project = project
+        super().__init__(md)
+
+    def run(self, lines):
+        pattern = re.compile(TAIGA_REFERENCE_RE)
+
+        obj_refs = set()
+        for line in lines:
+            obj_refs.update(m.group(1) for m in pattern.finditer(line))
+
+        if obj_refs:
+            self.markdown.referenced_instances = get_instances_by_refs(self.project.id, obj_refs)
+
+        return lines
+
+
 class TaigaReferencesPattern(Pattern):
     def __init__(self, pattern, project):
         self.project = project
@@ -51,7 +83,7 @@ class TaigaReferencesPattern(Pattern):
     def handleMatch(self, m):
         obj_ref = m.group(2)
 
-        instance = get_instance_by_ref(self.project.id, obj_ref)
+        instance = self.md.referenced_instances.get(int(obj_ref), None)
         if instance is None or instance.content_object is None:
             return "#{}".format(obj_ref)
 
@@ -87,10 +87,14 @@ def _make_extensions_list(project=None):
 import diff_match_patch
 
 
+def get_text_hash(text):
+    return hashlib.sha1(force_bytes(text)).hexdigest()
+
+
 def cache_by_sha(func):
     @functools.wraps(func)
     def _decorator(project, text):
-        sha1_hash = hashlib.sha1(force_bytes(text)).hexdigest()
+        sha1_hash = get_text_hash(text)
         key = "{}-{}".format(sha1_hash, project.id)
 
         # Try to get it from the cache
@@ -172,4 +176,4 @@ def get_diff_of_htmls(html1, html2):
     return diffutil.diff_pretty_html(diffs)
 
 
-__all__ = ["render", "get_diff_of_htmls", "render_and_extract"]
+__all__ = ["render", "get_diff_of_htmls", "render_and_extract", "get_text_hash"]
@@ -17,9 +17,21 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from functools import lru_cache
+
 from .choices import ADMINS_PERMISSIONS, MEMBERS_PERMISSIONS, ANON_PERMISSIONS
 
 from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.db import transaction
+
+_ADMINS_PERMISSIONS = tuple(map(lambda perm: perm[0], ADMINS_PERMISSIONS))
+_MEMBERS_PERMISSIONS = tuple(map(lambda perm: perm[0], MEMBERS_PERMISSIONS))
+_ANON_PERMISSIONS = tuple(map(lambda perm: perm[0], ANON_PERMISSIONS))
+
+# (is_member, is_admin, role_permissions)
+_NO_MEMBER_DATA = (False, False, ())
 
 
 def _get_user_project_membership(user, project, cache="user"):
@@ -90,36 +102,118 @@ def _get_membership_permissions(membership):
     return []
 
 
-def calculate_permissions(is_authenticated=False, is_superuser=False, is_member=False,
-                          is_admin=False, role_permissions=[], anon_permissions=[],
-                          public_permissions=[]):
+@lru_cache(maxsize=1024)
+def _calculate_permissions(is_authenticated, is_superuser, is_member, is_admin, role_permissions,
+                           anon_permissions, public_permissions):
     if is_superuser:
-        admins_permissions = list(map(lambda perm: perm[0], ADMINS_PERMISSIONS))
-        members_permissions = list(map(lambda perm: perm[0], MEMBERS_PERMISSIONS))
-        public_permissions = []
-        anon_permissions = list(map(lambda perm: perm[0], ANON_PERMISSIONS))
+        admins_permissions = _ADMINS_PERMISSIONS
+        members_permissions = _MEMBERS_PERMISSIONS
+        public_permissions = ()
+        anon_permissions = _ANON_PERMISSIONS
     elif is_member:
         if is_admin:
-            admins_permissions = list(map(lambda perm: perm[0], ADMINS_PERMISSIONS))
-            members_permissions = list(map(lambda perm: perm[0], MEMBERS_PERMISSIONS))
+            admins_permissions = _ADMINS_PERMISSIONS
+            members_permissions = _MEMBERS_PERMISSIONS
         else:
-            admins_permissions = []
-            members_permissions = []
+            admins_permissions = ()
+            members_permissions = ()
         members_permissions = members_permissions + role_permissions
-        public_permissions = public_permissions if public_permissions is not None else []
-        anon_permissions = anon_permissions if anon_permissions is not None else []
     elif is_authenticated:
-        admins_permissions = []
-        members_permissions = []
-        public_permissions = public_permissions if public_permissions is not None else []
-        anon_permissions = anon_permissions if anon_permissions is not None else []
+        admins_permissions = ()
+        members_permissions = ()
     else:
-        admins_permissions = []
-        members_permissions = []
-        public_permissions = []
-        anon_permissions = anon_permissions if anon_permissions is not None else []
+        admins_permissions = ()
+        members_permissions = ()
+        public_permissions = ()
 
-    return set(admins_permissions + members_permissions + public_permissions + anon_permissions)
+    return frozenset(admins_permissions + members_permissions + public_permissions + anon_permissions)
+
+
+def calculate_permissions(is_authenticated=False, is_superuser=False, is_member=False,
+                          is_admin=False, role_permissions=[], anon_permissions=[],
+                          public_permissions=[]):
+    """
+    Return a frozenset with the permissions. The result is memoized for every
+    combination of arguments.
+    """
+    return _calculate_permissions(bool(is_authenticated), bool(is_superuser), bool(is_member),
+                                  bool(is_admin), tuple(role_permissions or ()),
+                                  tuple(anon_permissions or ()), tuple(public_permissions or ()))
+
+
+def _get_permissions_version_key(project_id):
+    return "permissions-version-{}".format(project_id)
+
+
+def _get_member_data_key(user_id, project_id, version):
+    return "permissions-member-{}-{}-{}".format(user_id, project_id, version)
+
+
+def _invalidate_project_permissions(project_id):
+    version_key = _get_permissions_version_key(project_id)
+    try:
+        django_cache.incr(version_key)
+    except ValueError:
+        django_cache.set(version_key, 1, timeout=None)
+
+
+def get_project_permissions_version(project_id):
+    """
+    Return the version of the permissions of the members of a project. It
+    changes every time they are invalidated.
+    """
+    return django_cache.get(_get_permissions_version_key(project_id), 0)
+
+
+def invalidate_project_permissions(project_id):
+    """
+    Discard the cached permissions of the members of a project. It must be
+    called when its memberships or roles are changed.
+
+    It's done again after the current transaction is committed so a request
+    that reads the memberships before the commit can't keep old data cached.
+    """
+    _invalidate_project_permissions(project_id)
+    transaction.on_commit(lambda: _invalidate_project_permissions(project_id))
+
+
+def _get_user_project_member_data(user, project, cache="user"):
+    """
+    Return a tuple (is_member, is_admin, role_permissions) with the membership data
+    of the user in the project.
+
+    They are cached in the user instance (for the current request) and, if
+    PERMISSIONS_CACHE_TIMEOUT is set (0 by default), in the django cache for that number of
+    seconds, versioned by project. It must be a cache shared by all the processes (Redis,
+    Memcached...), with a per process cache the others don't see the invalidations.
+    """
+    if user.is_anonymous():
+        return _NO_MEMBER_DATA
+
+    if user._cached_member_data is None:
+        user._cached_member_data = {}
+    elif project.id in user._cached_member_data:
+        return user._cached_member_data[project.id]
+
+    timeout = getattr(settings, "PERMISSIONS_CACHE_TIMEOUT", 0)
+    member_data = None
+    if timeout:
+        version = get_project_permissions_version(project.id)
+        key = _get_member_data_key(user.id, project.id, version)
+        member_data = django_cache.get(key)
+
+    if member_data is None:
+        membership = _get_user_project_membership(user, project, cache=cache)
+        if membership is None:
+            member_data = _NO_MEMBER_DATA
+        else:
+            member_data = (True, membership.is_admin, tuple(_get_membership_permissions(membership)))
+
+        if timeout:
+            django_cache.set(key, member_data, timeout=timeout)
+
+    user._cached_member_data[project.id] = member_data
+    return member_data
 
 
 def get_user_project_permissions(user, project, cache="user"):
@@ -127,15 +221,18 @@ def get_user_project_permissions(user, project, cache="user"):
     cache param determines how memberships are calculated trying to reuse the existing data
     in cache
     """
-    membership = _get_user_project_membership(user, project, cache=cache)
-    is_member = membership is not None
-    is_admin = is_member and membership.is_admin
+    if user.is_superuser:
+        member_data = _NO_MEMBER_DATA
+    else:
+        member_data = _get_user_project_member_data(user, project, cache=cache)
+
+    is_member, is_admin, role_permissions = member_data
     return calculate_permissions(
         is_authenticated = user.is_authenticated(),
         is_superuser =  user.is_superuser,
         is_member = is_member,
         is_admin = is_admin,
-        role_permissions = _get_membership_permissions(membership),
+        role_permissions = role_permissions,
         anon_permissions = project.anon_permissions,
         public_permissions = project.public_permissions
     )
@@ -47,6 +47,8 @@ from taiga.projects.issues.models import Issue
 from taiga.projects.likes.mixins.viewsets import LikedResourceMixin, FansViewSetMixin
 from taiga.projects.notifications.mixins import WatchersViewSetMixin
 from taiga.projects.notifications.choices import NotifyLevel
+from taiga.projects.mixins.cache import PublicResponseCacheMixin
+from taiga.projects.mixins.conditional import ConditionalGetMixin
 from taiga.projects.mixins.on_destroy import MoveOnDestroyMixin
 from taiga.projects.mixins.ordering import BulkUpdateOrderMixin
 from taiga.projects.tasks.models import Task
@@ -68,7 +70,8 @@ from . import utils as project_utils
 
 class ProjectViewSet(LikedResourceMixin, HistoryResourceMixin,
                      BlockeableSaveMixin, BlockeableDeleteMixin,
-                     TagsColorsResourceMixin, ModelCrudViewSet):
+                     TagsColorsResourceMixin, ConditionalGetMixin, PublicResponseCacheMixin,
+                     ModelCrudViewSet):
     validator_class = validators.ProjectValidator
     queryset = models.Project.objects.all()
     permission_classes = (permissions.ProjectPermission, )
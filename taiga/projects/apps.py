@@ -36,12 +36,19 @@ def connect_projects_signals():
                              sender=apps.get_model("projects", "Project"),
                              dispatch_uid="tags_normalization_projects")
 
+    # On project object is changed, discard the cached permissions of its members.
+    signals.post_save.connect(handlers.project_invalidate_permissions,
+                              sender=apps.get_model("projects", "Project"),
+                              dispatch_uid="project_invalidate_permissions")
+
 
 def disconnect_projects_signals():
     signals.post_save.disconnect(sender=apps.get_model("projects", "Project"),
                                  dispatch_uid='project_post_save')
     signals.pre_save.disconnect(sender=apps.get_model("projects", "Project"),
                                 dispatch_uid="tags_normalization_projects")
+    signals.post_save.disconnect(sender=apps.get_model("projects", "Project"),
+                                 dispatch_uid="project_invalidate_permissions")
 
 
 ## Memberships Signals
@@ -58,11 +65,43 @@ def connect_memberships_signals():
                               sender=apps.get_model("projects", "Membership"),
                               dispatch_uid='create-notify-policy')
 
+    # On membership object is changed or deleted, discard the cached permissions of the project members.
+    signals.post_save.connect(handlers.membership_or_role_invalidate_permissions,
+                              sender=apps.get_model("projects", "Membership"),
+                              dispatch_uid="membership_post_save_invalidate_permissions")
+    signals.post_delete.connect(handlers.membership_or_role_invalidate_permissions,
+                                sender=apps.get_model("projects", "Membership"),
+                                dispatch_uid="membership_post_delete_invalidate_permissions")
+
 def disconnect_memberships_signals():
     signals.pre_delete.disconnect(sender=apps.get_model("projects", "Membership"),
                                   dispatch_uid='membership_pre_delete')
     signals.post_save.disconnect(sender=apps.get_model("projects", "Membership"),
                                  dispatch_uid='create-notify-policy')
+    signals.post_save.disconnect(sender=apps.get_model("projects", "Membership"),
+                                 dispatch_uid="membership_post_save_invalidate_permissions")
+    signals.post_delete.disconnect(sender=apps.get_model("projects", "Membership"),
+                                   dispatch_uid="membership_post_delete_invalidate_permissions")
+
+
+## Roles Signals
+
+def connect_roles_signals():
+    from . import signals as handlers
+    # On role object is changed or deleted, discard the cached permissions of the project members.
+    signals.post_save.connect(handlers.membership_or_role_invalidate_permissions,
+                              sender=apps.get_model("users", "Role"),
+                              dispatch_uid="role_post_save_invalidate_permissions")
+    signals.post_delete.connect(handlers.membership_or_role_invalidate_permissions,
+                                sender=apps.get_model("users", "Role"),
+                                dispatch_uid="role_post_delete_invalidate_permissions")
+
+
+def disconnect_roles_signals():
+    signals.post_save.disconnect(sender=apps.get_model("users", "Role"),
+                                 dispatch_uid="role_post_save_invalidate_permissions")
+    signals.post_delete.disconnect(sender=apps.get_model("users", "Role"),
+                                   dispatch_uid="role_post_delete_invalidate_permissions")
 
 
 ## US Statuses Signals
@@ -102,5 +141,6 @@ class ProjectsAppConfig(AppConfig):
     def ready(self):
         connect_projects_signals()
         connect_memberships_signals()
+        connect_roles_signals()
         connect_us_status_signals()
         connect_task_status_signals()
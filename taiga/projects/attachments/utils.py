@@ -45,3 +45,25 @@ def attach_basic_attachments(queryset, as_field="attachments_attr"):
     sql = sql.format(tbl=model._meta.db_table, type_id=type.id)
     queryset = queryset.extra(select={as_field: sql})
     return queryset
+
+
+def attach_total_attachments(queryset, as_field="total_attachments_attr"):
+    """Attach the number of attachments to each object of the queryset.
+
+    :param queryset: A Django queryset object.
+    :param as_field: Attach the number of attachments as an attribute with this name.
+
+    :return: Queryset object with the additional `as_field` field.
+    """
+
+    model = queryset.model
+    type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
+
+    sql = """SELECT COUNT(attachments_attachment.id)
+               FROM attachments_attachment
+              WHERE attachments_attachment.object_id = {tbl}.id
+                AND attachments_attachment.content_type_id = {type_id}"""
+
+    sql = sql.format(tbl=model._meta.db_table, type_id=type.id)
+    queryset = queryset.extra(select={as_field: sql})
+    return queryset
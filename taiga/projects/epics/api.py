@@ -16,7 +16,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils.translation import ugettext as _
 
 from taiga.base.api.utils import get_object_or_404
@@ -30,6 +30,7 @@ from taiga.base.utils import json
 
 from taiga.projects.history.mixins import HistoryResourceMixin
 from taiga.projects.mixins.by_ref import ByRefMixin
+from taiga.projects.mixins.conditional import ConditionalGetMixin
 from taiga.projects.models import Project, EpicStatus
 from taiga.projects.notifications.mixins import WatchedResourceMixin, WatchersViewSetMixin
 from taiga.projects.occ import OCCResourceMixin
@@ -47,7 +48,8 @@ from . import utils as epics_utils
 
 
 class EpicViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixin, WatchedResourceMixin,
-                  ByRefMixin, TaggedResourceMixin, BlockedByProjectMixin, ModelCrudViewSet):
+                  ByRefMixin, TaggedResourceMixin, ConditionalGetMixin, BlockedByProjectMixin,
+                  ModelCrudViewSet):
     validator_class = validators.EpicValidator
     queryset = models.Epic.objects.all()
     permission_classes = (permissions.EpicPermission,)
@@ -160,19 +162,20 @@ class EpicViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixin, Wa
         project_id = request.QUERY_PARAMS.get("project", None)
         project = get_object_or_404(Project, id=project_id)
 
-        filter_backends = self.get_filter_backends()
-        statuses_filter_backends = (f for f in filter_backends if f != filters.StatusesFilter)
-        assigned_to_filter_backends = (f for f in filter_backends if f != filters.AssignedToFilter)
-        owners_filter_backends = (f for f in filter_backends if f != filters.OwnersFilter)
-
-        queryset = self.get_queryset()
-        querysets = {
-            "statuses": self.filter_queryset(queryset, filter_backends=statuses_filter_backends),
-            "assigned_to": self.filter_queryset(queryset, filter_backends=assigned_to_filter_backends),
-            "owners": self.filter_queryset(queryset, filter_backends=owners_filter_backends),
-            "tags": self.filter_queryset(queryset)
+        facets_filter_backends = {
+            "statuses": filters.StatusesFilter,
+            "assigned_to": filters.AssignedToFilter,
+            "owners": filters.OwnersFilter,
         }
-        return response.Ok(services.get_epics_filters_data(project, querysets))
+        filter_backends = (f for f in self.get_filter_backends() if f not in facets_filter_backends.values())
+        queryset = self.filter_queryset(self.get_queryset(), filter_backends=filter_backends)
+
+        facets_querysets = {}
+        for name, filter_backend in facets_filter_backends.items():
+            facets_querysets[name] = self.filter_queryset(models.Epic.objects.all(),
+                                                          filter_backends=[filter_backend])
+
+        return response.Ok(services.get_epics_filters_data(project, queryset, facets_querysets))
 
     @list_route(methods=["GET"])
     def csv(self, request):
@@ -182,8 +185,8 @@ class EpicViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixin, Wa
 
         project = get_object_or_404(Project, epics_csv_uuid=uuid)
         queryset = project.epics.all().order_by('ref')
-        data = services.epics_to_csv(project, queryset)
-        csv_response = HttpResponse(data.getvalue(), content_type='application/csv; charset=utf-8')
+        data = services.iter_epics_csv(project, queryset)
+        csv_response = StreamingHttpResponse(data, content_type='application/csv; charset=utf-8')
         csv_response['Content-Disposition'] = 'attachment; filename="epics.csv"'
         return csv_response
 
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('epics', '0004_auto_20160928_0540'),
+        ('notifications', '0006_auto_20151103_0954'),
+        ('votes', '0002_auto_20150805_1600'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='epic',
+            name='cached_watcher_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=[], editable=False, size=None, verbose_name='cached watcher ids'),
+        ),
+        migrations.AddField(
+            model_name='epic',
+            name='cached_total_voters',
+            field=models.PositiveIntegerField(blank=True, default=0, editable=False, verbose_name='cached total voters'),
+        ),
+        migrations.RunSQL(
+            """
+                UPDATE "epics_epic"
+                   SET "cached_watcher_ids" = ARRAY(SELECT "notifications_watched"."user_id"
+                                                      FROM "notifications_watched"
+                                                     WHERE "notifications_watched"."content_type_id" = (SELECT "id" FROM "django_content_type" WHERE "app_label" = 'epics' AND "model" = 'epic')
+                                                       AND "notifications_watched"."object_id" = "epics_epic"."id"
+                                                  ORDER BY "notifications_watched"."id");
+
+                UPDATE "epics_epic"
+                   SET "cached_total_voters" = "votes_votes"."count"
+                  FROM "votes_votes"
+                 WHERE "votes_votes"."content_type_id" = (SELECT "id" FROM "django_content_type" WHERE "app_label" = 'epics' AND "model" = 'epic')
+                   AND "votes_votes"."object_id" = "epics_epic"."id";
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
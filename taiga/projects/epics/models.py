@@ -27,10 +27,13 @@ from taiga.base.utils.time import timestamp_ms
 from taiga.projects.tagging.models import TaggedMixin
 from taiga.projects.occ import OCCModelMixin
 from taiga.projects.notifications.mixins import WatchedModelMixin
+from taiga.projects.notifications.models import CachedWatchersMixin
+from taiga.projects.votes.models import CachedVotersMixin
 from taiga.projects.mixins.blocked import BlockedMixin
 
 
-class Epic(OCCModelMixin, WatchedModelMixin, BlockedMixin, TaggedMixin, models.Model):
+class Epic(OCCModelMixin, WatchedModelMixin, BlockedMixin, TaggedMixin,
+           CachedWatchersMixin, CachedVotersMixin, models.Model):
     ref = models.BigIntegerField(db_index=True, null=True, blank=True, default=None,
                                  verbose_name=_("ref"))
     project = models.ForeignKey("projects.Project", null=False, blank=False,
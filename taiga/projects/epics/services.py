@@ -16,25 +16,23 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import csv
 import io
-from collections import OrderedDict
-from operator import itemgetter
-from contextlib import closing
-
-from django.db import connection
-from django.utils.translation import ugettext as _
 
 from taiga.base.utils import db, text
+from taiga.base.utils.iterators import iter_csv, iter_queryset_in_chunks
 from taiga.projects.epics.apps import connect_epics_signals
 from taiga.projects.epics.apps import disconnect_epics_signals
 from taiga.projects.services import apply_order_updates
+from taiga.projects.services import filters_data
+from taiga.projects.services import get_base_orders
 from taiga.projects.userstories.apps import connect_userstories_signals
 from taiga.projects.userstories.apps import disconnect_userstories_signals
 from taiga.projects.userstories.services import get_userstories_from_bulk
 from taiga.events import events
 from taiga.projects.votes.utils import attach_total_voters_to_queryset
 from taiga.projects.notifications.utils import attach_watchers_to_queryset
+from taiga.projects.attachments.utils import attach_total_attachments
+from taiga.projects.epics.utils import attach_related_user_stories_refs
 
 from . import models
 
@@ -85,8 +83,8 @@ def update_epics_order_in_bulk(bulk_data: list, field: str, project: object):
     """
     epics = project.epics.all()
 
-    epic_orders = {e.id: getattr(e, field) for e in epics}
     new_epic_orders = {d["epic_id"]: d["order"] for d in bulk_data}
+    epic_orders = get_base_orders(epics, field, new_epic_orders)
     apply_order_updates(epic_orders, new_epic_orders)
 
     epic_ids = epic_orders.keys()
@@ -160,60 +158,66 @@ def update_epic_related_userstories_order_in_bulk(bulk_data: list, epic: object)
 # CSV
 #####################################################
 
-def epics_to_csv(project, queryset):
-    csv_data = io.StringIO()
+def iter_epics_csv(project, queryset):
+    """
+    Return a generator of the lines of the CSV file with the epics of
+    the queryset. They are loaded in chunks, so it can be streamed.
+    """
     fieldnames = ["ref", "subject", "description", "owner", "owner_full_name", "assigned_to",
                   "assigned_to_full_name", "status", "epics_order", "client_requirement",
                   "team_requirement", "attachments", "tags", "watchers", "voters",
                   "created_date", "modified_date", "related_user_stories"]
 
-    custom_attrs = project.epiccustomattributes.all()
+    custom_attrs = list(project.epiccustomattributes.all())
     for custom_attr in custom_attrs:
         fieldnames.append(custom_attr.name)
 
-    queryset = queryset.prefetch_related("attachments",
-                                         "custom_attributes_values",
-                                         "user_stories__project")
     queryset = queryset.select_related("owner",
                                        "assigned_to",
                                        "status",
-                                       "project")
+                                       "project",
+                                       "custom_attributes_values")
 
     queryset = attach_total_voters_to_queryset(queryset)
     queryset = attach_watchers_to_queryset(queryset)
+    queryset = attach_total_attachments(queryset)
+    queryset = attach_related_user_stories_refs(queryset)
+
+    def _iter_rows():
+        for epic in iter_queryset_in_chunks(queryset):
+            epic_data = {
+                "ref": epic.ref,
+                "subject": epic.subject,
+                "description": epic.description,
+                "owner": epic.owner.username if epic.owner else None,
+                "owner_full_name": epic.owner.get_full_name() if epic.owner else None,
+                "assigned_to": epic.assigned_to.username if epic.assigned_to else None,
+                "assigned_to_full_name": epic.assigned_to.get_full_name() if epic.assigned_to else None,
+                "status": epic.status.name if epic.status else None,
+                "epics_order": epic.epics_order,
+                "client_requirement": epic.client_requirement,
+                "team_requirement": epic.team_requirement,
+                "attachments": epic.total_attachments_attr,
+                "tags": ",".join(epic.tags or []),
+                "watchers": epic.watchers,
+                "voters": epic.total_voters,
+                "created_date": epic.created_date,
+                "modified_date": epic.modified_date,
+                "related_user_stories": ",".join(epic.related_user_stories_refs_attr),
+            }
+
+            for custom_attr in custom_attrs:
+                value = epic.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
+                epic_data[custom_attr.name] = value
+
+            yield epic_data
+
+    return iter_csv(fieldnames, _iter_rows())
 
-    writer = csv.DictWriter(csv_data, fieldnames=fieldnames)
-    writer.writeheader()
-    for epic in queryset:
-        epic_data = {
-            "ref": epic.ref,
-            "subject": epic.subject,
-            "description": epic.description,
-            "owner": epic.owner.username if epic.owner else None,
-            "owner_full_name": epic.owner.get_full_name() if epic.owner else None,
-            "assigned_to": epic.assigned_to.username if epic.assigned_to else None,
-            "assigned_to_full_name": epic.assigned_to.get_full_name() if epic.assigned_to else None,
-            "status": epic.status.name if epic.status else None,
-            "epics_order": epic.epics_order,
-            "client_requirement": epic.client_requirement,
-            "team_requirement": epic.team_requirement,
-            "attachments": epic.attachments.count(),
-            "tags": ",".join(epic.tags or []),
-            "watchers": epic.watchers,
-            "voters": epic.total_voters,
-            "created_date": epic.created_date,
-            "modified_date": epic.modified_date,
-            "related_user_stories": ",".join([
-                "{}#{}".format(us.project.slug, us.ref) for us in epic.user_stories.all()
-            ]),
-        }
-
-        for custom_attr in custom_attrs:
-            value = epic.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
-            epic_data[custom_attr.name] = value
-
-        writer.writerow(epic_data)
 
+def epics_to_csv(project, queryset):
+    csv_data = io.StringIO()
+    csv_data.writelines(iter_epics_csv(project, queryset))
     return csv_data
 
 
@@ -221,211 +225,27 @@ def epics_to_csv(project, queryset):
 # Api filter data
 #####################################################
 
-def _get_epics_statuses(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-      SELECT "projects_epicstatus"."id",
-             "projects_epicstatus"."name",
-             "projects_epicstatus"."color",
-             "projects_epicstatus"."order",
-             (SELECT count(*)
-                FROM "epics_epic"
-                     INNER JOIN "projects_project" ON
-                                ("epics_epic"."project_id" = "projects_project"."id")
-               WHERE {where} AND "epics_epic"."status_id" = "projects_epicstatus"."id")
-        FROM "projects_epicstatus"
-       WHERE "projects_epicstatus"."project_id" = %s
-    ORDER BY "projects_epicstatus"."order";
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, name, color, order, count in rows:
-        result.append({
-            "id": id,
-            "name": _(name),
-            "color": color,
-            "order": order,
-            "count": count,
-        })
-    return sorted(result, key=itemgetter("order"))
-
-
-def _get_epics_assigned_to(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-        WITH counters AS (
-                SELECT assigned_to_id,  count(assigned_to_id) count
-                  FROM "epics_epic"
-            INNER JOIN "projects_project" ON ("epics_epic"."project_id" = "projects_project"."id")
-                 WHERE {where} AND "epics_epic"."assigned_to_id" IS NOT NULL
-              GROUP BY assigned_to_id
-        )
-
-                 SELECT "projects_membership"."user_id" user_id,
-                        "users_user"."full_name",
-                        "users_user"."username",
-                        COALESCE("counters".count, 0) count
-                   FROM projects_membership
-        LEFT OUTER JOIN counters ON ("projects_membership"."user_id" = "counters"."assigned_to_id")
-             INNER JOIN "users_user" ON ("projects_membership"."user_id" = "users_user"."id")
-                  WHERE "projects_membership"."project_id" = %s
-                    AND "projects_membership"."user_id" IS NOT NULL
-
-        -- unassigned epics
-        UNION
-
-                 SELECT NULL user_id, NULL, NULL, count(coalesce(assigned_to_id, -1)) count
-                   FROM "epics_epic"
-             INNER JOIN "projects_project" ON ("epics_epic"."project_id" = "projects_project"."id")
-                  WHERE {where} AND "epics_epic"."assigned_to_id" IS NULL
-               GROUP BY assigned_to_id
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id] + where_params)
-        rows = cursor.fetchall()
-
-    result = []
-    none_valued_added = False
-    for id, full_name, username, count in rows:
-        result.append({
-            "id": id,
-            "full_name": full_name or username or "",
-            "count": count,
-        })
-
-        if id is None:
-            none_valued_added = True
-
-    # If there was no epic with null assigned_to we manually add it
-    if not none_valued_added:
-        result.append({
-            "id": None,
-            "full_name": "",
-            "count": 0,
-        })
-
-    return sorted(result, key=itemgetter("full_name"))
-
-
-def _get_epics_owners(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-        WITH counters AS (
-                SELECT "epics_epic"."owner_id" owner_id,
-                       count(coalesce("epics_epic"."owner_id", -1)) count
-                  FROM "epics_epic"
-            INNER JOIN "projects_project" ON ("epics_epic"."project_id" = "projects_project"."id")
-                 WHERE {where}
-              GROUP BY "epics_epic"."owner_id"
-        )
-
-                 SELECT "projects_membership"."user_id" id,
-                        "users_user"."full_name",
-                        "users_user"."username",
-                        COALESCE("counters".count, 0) count
-                   FROM projects_membership
-        LEFT OUTER JOIN counters ON ("projects_membership"."user_id" = "counters"."owner_id")
-             INNER JOIN "users_user" ON ("projects_membership"."user_id" = "users_user"."id")
-                  WHERE "projects_membership"."project_id" = %s
-                    AND "projects_membership"."user_id" IS NOT NULL
-
-        -- System users
-        UNION
-
-                 SELECT "users_user"."id" user_id,
-                        "users_user"."full_name" full_name,
-                        "users_user"."username" username,
-                        COALESCE("counters".count, 0) count
-                   FROM users_user
-        LEFT OUTER JOIN counters ON ("users_user"."id" = "counters"."owner_id")
-                  WHERE ("users_user"."is_system" IS TRUE)
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, full_name, username, count in rows:
-        if count > 0:
-            result.append({
-                "id": id,
-                "full_name": full_name or username or "",
-                "count": count,
-            })
-    return sorted(result, key=itemgetter("full_name"))
-
-
-def _get_epics_tags(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-        WITH epics_tags AS (
-                    SELECT tag,
-                           COUNT(tag) counter FROM (
-                                SELECT UNNEST(epics_epic.tags) tag
-                                  FROM epics_epic
-                            INNER JOIN projects_project
-                                        ON (epics_epic.project_id = projects_project.id)
-                                 WHERE {where}) tags
-                  GROUP BY tag),
-             project_tags AS (
-                    SELECT reduce_dim(tags_colors) tag_color
-                      FROM projects_project
-                     WHERE id=%s)
-
-      SELECT tag_color[1] tag,
-             tag_color[2] color,
-             COALESCE(epics_tags.counter, 0) counter
-        FROM project_tags
-   LEFT JOIN epics_tags ON project_tags.tag_color[1] = epics_tags.tag
-    ORDER BY tag
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for name, color, count in rows:
-        result.append({
-            "name": name,
-            "color": color,
-            "count": count,
-        })
-    return sorted(result, key=itemgetter("name"))
-
-
-def get_epics_filters_data(project, querysets):
+_FILTERS_DATA_FACETS = (
+    filters_data.CatalogFacet("statuses", '"epics_epic"."status_id"', "projects_epicstatus"),
+    filters_data.AssignedToFacet("assigned_to", '"epics_epic"."assigned_to_id"'),
+    filters_data.OwnersFacet("owners", '"epics_epic"."owner_id"'),
+    filters_data.TagsFacet("tags", '"epics_epic"."tags"'),
+)
+
+_FILTERS_DATA_FROM = """
+                   "epics_epic"
+        INNER JOIN "projects_project"
+                ON ("epics_epic"."project_id" = "projects_project"."id")
+"""
+
+
+def get_epics_filters_data(project, queryset, facets_querysets):
     """
     Given a project and an epics queryset, return a simple data structure
     of all possible filters for the epics in the queryset.
+    
+    The queryset is filtered with all the filters but the ones of the statuses,
+    assigned_to and owners facets, that are in facets_querysets.
     """
-    data = OrderedDict([
-        ("statuses", _get_epics_statuses(project, querysets["statuses"])),
-        ("assigned_to", _get_epics_assigned_to(project, querysets["assigned_to"])),
-        ("owners", _get_epics_owners(project, querysets["owners"])),
-        ("tags", _get_epics_tags(project, querysets["tags"])),
-    ])
-
-    return data
+    return filters_data.get_filters_data(project, _FILTERS_DATA_FACETS, queryset, facets_querysets,
+                                         from_sql=_FILTERS_DATA_FROM)
@@ -53,3 +53,27 @@ def attach_user_stories_counts_to_queryset(queryset, as_field="user_stories_coun
     sql = sql.format(tbl=model._meta.db_table)
     queryset = queryset.extra(select={as_field: sql})
     return queryset
+
+
+def attach_related_user_stories_refs(queryset, as_field="related_user_stories_refs_attr"):
+    """Attach the "<project slug>#<ref>" of the related user stories as an array column
+    to each object of the queryset.
+
+    :param queryset: A Django epics queryset object.
+    :param as_field: Attach the refs as an attribute with this name.
+
+    :return: Queryset object with the additional `as_field` field.
+    """
+
+    model = queryset.model
+    sql = """SELECT ARRAY(SELECT projects_project.slug || '#' || userstories_userstory.ref
+                            FROM epics_relateduserstory
+                      INNER JOIN userstories_userstory ON epics_relateduserstory.user_story_id = userstories_userstory.id
+                      INNER JOIN projects_project ON userstories_userstory.project_id = projects_project.id
+                           WHERE epics_relateduserstory.epic_id = {tbl}.id
+                        ORDER BY projects_project.name, projects_project.id,
+                                 userstories_userstory.backlog_order, userstories_userstory.ref)"""
+
+    sql = sql.format(tbl=model._meta.db_table)
+    queryset = queryset.extra(select={as_field: sql})
+    return queryset
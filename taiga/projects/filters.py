@@ -17,12 +17,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import logging
 
-from django.apps import apps
 from django.db.models import Q
 from django.utils.translation import ugettext as _
 
 from taiga.base import exceptions as exc
 from taiga.base.filters import FilterBackend
+from taiga.base.filters import get_member_project_ids_queryset
 from taiga.base.utils.db import to_tsquery
 
 logger = logging.getLogger(__name__)
@@ -71,16 +71,9 @@ class CanViewProjectObjFilterBackend(FilterBackend):
             qs = qs
         elif request.user.is_authenticated():
             # authenticated user & project member
-            membership_model = apps.get_model("projects", "Membership")
-            memberships_qs = membership_model.objects.filter(user=request.user)
-            if project_id:
-                memberships_qs = memberships_qs.filter(project_id=project_id)
-            memberships_qs = memberships_qs.filter(Q(role__permissions__contains=['view_project']) |
-                                                   Q(is_admin=True))
-
-            projects_list = [membership.project_id for membership in memberships_qs]
-
-            qs = qs.filter((Q(id__in=projects_list) |
+            member_project_ids = get_member_project_ids_queryset(request.user, "view_project",
+                                                                 project_id=project_id)
+            qs = qs.filter((Q(id__in=member_project_ids) |
                             Q(public_permissions__contains=["view_project"])))
         else:
             # external users / anonymous
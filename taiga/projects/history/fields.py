@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import diff_match_patch
+
+from taiga.base.db.models.fields import JSONField
+
+# Text values shorter than this are stored as they are
+COMPACT_MIN_LENGTH = 256
+
+
+def _compact_value(value):
+    """
+    Given a diff tuple with two texts, return a compact representation
+    with the new text and a patch to rebuild the old one from it.
+    Return None if the compact version is not worth it.
+    """
+    old, new = value
+    if not isinstance(old, str) or not isinstance(new, str):
+        return None
+
+    if len(old) < COMPACT_MIN_LENGTH:
+        return None
+
+    dmp = diff_match_patch.diff_match_patch()
+    patch = dmp.patch_toText(dmp.patch_make(new, old))
+    if len(patch) >= len(old):
+        return None
+
+    # Never store something we can't rebuild
+    rebuilt, _ = dmp.patch_apply(dmp.patch_fromText(patch), new)
+    if rebuilt != old:
+        return None
+
+    return {"patch": patch, "to": new}
+
+
+def _expand_value(value):
+    dmp = diff_match_patch.diff_match_patch()
+    old, _ = dmp.patch_apply(dmp.patch_fromText(value["patch"]), value["to"])
+    return [old, value["to"]]
+
+
+def is_compacted_value(value):
+    return isinstance(value, dict) and "patch" in value and "to" in value
+
+
+def compact_diff(diff):
+    """
+    Return a copy of the diff with the long text values stored as
+    diff_match_patch patches instead of two full copies of the text.
+    The values that aren't a dict (the imported entries without diff have
+    a list) are returned unchanged.
+    """
+    if not diff or not isinstance(diff, dict):
+        return diff
+
+    result = {}
+    for key, value in diff.items():
+        compacted = None
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            compacted = _compact_value(value)
+
+        result[key] = value if compacted is None else compacted
+
+    return result
+
+
+def expand_diff(diff):
+    """
+    Return a copy of the diff with the compacted values rebuilt.
+    """
+    if not diff or not isinstance(diff, dict):
+        return diff
+
+    return {key: _expand_value(value) if is_compacted_value(value) else value
+            for key, value in diff.items()}
+
+
+class CompactDiffJSONField(JSONField):
+    """
+    JSONField to store history diffs, the long text values are stored as
+    patches in the database and rebuilt on read.
+    """
+    def from_db_value(self, value, expression, connection, context):
+        return expand_diff(value)
+
+    def get_prep_value(self, value):
+        return super().get_prep_value(compact_diff(value))
@@ -26,7 +26,7 @@ from django.core.exceptions import ObjectDoesNotExist
 
 from taiga.base.utils.iterators import as_tuple
 from taiga.base.utils.iterators import as_dict
-from taiga.mdrender.service import render as mdrender
+from taiga.mdrender.service import get_text_hash
 
 from taiga.projects.attachments.services import get_timeline_image_thumbnail_url
 
@@ -297,7 +297,7 @@ def epic_freezer(epic) -> dict:
         "epics_order": epic.epics_order,
         "subject": epic.subject,
         "description": epic.description,
-        "description_html": mdrender(epic.project, epic.description),
+        "description_hash": get_text_hash(epic.description),
         "assigned_to": epic.assigned_to_id,
         "client_requirement": epic.client_requirement,
         "team_requirement": epic.team_requirement,
@@ -305,7 +305,7 @@ def epic_freezer(epic) -> dict:
         "tags": epic.tags,
         "is_blocked": epic.is_blocked,
         "blocked_note": epic.blocked_note,
-        "blocked_note_html": mdrender(epic.project, epic.blocked_note),
+        "blocked_note_hash": get_text_hash(epic.blocked_note),
         "custom_attributes": extract_epic_custom_attributes(epic)
     }
 
@@ -341,7 +341,7 @@ def userstory_freezer(us) -> dict:
         "kanban_order": us.kanban_order,
         "subject": us.subject,
         "description": us.description,
-        "description_html": mdrender(us.project, us.description),
+        "description_hash": get_text_hash(us.description),
         "assigned_to": us.assigned_to_id,
         "milestone": us.milestone_id,
         "client_requirement": us.client_requirement,
@@ -352,7 +352,7 @@ def userstory_freezer(us) -> dict:
         "from_issue": us.generated_from_issue_id,
         "is_blocked": us.is_blocked,
         "blocked_note": us.blocked_note,
-        "blocked_note_html": mdrender(us.project, us.blocked_note),
+        "blocked_note_hash": get_text_hash(us.blocked_note),
         "custom_attributes": extract_user_story_custom_attributes(us),
         "tribe_gig": us.tribe_gig,
     }
@@ -371,13 +371,13 @@ def issue_freezer(issue) -> dict:
         "milestone": issue.milestone_id,
         "subject": issue.subject,
         "description": issue.description,
-        "description_html": mdrender(issue.project, issue.description),
+        "description_hash": get_text_hash(issue.description),
         "assigned_to": issue.assigned_to_id,
         "attachments": extract_attachments(issue),
         "tags": issue.tags,
         "is_blocked": issue.is_blocked,
         "blocked_note": issue.blocked_note,
-        "blocked_note_html": mdrender(issue.project, issue.blocked_note),
+        "blocked_note_hash": get_text_hash(issue.blocked_note),
         "custom_attributes": extract_issue_custom_attributes(issue),
     }
 
@@ -392,7 +392,7 @@ def task_freezer(task) -> dict:
         "milestone": task.milestone_id,
         "subject": task.subject,
         "description": task.description,
-        "description_html": mdrender(task.project, task.description),
+        "description_hash": get_text_hash(task.description),
         "assigned_to": task.assigned_to_id,
         "attachments": extract_attachments(task),
         "taskboard_order": task.taskboard_order,
@@ -402,7 +402,7 @@ def task_freezer(task) -> dict:
         "is_iocaine": task.is_iocaine,
         "is_blocked": task.is_blocked,
         "blocked_note": task.blocked_note,
-        "blocked_note_html": mdrender(task.project, task.blocked_note),
+        "blocked_note_hash": get_text_hash(task.blocked_note),
         "custom_attributes": extract_task_custom_attributes(task),
     }
 
@@ -414,7 +414,7 @@ def wikipage_freezer(wiki) -> dict:
         "slug": wiki.slug,
         "owner": wiki.owner_id,
         "content": wiki.content,
-        "content_html": mdrender(wiki.project, wiki.content),
+        "content_hash": get_text_hash(wiki.content),
         "attachments": extract_attachments(wiki),
     }
 
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Examples:
+# python manage.py archive_history_entries
+# python manage.py archive_history_entries --months 6 --batch_size 500
+
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from taiga.projects.history.services import archive_history_entries
+
+
+class Command(BaseCommand):
+    help = 'Move old history entries to the archive table in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months',
+                            action='store',
+                            dest='months',
+                            type=int,
+                            default=getattr(settings, "HISTORY_ARCHIVE_AFTER_MONTHS", 12),
+                            help='Archive entries older than this number of months')
+        parser.add_argument('--batch_size',
+                            action='store',
+                            dest='batch_size',
+                            type=int,
+                            default=1000,
+                            help='Number of entries moved per transaction')
+        parser.add_argument('--sleep',
+                            action='store',
+                            dest='sleep',
+                            type=float,
+                            default=0.1,
+                            help='Seconds to wait between batches')
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        before = timezone.now() - relativedelta(months=options["months"])
+
+        total = 0
+        while True:
+            moved = archive_history_entries(before, batch_size=options["batch_size"])
+            if moved == 0:
+                break
+
+            total += moved
+            self.stdout.write("-> {} history entries archived".format(total))
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS("Archived {} history entries.".format(total)))
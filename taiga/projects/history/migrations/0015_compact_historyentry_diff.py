@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations
+
+from taiga.base.db.models.fields.json import JsonAdapter
+
+import taiga.projects.history.fields
+
+BATCH_SIZE = 500
+
+
+def _iter_compactable_history_entries(HistoryEntry):
+    compact_diff = taiga.projects.history.fields.compact_diff
+
+    last_pk = ""
+    while True:
+        batch = list(HistoryEntry.objects.filter(pk__gt=last_pk, diff__isnull=False)
+                                         .order_by("pk")
+                                         .values_list("pk", "diff")[:BATCH_SIZE])
+        if not batch:
+            break
+
+        for pk, diff in batch:
+            # Only the rows with something to compact
+            if compact_diff(diff) != diff:
+                yield pk, diff
+
+        last_pk = batch[-1][0]
+
+
+def compact_history_entries_diff(apps, schema_editor):
+    HistoryEntry = apps.get_model("history", "HistoryEntry")
+
+    # The field compacts the diff on save
+    for pk, diff in _iter_compactable_history_entries(HistoryEntry):
+        HistoryEntry.objects.filter(pk=pk).update(diff=diff)
+
+
+def expand_history_entries_diff(apps, schema_editor):
+    HistoryEntry = apps.get_model("history", "HistoryEntry")
+
+    # The field expands the diff on read, write it skipping the field
+    with schema_editor.connection.cursor() as cursor:
+        for pk, diff in _iter_compactable_history_entries(HistoryEntry):
+            cursor.execute("UPDATE history_historyentry SET diff = %s WHERE id = %s", [JsonAdapter(diff, encoder=DjangoJSONEncoder), pk])
+
+
+class Migration(migrations.Migration):
+    # Every batch is committed on its own so the table is not locked
+    # during the whole migration
+    atomic = False
+
+    dependencies = [
+        ('history', '0014_json_to_jsonb'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historyentry',
+            name='diff',
+            field=taiga.projects.history.fields.CompactDiffJSONField(blank=True, default=None, null=True),
+        ),
+        migrations.RunPython(compact_history_entries_diff, reverse_code=expand_history_entries_diff),
+    ]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import taiga.base.db.models.fields
+import taiga.projects.history.fields
+import taiga.projects.history.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0056_auto_20161110_1518'),
+        ('history', '0015_compact_historyentry_diff'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedHistoryEntry',
+            fields=[
+                ('id', models.CharField(default=taiga.projects.history.models._generate_uuid, editable=False, max_length=255, primary_key=True, serialize=False, unique=True)),
+                ('user', taiga.base.db.models.fields.JSONField(blank=True, default=None, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('type', models.SmallIntegerField(choices=[(1, 'Change'), (2, 'Create'), (3, 'Delete')])),
+                ('key', models.CharField(blank=True, db_index=True, default=None, max_length=255, null=True)),
+                ('diff', taiga.projects.history.fields.CompactDiffJSONField(blank=True, default=None, null=True)),
+                ('values_diff_cache', taiga.base.db.models.fields.JSONField(blank=True, default=None, null=True)),
+                ('snapshot', taiga.base.db.models.fields.JSONField(blank=True, default=None, null=True)),
+                ('values', taiga.base.db.models.fields.JSONField(blank=True, default=None, null=True)),
+                ('comment', models.TextField(blank=True)),
+                ('comment_html', models.TextField(blank=True)),
+                ('delete_comment_date', models.DateTimeField(blank=True, default=None, null=True)),
+                ('delete_comment_user', taiga.base.db.models.fields.JSONField(blank=True, default=None, null=True)),
+                ('comment_versions', taiga.base.db.models.fields.JSONField(blank=True, default=None, null=True)),
+                ('edit_comment_date', models.DateTimeField(blank=True, default=None, null=True)),
+                ('is_hidden', models.BooleanField(default=False)),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.Project')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
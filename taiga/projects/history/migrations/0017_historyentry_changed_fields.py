@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def _fill_table_changed_fields(cursor, table):
+    select_sql = """
+        SELECT "id"
+          FROM "{tbl}"
+         WHERE "id" > %s
+           AND "diff" IS NOT NULL
+      ORDER BY "id"
+         LIMIT %s
+    """.format(tbl=table)
+
+    update_sql = """
+        UPDATE "{tbl}"
+           SET "changed_fields" = CASE
+                                      WHEN jsonb_typeof("diff") = 'object'
+                                      THEN ARRAY(SELECT jsonb_object_keys("diff") ORDER BY 1)
+                                      ELSE '{{}}'
+                                  END
+         WHERE "id" = ANY(%s)
+    """.format(tbl=table)
+
+    last_id = ""
+    while True:
+        cursor.execute(select_sql, [last_id, BATCH_SIZE])
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            break
+
+        cursor.execute(update_sql, [ids])
+        last_id = ids[-1]
+
+
+def fill_changed_fields(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table in ("history_historyentry", "history_archivedhistoryentry"):
+            _fill_table_changed_fields(cursor, table)
+
+
+class Migration(migrations.Migration):
+    # Every batch is committed on its own so the tables are not locked
+    # during the whole migration
+    atomic = False
+
+    dependencies = [
+        ('history', '0016_archivedhistoryentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historyentry',
+            name='changed_fields',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=None, null=True, size=None),
+        ),
+        migrations.AddField(
+            model_name='archivedhistoryentry',
+            name='changed_fields',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=None, null=True, size=None),
+        ),
+        migrations.AlterIndexTogether(
+            name='historyentry',
+            index_together=set([('key', 'created_at')]),
+        ),
+        migrations.RunPython(fill_changed_fields, reverse_code=migrations.RunPython.noop),
+    ]
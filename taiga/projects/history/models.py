@@ -20,28 +20,36 @@ import uuid
 
 from django.utils import timezone
 from django.db import models
+from django.contrib.postgres.fields import ArrayField
 from django.contrib.auth import get_user_model
 from django.utils.functional import cached_property
 from taiga.base.db.models.fields import JSONField
 
 from taiga.mdrender.service import get_diff_of_htmls
+from taiga.mdrender.service import render as mdrender
 
 from .choices import HistoryType
 from .choices import HISTORY_TYPE_CHOICES
+from .fields import CompactDiffJSONField
 
 from taiga.base.utils.diff import make_diff as make_diff_from_dicts
 from taiga.projects.custom_attributes.choices import TEXT_TYPE
 
 # This keys has been removed from freeze_impl so we can have objects where the
 # previous diff has value for the attribute and we want to prevent their propagation
-IGNORE_DIFF_FIELDS = ["watchers", "description_diff", "content_diff", "blocked_note_diff"]
+IGNORE_DIFF_FIELDS = ["watchers", "description_diff", "content_diff", "blocked_note_diff",
+                      "description_hash", "content_hash", "blocked_note_hash"]
+
+# Text fields stored as source in snapshots and diffs, their html version
+# is rendered on demand (old entries can still have the html stored)
+RENDERED_TEXT_FIELDS = ["description", "content", "blocked_note"]
 
 
 def _generate_uuid():
     return str(uuid.uuid1())
 
 
-class HistoryEntry(models.Model):
+class AbstractHistoryEntry(models.Model):
     """
     Domain model that represents a history
     entry storage table.
@@ -58,8 +66,13 @@ class HistoryEntry(models.Model):
     type = models.SmallIntegerField(choices=HISTORY_TYPE_CHOICES)
     key = models.CharField(max_length=255, null=True, default=None, blank=True, db_index=True)
 
-    # Stores the last diff
-    diff = JSONField(null=True, blank=True, default=None)
+    # Stores the last diff (long texts are stored as patches)
+    diff = CompactDiffJSONField(null=True, blank=True, default=None)
+
+    # Stores the names of the fields changed in the diff (used
+    # by the OCC checks to not load the diffs)
+    changed_fields = ArrayField(models.TextField(null=False, blank=False),
+                                null=True, blank=True, default=None)
 
     # Stores the values_diff cache
     values_diff_cache = JSONField(null=True, blank=True, default=None)
@@ -121,10 +134,55 @@ class HistoryEntry(models.Model):
 
         return self._owner
 
+    def save(self, *args, **kwargs):
+        if self.changed_fields is None and self.diff is not None:
+            self.changed_fields = sorted(self.diff.keys()) if isinstance(self.diff, dict) else []
+
+        super().save(*args, **kwargs)
+
     def prefetch_owner(self, owner):
         self._owner = owner
         self._prefetched_owner = True
 
+    def _render_text(self, text):
+        return mdrender(self.project, text) if text else ""
+
+    @cached_property
+    def rendered_snapshot(self):
+        if self.snapshot is None:
+            return None
+
+        snapshot = dict(self.snapshot)
+        for field in RENDERED_TEXT_FIELDS:
+            html_field = "{}_html".format(field)
+            if field in snapshot and html_field not in snapshot:
+                snapshot[html_field] = self._render_text(snapshot[field])
+
+        return snapshot
+
+    @cached_property
+    def rendered_diff(self):
+        if self.diff is None:
+            return None
+
+        diff = dict(self.diff)
+        for field in RENDERED_TEXT_FIELDS:
+            html_field = "{}_html".format(field)
+            if field in diff and html_field not in diff:
+                diff[html_field] = [self._render_text(value) for value in diff[field]]
+
+        return diff
+
+    @property
+    def rendered_values_diff(self):
+        values_diff = dict(self.values_diff)
+        for field in RENDERED_TEXT_FIELDS:
+            html_field = "{}_html".format(field)
+            if html_field in self.rendered_diff and html_field not in values_diff:
+                values_diff[html_field] = self.rendered_diff[html_field]
+
+        return values_diff
+
     def attach_user_info_to_comment_versions(self):
         if not self.comment_versions:
             return
@@ -305,8 +363,26 @@ class HistoryEntry(models.Model):
 
         self.values_diff_cache = result
         # Update values_diff_cache without dispatching signals
-        HistoryEntry.objects.filter(pk=self.pk).update(values_diff_cache=self.values_diff_cache)
+        self.__class__.objects.filter(pk=self.pk).update(values_diff_cache=self.values_diff_cache)
         return self.values_diff_cache
 
+    class Meta:
+        abstract = True
+        ordering = ["created_at"]
+
+
+class HistoryEntry(AbstractHistoryEntry):
+    class Meta:
+        ordering = ["created_at"]
+        index_together = [("key", "created_at")]
+
+
+class ArchivedHistoryEntry(AbstractHistoryEntry):
+    """
+    Old history entries moved out of the main table by the
+    `archive_history_entries` command. They are never needed
+    to rebuild the last snapshot of an object (they are older
+    than it) and they have no comments.
+    """
     class Meta:
         ordering = ["created_at"]
@@ -32,8 +32,8 @@ class HistoryEntrySerializer(serializers.LightSerializer):
     created_at = Field()
     type = Field()
     key = Field()
-    diff = Field()
-    snapshot = Field()
+    diff = Field(attr="rendered_diff")
+    snapshot = Field(attr="rendered_snapshot")
     values = Field()
     values_diff = I18NJSONField()
     comment = I18NJSONField()
@@ -38,6 +38,7 @@ from functools import wraps
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.apps import apps
+from django.db import connection
 from django.db import transaction as tx
 from django_pglocks import advisory_lock
 
@@ -85,6 +86,12 @@ _not_important_fields = {
     "tasks.task": frozenset(["us_order", "taskboard_order"]),
 }
 
+# Fields excluded from diffs: the text hashes are derived from the source
+# text (which is diffed) and the html fields were stored by old freezers
+# (now the html is rendered on demand).
+_not_diffable_fields = ("description_hash", "content_hash", "blocked_note_hash",
+                        "description_html", "content_html", "blocked_note_html")
+
 log = logging.getLogger("taiga.history")
 
 
@@ -229,7 +236,7 @@ def make_diff(oldobj: FrozenObj, newobj: FrozenObj) -> FrozenDiff:
     first = oldobj.snapshot
     second = newobj.snapshot
 
-    diff = make_diff_from_dicts(first, second)
+    diff = make_diff_from_dicts(first, second, excluded_keys=_not_diffable_fields)
 
     return FrozenDiff(newobj.key, diff, newobj.snapshot)
 
@@ -290,18 +297,23 @@ def get_last_snapshot_for_key(key: str) -> FrozenObj:
 
 def get_modified_fields(obj: object, last_modifications):
     """
-    Get the modified fields for an object through his last modifications
+    Get the modified fields for an object through his last modifications,
+    in the current and the archived history entries.
     """
     key = make_key_from_model_object(obj)
-    entry_model = apps.get_model("history", "HistoryEntry")
-    history_entries = (entry_model.objects
-                                  .filter(key=key)
-                                  .order_by("-created_at")
-                                  .values_list("diff", flat=True)[0:last_modifications])
+    entries = []
+    for entry_model_name in ("HistoryEntry", "ArchivedHistoryEntry"):
+        entry_model = apps.get_model("history", entry_model_name)
+        entries += (entry_model.objects
+                               .filter(key=key)
+                               .order_by("-created_at")
+                               .values_list("created_at", "changed_fields")[0:last_modifications])
+
+    entries.sort(key=lambda entry: entry[0], reverse=True)
 
     modified_fields = []
-    for history_entry in history_entries:
-        modified_fields += history_entry.keys()
+    for _, fields in entries[0:last_modifications]:
+        modified_fields += fields or []
 
     return modified_fields
 
@@ -361,7 +373,7 @@ def take_snapshot(obj: object, *, comment: str="", user=None, delete: bool=False
             "diff": fdiff.diff,
             "values": fvals,
             "comment": comment,
-            "comment_html": mdrender(obj.project, comment),
+            "comment_html": mdrender(obj.project, comment) if comment else "",
             "is_hidden": is_hidden,
             "is_snapshot": need_real_snapshot,
         }
@@ -372,28 +384,99 @@ def take_snapshot(obj: object, *, comment: str="", user=None, delete: bool=False
 # High level query api
 
 def get_history_queryset_by_model_instance(obj: object, types=(HistoryType.change,),
-                                           include_hidden=False):
+                                           include_hidden=False, archived=False):
     """
     Get one page of history for specified object.
+
+    Entries moved to the archive are only returned with `archived=True`.
+    Entries with comments are never archived.
     """
     key = make_key_from_model_object(obj)
-    history_entry_model = apps.get_model("history", "HistoryEntry")
+    if archived:
+        history_entry_model = apps.get_model("history", "ArchivedHistoryEntry")
+    else:
+        history_entry_model = apps.get_model("history", "HistoryEntry")
 
-    qs = history_entry_model.objects.filter(key=key, type__in=types)
+    qs = history_entry_model.objects.filter(key=key, type__in=types).select_related("project")
     if not include_hidden:
         qs = qs.filter(is_hidden=False)
 
     return qs.order_by("created_at")
 
 
-def prefetch_owners_in_history_queryset(qs):
-    user_ids = [u["pk"] for u in qs.values_list("user", flat=True)]
+def get_history_by_model_instance(obj: object, types=(HistoryType.change,), include_hidden=False):
+    """
+    Get the full history (archived and current entries) of the specified object.
+    """
+    kwargs = {"types": types, "include_hidden": include_hidden}
+    entries = (list(get_history_queryset_by_model_instance(obj, archived=True, **kwargs)) +
+               list(get_history_queryset_by_model_instance(obj, **kwargs)))
+    return sorted(entries, key=lambda entry: entry.created_at)
+
+
+def count_history_by_model_instance(obj: object, types=(HistoryType.change,), include_hidden=False):
+    kwargs = {"types": types, "include_hidden": include_hidden}
+    return (get_history_queryset_by_model_instance(obj, archived=True, **kwargs).count() +
+            get_history_queryset_by_model_instance(obj, **kwargs).count())
+
+
+def prefetch_owners_in_history_queryset(entries):
+    user_ids = [entry.user["pk"] for entry in entries]
     users = get_user_model().objects.filter(id__in=user_ids)
     users_by_id = {u.id: u for u in users}
-    for history_entry in qs:
+    for history_entry in entries:
         history_entry.prefetch_owner(users_by_id.get(history_entry.user["pk"], None))
 
-    return qs
+    return entries
+
+
+# Archive api
+
+def archive_history_entries(before, batch_size=1000) -> int:
+    """
+    Move one batch of history entries created before the given date
+    to the archive table, returning the number of moved entries.
+
+    Only entries older than the last real snapshot of their object
+    are moved, so `get_last_snapshot_for_key` never needs the archive.
+    Entries with comments or with pending notifications are kept.
+    """
+    entry_model = apps.get_model("history", "HistoryEntry")
+    archived_entry_model = apps.get_model("history", "ArchivedHistoryEntry")
+    notification_model = apps.get_model("notifications", "HistoryChangeNotification")
+
+    columns = ", ".join('"{}"'.format(f.column) for f in entry_model._meta.concrete_fields)
+    sql = """
+        WITH moved AS (
+            DELETE FROM {tbl}
+                  WHERE id IN (SELECT h.id
+                                 FROM {tbl} h
+                                WHERE h.created_at < %s
+                                  AND h.comment = ''
+                                  AND h.created_at < (SELECT MAX(s.created_at)
+                                                        FROM {tbl} s
+                                                       WHERE s.key = h.key
+                                                         AND s.is_snapshot = true)
+                                  AND NOT EXISTS (SELECT 1
+                                                    FROM {notifications_tbl} n
+                                                   WHERE n.historyentry_id = h.id)
+                             ORDER BY h.created_at
+                                LIMIT %s
+                                  FOR UPDATE)
+              RETURNING {columns}
+        )
+        INSERT INTO {archive_tbl} ({columns})
+             SELECT {columns}
+               FROM moved
+    """.format(tbl=entry_model._meta.db_table,
+               archive_tbl=archived_entry_model._meta.db_table,
+               notifications_tbl=notification_model.history_entries.through._meta.db_table,
+               columns=columns)
+
+    with tx.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [before, batch_size])
+            return cursor.rowcount
 
 
 # Freeze & value register
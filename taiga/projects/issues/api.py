@@ -17,7 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.utils.translation import ugettext as _
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
 from taiga.base import filters
 from taiga.base import exceptions as exc
@@ -29,6 +29,8 @@ from taiga.base.api.utils import get_object_or_404
 
 from taiga.projects.history.mixins import HistoryResourceMixin
 from taiga.projects.mixins.by_ref import ByRefMixin
+from taiga.projects.mixins.cache import PublicResponseCacheMixin
+from taiga.projects.mixins.conditional import ConditionalGetMixin
 from taiga.projects.models import Project, IssueStatus, Severity, Priority, IssueType
 from taiga.projects.notifications.mixins import WatchedResourceMixin, WatchersViewSetMixin
 from taiga.projects.occ import OCCResourceMixin
@@ -45,7 +47,8 @@ from . import validators
 
 
 class IssueViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixin, WatchedResourceMixin,
-                   ByRefMixin, TaggedResourceMixin, BlockedByProjectMixin, ModelCrudViewSet):
+                   ByRefMixin, TaggedResourceMixin, ConditionalGetMixin, PublicResponseCacheMixin,
+                   BlockedByProjectMixin, ModelCrudViewSet):
     validator_class = validators.IssueValidator
     queryset = models.Issue.objects.all()
     permission_classes = (permissions.IssuePermission, )
@@ -180,25 +183,23 @@ class IssueViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixin, W
         project_id = request.QUERY_PARAMS.get("project", None)
         project = get_object_or_404(Project, id=project_id)
 
-        filter_backends = self.get_filter_backends()
-        types_filter_backends = (f for f in filter_backends if f != filters.IssueTypesFilter)
-        statuses_filter_backends = (f for f in filter_backends if f != filters.StatusesFilter)
-        assigned_to_filter_backends = (f for f in filter_backends if f != filters.AssignedToFilter)
-        owners_filter_backends = (f for f in filter_backends if f != filters.OwnersFilter)
-        priorities_filter_backends = (f for f in filter_backends if f != filters.PrioritiesFilter)
-        severities_filter_backends = (f for f in filter_backends if f != filters.SeveritiesFilter)
-
-        queryset = self.get_queryset()
-        querysets = {
-            "types": self.filter_queryset(queryset, filter_backends=types_filter_backends),
-            "statuses": self.filter_queryset(queryset, filter_backends=statuses_filter_backends),
-            "assigned_to": self.filter_queryset(queryset, filter_backends=assigned_to_filter_backends),
-            "owners": self.filter_queryset(queryset, filter_backends=owners_filter_backends),
-            "priorities": self.filter_queryset(queryset, filter_backends=priorities_filter_backends),
-            "severities": self.filter_queryset(queryset, filter_backends=severities_filter_backends),
-            "tags": self.filter_queryset(queryset)
+        facets_filter_backends = {
+            "types": filters.IssueTypesFilter,
+            "statuses": filters.StatusesFilter,
+            "priorities": filters.PrioritiesFilter,
+            "severities": filters.SeveritiesFilter,
+            "assigned_to": filters.AssignedToFilter,
+            "owners": filters.OwnersFilter,
         }
-        return response.Ok(services.get_issues_filters_data(project, querysets))
+        filter_backends = (f for f in self.get_filter_backends() if f not in facets_filter_backends.values())
+        queryset = self.filter_queryset(self.get_queryset(), filter_backends=filter_backends)
+
+        facets_querysets = {}
+        for name, filter_backend in facets_filter_backends.items():
+            facets_querysets[name] = self.filter_queryset(models.Issue.objects.all(),
+                                                          filter_backends=[filter_backend])
+
+        return response.Ok(services.get_issues_filters_data(project, queryset, facets_querysets))
 
     @list_route(methods=["GET"])
     def csv(self, request):
@@ -208,8 +209,8 @@ class IssueViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixin, W
 
         project = get_object_or_404(Project, issues_csv_uuid=uuid)
         queryset = project.issues.all().order_by('ref')
-        data = services.issues_to_csv(project, queryset)
-        csv_response = HttpResponse(data.getvalue(), content_type='application/csv; charset=utf-8')
+        data = services.iter_issues_csv(project, queryset)
+        csv_response = StreamingHttpResponse(data, content_type='application/csv; charset=utf-8')
         csv_response['Content-Disposition'] = 'attachment; filename="issues.csv"'
         return csv_response
 
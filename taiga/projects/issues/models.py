@@ -26,11 +26,14 @@ from django.utils.translation import ugettext_lazy as _
 
 from taiga.projects.occ import OCCModelMixin
 from taiga.projects.notifications.mixins import WatchedModelMixin
+from taiga.projects.notifications.models import CachedWatchersMixin
+from taiga.projects.votes.models import CachedVotersMixin
 from taiga.projects.mixins.blocked import BlockedMixin
 from taiga.projects.tagging.models import TaggedMixin
 
 
-class Issue(OCCModelMixin, WatchedModelMixin, BlockedMixin, TaggedMixin, models.Model):
+class Issue(OCCModelMixin, WatchedModelMixin, BlockedMixin, TaggedMixin,
+            CachedWatchersMixin, CachedVotersMixin, models.Model):
     ref = models.BigIntegerField(db_index=True, null=True, blank=True, default=None,
                                  verbose_name=_("ref"))
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, default=None,
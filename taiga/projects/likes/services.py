@@ -17,10 +17,12 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from django.db import connection
 from django.db.models import F
 from django.db.transaction import atomic
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from .models import Like
 
@@ -52,17 +54,77 @@ def remove_like(obj, user):
     :param obj: Any Django model instance.
     :param user: User removing her like. :class:`~taiga.users.models.User` instance.
     """
+    remove_likes(obj, [user])
+
+
+def add_likes(obj, users):
+    """Add the likes of several users to an object.
+
+    Like add_like but in only one query for all the users. The users that have
+    already liked the object are ignored.
+
+    :param obj: Any Django model instance.
+    :param users: Users adding their likes. :class:`~taiga.users.models.User` instances.
+    """
+    user_ids = list({user.id for user in users})
+    if not user_ids:
+        return
+
     obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
+    sql = """
+        INSERT INTO {like_tbl} (content_type_id, object_id, user_id, created_date)
+             SELECT %(content_type_id)s, %(object_id)s, u.id, %(now)s
+               FROM {user_tbl} u
+              WHERE u.id = ANY(%(user_ids)s::integer[])
+        ON CONFLICT DO NOTHING
+    """.format(like_tbl=Like._meta.db_table,
+               user_tbl=get_user_model()._meta.db_table)
+
+    params = {
+        "content_type_id": obj_type.id,
+        "object_id": obj.id,
+        "user_ids": user_ids,
+        "now": timezone.now(),
+    }
+
     with atomic():
-        qs = Like.objects.filter(content_type=obj_type, object_id=obj.id, user=user)
-        if not qs.exists():
-            return
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            added = cursor.rowcount
+
+        project = getattr(obj, "project", None)
+        if added and project is not None:
+            project.refresh_totals()
 
-        like = qs.first()
-        project = like.project
-        qs.delete()
 
-        if project is not None:
+def remove_likes(obj, users):
+    """Remove the likes of several users from an object.
+
+    Like remove_like but in only one query for all the users. The users that have
+    not liked the object are ignored.
+
+    :param obj: Any Django model instance.
+    :param users: Users removing their likes. :class:`~taiga.users.models.User` instances.
+    """
+    user_ids = list({user.id for user in users})
+    if not user_ids:
+        return
+
+    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
+    sql = """
+        DELETE FROM {like_tbl}
+              WHERE content_type_id = %s
+                AND object_id = %s
+                AND user_id = ANY(%s::integer[])
+    """.format(like_tbl=Like._meta.db_table)
+
+    with atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [obj_type.id, obj.id, user_ids])
+            removed = cursor.rowcount
+
+        project = getattr(obj, "project", None)
+        if removed and project is not None:
             project.refresh_totals()
 
 
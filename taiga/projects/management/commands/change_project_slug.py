@@ -23,6 +23,7 @@ from django.test.utils import override_settings
 from taiga.base.utils.slug import slugify_uniquely
 from taiga.projects.models import Project
 from taiga.projects.history.models import HistoryEntry
+from taiga.projects.history.models import ArchivedHistoryEntry
 from taiga.timeline.rebuilder import rebuild_timeline
 
 
@@ -55,6 +56,7 @@ class Command(BaseCommand):
         # Reset diff cache in history entries
         self.stdout.write(self.style.SUCCESS("-> Reset value_diff cache for history entries."))
         HistoryEntry.objects.filter(project=project).update(values_diff_cache=None)
+        ArchivedHistoryEntry.objects.filter(project=project).update(values_diff_cache=None)
 
         # Regenerate timeline
         self.stdout.write(self.style.SUCCESS("-> Regenerate timeline entries."))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Examples:
+# python manage.py refresh_cached_watchers_and_voters
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from taiga.projects.notifications.models import CachedWatchersMixin
+from taiga.projects.notifications.services import refresh_cached_watchers
+from taiga.projects.votes.models import CachedVotersMixin
+from taiga.projects.votes.services import refresh_cached_total_voters
+
+
+class Command(BaseCommand):
+    help = 'Fix the cached watchers and total of voters that are out of date (changed out of the services)'
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if issubclass(model, CachedWatchersMixin):
+                total = refresh_cached_watchers(model)
+                self.stdout.write("-> {} {} with outdated watchers".format(total, model._meta.verbose_name_plural))
+
+            if issubclass(model, CachedVotersMixin):
+                total = refresh_cached_total_voters(model)
+                self.stdout.write("-> {} {} with outdated voters".format(total, model._meta.verbose_name_plural))
+
+        self.stdout.write(self.style.SUCCESS("Cached watchers and voters refreshed."))
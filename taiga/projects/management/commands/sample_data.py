@@ -46,8 +46,8 @@ from taiga.projects.attachments.models import *
 from taiga.projects.custom_attributes.models import *
 from taiga.projects.custom_attributes.choices import TYPES_CHOICES, TEXT_TYPE, MULTILINE_TYPE, DATE_TYPE, URL_TYPE
 from taiga.projects.history.services import take_snapshot
-from taiga.projects.likes.services import add_like
-from taiga.projects.votes.services import add_vote
+from taiga.projects.likes.services import add_likes
+from taiga.projects.votes.services import add_votes
 from taiga.events.apps import disconnect_events_signals
 from taiga.projects.services.stats import get_stats_for_project
 
@@ -614,21 +614,19 @@ class Command(BaseCommand):
         return user
 
     def create_votes(self, obj):
-        for i in range(self.sd.int(*NUM_VOTES)):
-            user=self.sd.db_object_from_queryset(User.objects.all())
-            add_vote(obj, user)
+        users = [self.sd.db_object_from_queryset(User.objects.all()) for i in range(self.sd.int(*NUM_VOTES))]
+        add_votes(obj, users)
 
     def create_likes(self, obj):
-        for i in range(self.sd.int(*NUM_LIKES)):
-            user=self.sd.db_object_from_queryset(User.objects.all())
-            add_like(obj, user)
+        users = [self.sd.db_object_from_queryset(User.objects.all()) for i in range(self.sd.int(*NUM_LIKES))]
+        add_likes(obj, users)
 
     def create_watchers(self, obj, notify_level=None):
-        for i in range(self.sd.int(*NUM_WATCHERS)):
-            user = self.sd.db_object_from_queryset(User.objects.all())
-            if not notify_level:
-                obj.add_watcher(user)
-            else:
+        users = [self.sd.db_object_from_queryset(User.objects.all()) for i in range(self.sd.int(*NUM_WATCHERS))]
+        if not notify_level:
+            obj.add_watchers(users)
+        else:
+            for user in users:
                 obj.add_watcher(user, notify_level)
 
     def generate_color(self, tag):
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+DROP_INDEXES = """
+    DROP INDEX IF EXISTS projects_project_anon_permissions_idx;
+    DROP INDEX IF EXISTS projects_project_public_permissions_idx;
+"""
+
+
+# NOTE: This indexes are needed by taiga.base.filters.get_public_project_ids_queryset
+CREATE_INDEXES = """
+    CREATE INDEX projects_project_anon_permissions_idx
+              ON projects_project
+           USING gin(anon_permissions);
+
+    CREATE INDEX projects_project_public_permissions_idx
+              ON projects_project
+           USING gin(public_permissions);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0056_auto_20161110_1518'),
+    ]
+
+    operations = [
+        migrations.RunSQL([DROP_INDEXES, CREATE_INDEXES],
+                          [DROP_INDEXES]),
+    ]
@@ -30,6 +30,7 @@ from taiga.base.utils.db import get_object_or_none
 from taiga.projects.notifications.mixins import WatchedResourceMixin
 from taiga.projects.notifications.mixins import WatchersViewSetMixin
 from taiga.projects.history.mixins import HistoryResourceMixin
+from taiga.projects.mixins.conditional import ConditionalGetMixin
 
 from . import serializers
 from . import validators
@@ -41,7 +42,7 @@ from django_pglocks import advisory_lock
 import datetime
 
 
-class MilestoneViewSet(HistoryResourceMixin, WatchedResourceMixin,
+class MilestoneViewSet(HistoryResourceMixin, WatchedResourceMixin, ConditionalGetMixin,
                        BlockedByProjectMixin, ModelCrudViewSet):
     serializer_class = serializers.MilestoneSerializer
     validator_class = validators.MilestoneValidator
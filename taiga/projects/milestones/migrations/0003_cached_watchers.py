@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('milestones', '0002_remove_milestone_watchers'),
+        ('notifications', '0006_auto_20151103_0954'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='milestone',
+            name='cached_watcher_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=[], editable=False, size=None, verbose_name='cached watcher ids'),
+        ),
+        migrations.RunSQL(
+            """
+                UPDATE "milestones_milestone"
+                   SET "cached_watcher_ids" = ARRAY(SELECT "notifications_watched"."user_id"
+                                                      FROM "notifications_watched"
+                                                     WHERE "notifications_watched"."content_type_id" = (SELECT "id" FROM "django_content_type" WHERE "app_label" = 'milestones' AND "model" = 'milestone')
+                                                       AND "notifications_watched"."object_id" = "milestones_milestone"."id"
+                                                  ORDER BY "notifications_watched"."id");
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
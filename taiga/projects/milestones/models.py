@@ -27,12 +27,13 @@ from django.utils.functional import cached_property
 from taiga.base.utils.slug import slugify_uniquely
 from taiga.base.utils.dicts import dict_sum
 from taiga.projects.notifications.mixins import WatchedModelMixin
+from taiga.projects.notifications.models import CachedWatchersMixin
 
 import itertools
 import datetime
 
 
-class Milestone(WatchedModelMixin, models.Model):
+class Milestone(WatchedModelMixin, CachedWatchersMixin, models.Model):
     name = models.CharField(max_length=200, db_index=True, null=False, blank=False,
                             verbose_name=_("name"))
     # TODO: Change the unique restriction to a unique together with the project id
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.encoding import force_bytes
+
+from taiga.base import response
+from taiga.projects.services.data_version import get_project_data_version
+
+from .conditional import ProjectVersionedResourceMixin
+
+
+class PublicResponseCacheMixin(ProjectVersionedResourceMixin):
+    """
+    Cache the responses of the list and retrieve requests of the anonymous
+    users for PUBLIC_RESPONSES_CACHE_TIMEOUT seconds (0 by default, so it
+    must be enabled). They are versioned by the project data version, so
+    every change of the project discards them.
+
+    Only one request builds a missing response, the concurrent ones wait
+    for it only PUBLIC_RESPONSES_CACHE_LOCK_WAIT seconds (0.2 by default),
+    so a slow build doesn't hold the rest of the workers, and build their
+    own response if it isn't cached by then.
+    """
+    def get_response_cache_key(self, request, project_id, **kwargs):
+        variant = hashlib.sha1(force_bytes(self.get_request_variant(request, **kwargs))).hexdigest()
+        return "public-response-{}-{}-{}".format(project_id, get_project_data_version(project_id), variant)
+
+    def _wait_for_cached_response(self, key, lock_key, wait_timeout):
+        # The lock is released without caching anything when the response
+        # can't be cached (an error, a not found...), so stop waiting then
+        deadline = time.time() + wait_timeout
+        while time.time() < deadline:
+            time.sleep(0.05)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            if cache.get(lock_key) is None:
+                return cache.get(key)
+        return None
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        timeout = getattr(settings, "PUBLIC_RESPONSES_CACHE_TIMEOUT", 0)
+        if not timeout or not request.user.is_anonymous():
+            return handler(request, *args, **kwargs)
+
+        project_id = self.get_project_id(request, **kwargs)
+        if project_id is None:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request, project_id, **kwargs)
+        cached = cache.get(key)
+
+        if cached is None:
+            lock_key = "{}-lock".format(key)
+            lock_timeout = getattr(settings, "PUBLIC_RESPONSES_CACHE_LOCK_TIMEOUT", 10)
+            if cache.add(lock_key, True, timeout=lock_timeout):
+                try:
+                    ret = handler(request, *args, **kwargs)
+                    if isinstance(ret, response.Response) and ret.status_code == 200:
+                        cache.set(key, (ret.data, dict(self.headers)), timeout=timeout)
+                    return ret
+                finally:
+                    cache.delete(lock_key)
+
+            wait_timeout = getattr(settings, "PUBLIC_RESPONSES_CACHE_LOCK_WAIT", 0.2)
+            cached = self._wait_for_cached_response(key, lock_key, wait_timeout)
+            if cached is None:
+                return handler(request, *args, **kwargs)
+
+        data, headers = cached
+        self.headers.update(headers)
+        return response.Ok(data)
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import translation
+from django.utils.crypto import salted_hmac
+
+from taiga.base import response
+from taiga.permissions.services import get_project_permissions_version
+from taiga.projects.services.data_version import get_project_data_version
+
+
+class ProjectVersionedResourceMixin:
+    """
+    Base of the mixins that reuse the responses of the list and retrieve
+    requests of the resources of a project while its data version doesn't
+    change.
+    """
+    def _get_list_project_id(self, request):
+        project_id = request.QUERY_PARAMS.get("project", None)
+        if project_id is not None:
+            try:
+                return int(project_id)
+            except (ValueError, TypeError):
+                return None
+
+        project_slug = request.QUERY_PARAMS.get("project__slug", None)
+        if project_slug is not None:
+            project_model = apps.get_model("projects", "Project")
+            return project_model.objects.filter(slug=project_slug).values_list("id", flat=True).first()
+
+        return None
+
+    def _get_retrieve_project_id(self, request, **kwargs):
+        model = self.queryset.model
+        field = "id" if model is apps.get_model("projects", "Project") else "project_id"
+        try:
+            return model.objects.filter(**kwargs).values_list(field, flat=True).first()
+        except (ValueError, TypeError):
+            return None
+
+    def get_project_id(self, request, **kwargs):
+        """
+        Return the id of the project of the response of the current action,
+        or None if it has no project.
+        """
+        if self.action == "list":
+            return self._get_list_project_id(request)
+        return self._get_retrieve_project_id(request, **kwargs)
+
+    def get_request_variant(self, request, **kwargs):
+        """
+        Return the string that identifies, with the project data version and
+        the user, the response of the current request.
+        """
+        query_params = sorted((key, sorted(values)) for key, values in request.QUERY_PARAMS.lists())
+        pagination_headers = (request.META.get("HTTP_X_DISABLE_PAGINATION", None),
+                              request.META.get("HTTP_X_LAZY_PAGINATION", None))
+        return "{}:{}:{}:{}:{}:{}:{}".format(self.__class__.__name__, self.action, request.path,
+                                            translation.get_language(), query_params,
+                                            pagination_headers, sorted(kwargs.items()))
+
+
+class ConditionalGetMixin(ProjectVersionedResourceMixin):
+    """
+    Answer the list and retrieve requests of the resources of a project with
+    an ETag, and with a 304 Not Modified (without running the queries of the
+    resource) if the If-None-Match header of the request has it.
+
+    The ETag changes with the content and the permissions of the project,
+    the user, the language, the query params and the pagination headers.
+
+    It's disabled unless CONDITIONAL_GET_ENABLED is set, because the versions
+    of the projects must be in a cache shared by all the processes: with a
+    per process cache the other processes would keep answering 304 (and
+    skipping the permission checks) after a change.
+    """
+    def get_etag(self, request, **kwargs):
+        """
+        Return the ETag of the response of the current action, or None if it
+        has no project.
+        """
+        project_id = self.get_project_id(request, **kwargs)
+        if project_id is None:
+            return None
+
+        value = "{}:{}:{}:{}".format(request.user.id,
+                                     get_project_data_version(project_id),
+                                     get_project_permissions_version(project_id),
+                                     self.get_request_variant(request, **kwargs))
+        return '"{}"'.format(salted_hmac("taiga.projects.etag", value).hexdigest())
+
+    def _conditional_get(self, handler, request, *args, **kwargs):
+        if not getattr(settings, "CONDITIONAL_GET_ENABLED", False):
+            return handler(request, *args, **kwargs)
+
+        # The versions are read before the data so a change made meanwhile
+        # can't be hidden behind the ETag
+        etag = self.get_etag(request, **kwargs)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+        if etag in [value.strip() for value in if_none_match.split(",")]:
+            not_modified = response.NotModified()
+            not_modified["ETag"] = etag
+            return not_modified
+
+        ret = handler(request, *args, **kwargs)
+        if ret.status_code == 200:
+            ret["ETag"] = etag
+        return ret
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_get(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_get(super().retrieve, request, *args, **kwargs)
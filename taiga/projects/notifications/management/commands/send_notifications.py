@@ -16,19 +16,52 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+# Examples:
+# python manage.py send_notifications
+# python manage.py send_notifications --workers 4 --batch_size 50
 
-from django.core.management.base import BaseCommand
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from taiga.projects.notifications.services import process_sync_notifications
 
-from taiga.base.utils.iterators import iter_queryset
-from taiga.projects.notifications.models import HistoryChangeNotification
-from taiga.projects.notifications.services import send_sync_notifications
 
 class Command(BaseCommand):
+    help = 'Send the emails of the pending change notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers',
+                            action='store',
+                            dest='workers',
+                            type=int,
+                            default=1,
+                            help='Number of processes sending notifications at once')
+        parser.add_argument('--batch_size',
+                            action='store',
+                            dest='batch_size',
+                            type=int,
+                            default=getattr(settings, "CHANGE_NOTIFICATIONS_BATCH_SIZE", 100),
+                            help='Number of notifications claimed per transaction')
 
     def handle(self, *args, **options):
-        qs = HistoryChangeNotification.objects.all()
-        for change_notification in iter_queryset(qs, itersize=100):
-            try:
-                send_sync_notifications(change_notification.pk)
-            except HistoryChangeNotification.DoesNotExist:
-                pass
+        if options["workers"] <= 1:
+            process_sync_notifications(options["batch_size"])
+            return
+
+        # Every process opens its own database connection, the claimed
+        # notifications are skipped by the others
+        connections.close_all()
+        processes = [multiprocessing.Process(target=process_sync_notifications, args=(options["batch_size"],))
+                     for _ in range(options["workers"])]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        failed = [process for process in processes if process.exitcode != 0]
+        if failed:
+            raise CommandError("{} of {} workers failed (exit codes: {})".format(
+                len(failed), len(processes), ", ".join(str(process.exitcode) for process in failed)))
@@ -19,7 +19,6 @@
 from functools import partial
 from operator import is_not
 
-from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 
 from taiga.base import response
@@ -141,6 +140,9 @@ class WatchedModelMixin(object):
     def add_watcher(self, user):
         services.add_watcher(self, user)
 
+    def add_watchers(self, users):
+        services.add_watchers(self, users)
+
     def remove_watcher(self, user):
         services.remove_watcher(self, user)
 
@@ -204,19 +206,7 @@ class EditableWatchedResourceSerializer(serializers.ModelSerializer):
         if instance is None or new_watcher_ids is None:
             return obj
 
-        new_watcher_ids = set(new_watcher_ids)
-        old_watcher_ids = set(obj.get_watchers().values_list("id", flat=True))
-        adding_watcher_ids = list(new_watcher_ids.difference(old_watcher_ids))
-        removing_watcher_ids = list(old_watcher_ids.difference(new_watcher_ids))
-
-        adding_users = get_user_model().objects.filter(id__in=adding_watcher_ids)
-        removing_users = get_user_model().objects.filter(id__in=removing_watcher_ids)
-        for user in adding_users:
-            services.add_watcher(obj, user)
-
-        for user in removing_users:
-            services.remove_watcher(obj, user)
-
+        services.set_watchers(obj, new_watcher_ids)
         obj.watchers = obj.get_watchers()
 
         return obj
@@ -18,11 +18,15 @@
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.fields import ArrayField
 
-from django.db import models
+from django.db import connection, models
+from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 from django.utils import timezone
 
+from taiga.base.db.models.cached import CachedFieldsModelMixin
 from taiga.projects.history.choices import HISTORY_TYPE_CHOICES
 
 from .choices import NOTIFY_LEVEL_CHOICES, NotifyLevel
@@ -93,3 +97,36 @@ class Watched(models.Model):
         verbose_name = _("Watched")
         verbose_name_plural = _("Watched")
         unique_together = ("content_type", "object_id", "user", "project")
+
+
+class CachedWatchersMixin(CachedFieldsModelMixin):
+    """
+    The ids of the watchers of the object, kept up to date by the
+    notifications services and the deletes of the watched objects, so the
+    lists don't need to aggregate the watched table for every row.
+    """
+    cached_watcher_ids = ArrayField(models.IntegerField(), null=False, blank=True, default=[],
+                                    editable=False, verbose_name=_("cached watcher ids"))
+    cached_fields = ("cached_watcher_ids",)
+
+    class Meta:
+        abstract = True
+
+
+# On Watched object is deleted out of the notifications services (the
+# cascade of a deleted user...), remove the user from the cached watchers.
+@receiver(models.signals.post_delete, sender=Watched,
+          dispatch_uid="watched_post_delete_update_cached_watchers")
+def watched_post_delete(sender, instance, **kwargs):
+    model = ContentType.objects.get_for_id(instance.content_type_id).model_class()
+    if model is None or not issubclass(model, CachedWatchersMixin):
+        return
+
+    sql = """
+        UPDATE {tbl}
+           SET cached_watcher_ids = array_remove(cached_watcher_ids, %s)
+         WHERE id = %s
+    """.format(tbl=model._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [instance.user_id, instance.object_id])
@@ -17,11 +17,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
-
-from functools import partial
+import logging
 
 from django.apps import apps
-from django.db import IntegrityError, transaction
+from django.core import mail
+from django.db import IntegrityError, connection, transaction
 from django.db.models import Q
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth import get_user_model
@@ -36,9 +36,10 @@ from taiga.projects.history.choices import HistoryType
 from taiga.projects.history.services import (make_key_from_model_object,
                                              get_last_snapshot_for_key,
                                              get_model_from_key)
-from taiga.permissions.services import user_has_perm
 
-from .models import HistoryChangeNotification, Watched
+from .models import CachedWatchersMixin, HistoryChangeNotification, Watched
+
+logger = logging.getLogger(__name__)
 
 
 def notify_policy_exists(project, user) -> bool:
@@ -88,7 +89,7 @@ def analize_object_for_watchers(obj: object, comment: str, user: object):
     if not hasattr(obj, "get_project"):
         return
 
-    if not hasattr(obj, "add_watcher"):
+    if not hasattr(obj, "add_watchers"):
         return
 
     texts = (getattr(obj, "description", ""),
@@ -98,80 +99,152 @@ def analize_object_for_watchers(obj: object, comment: str, user: object):
     from taiga.mdrender.service import render_and_extract
     _, data = render_and_extract(obj.get_project(), "\n".join(texts))
 
-    if data["mentions"]:
-        for user in data["mentions"]:
-            obj.add_watcher(user)
+    watchers = list(data["mentions"])
 
     # Adding the person who edited the object to the watchers
     if comment and not user.is_system:
-        obj.add_watcher(user)
+        watchers.append(user)
 
+    if watchers:
+        obj.add_watchers(watchers)
 
-def _filter_by_permissions(obj, user):
-    UserStory = apps.get_model("userstories", "UserStory")
-    Issue = apps.get_model("issues", "Issue")
-    Task = apps.get_model("tasks", "Task")
-    Epic = apps.get_model("epics", "Epic")
-    WikiPage = apps.get_model("wiki", "WikiPage")
 
-    if isinstance(obj, UserStory):
-        return user_has_perm(user, "view_us", obj, cache="project")
-    elif isinstance(obj, Issue):
-        return user_has_perm(user, "view_issues", obj, cache="project")
-    elif isinstance(obj, Task):
-        return user_has_perm(user, "view_tasks", obj, cache="project")
-    elif isinstance(obj, Epic):
-        return user_has_perm(user, "view_epics", obj, cache="project")
-    elif isinstance(obj, WikiPage):
-        return user_has_perm(user, "view_wiki_pages", obj, cache="project")
-    return False
+# The permission needed to be notified about the changes of every model
+_VIEW_PERMISSIONS = {
+    "userstories.userstory": "view_us",
+    "issues.issue": "view_issues",
+    "tasks.task": "view_tasks",
+    "epics.epic": "view_epics",
+    "wiki.wikipage": "view_wiki_pages",
+}
 
 
-def _filter_notificable(user):
-    return user.is_active and not user.is_system
+def _get_involved_user_ids(obj, history=None) -> list:
+    """
+    The ids of the participants of the object (owner and assigned user)
+    and, if the history is an unassignment change, the unassigned user.
+    """
+    user_ids = [getattr(obj, "owner_id", None), getattr(obj, "assigned_to_id", None)]
 
+    if history and history.type == HistoryType.change and "assigned_to" in history.diff:
+        user_ids += history.diff["assigned_to"]
+
+    return [user_id for user_id in user_ids if user_id is not None]
 
-def get_users_to_notify(obj, *, history=None, discard_users=None) -> list:
-    """
-    Get filtered set of users to notify for specified
-    model instance and changer.
 
-    NOTE: changer at this momment is not used.
-    NOTE: analogouts to obj.get_watchers_to_notify(changer)
+def get_user_ids_to_notify(obj, *, history=None, discard_users=None) -> frozenset:
     """
-    project = obj.get_project()
+    Get the ids of the users to notify about the changes of the model
+    instance in only one query:
 
-    def _check_level(project: object, user: object, levels: tuple) -> bool:
-        policy = project.cached_notify_policy_for_user(user)
-        return policy.notify_level in levels
+    - the members and the project watchers with the "all" notify level
+    - the watchers and the participants with the "all" or "involved" level
 
-    _can_notify_hard = partial(_check_level, project,
-                               levels=[NotifyLevel.all])
-    _can_notify_light = partial(_check_level, project,
-                                levels=[NotifyLevel.all, NotifyLevel.involved])
+    that are active, not system users and can view the object. The
+    candidates without a notify policy get one with the "involved" level
+    (ON CONFLICT, from PostgreSQL 9.5, ignores the ones created meanwhile).
+    """
+    project = obj.get_project()
+    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
+    perm = _VIEW_PERMISSIONS.get("{}.{}".format(obj_type.app_label, obj_type.model), None)
+    if perm is None:
+        return frozenset()
+
+    membership_model = apps.get_model("projects", "Membership")
+    notify_policy_model = apps.get_model("notifications", "NotifyPolicy")
+    sql = """
+        WITH candidates AS (
+            SELECT c.user_id, c.involved
+              FROM (SELECT user_id, false involved
+                      FROM {membership_tbl}
+                     WHERE project_id = %(project_id)s
+                 UNION ALL
+                    SELECT user_id, false involved
+                      FROM {notify_policy_tbl}
+                     WHERE project_id = %(project_id)s
+                       AND notify_level = %(level_all)s
+                 UNION ALL
+                    SELECT user_id, true involved
+                      FROM {watched_tbl}
+                     WHERE content_type_id = %(content_type_id)s
+                       AND object_id = %(object_id)s
+                 UNION ALL
+                    SELECT unnest(%(involved_ids)s::integer[]), true involved) c
+        INNER JOIN {user_tbl} u ON u.id = c.user_id
+        ),
+        new_policies AS (
+            INSERT INTO {notify_policy_tbl} (project_id, user_id, notify_level, created_at, modified_at)
+                 SELECT DISTINCT %(project_id)s, c.user_id, %(level_involved)s, %(now)s, %(now)s
+                   FROM candidates c
+                  WHERE NOT EXISTS (SELECT 1
+                                      FROM {notify_policy_tbl} np
+                                     WHERE np.project_id = %(project_id)s
+                                       AND np.user_id = c.user_id)
+            ON CONFLICT (project_id, user_id) DO NOTHING
+              RETURNING user_id, notify_level
+        ),
+        policies AS (
+            SELECT user_id, notify_level
+              FROM {notify_policy_tbl}
+             WHERE project_id = %(project_id)s
+         UNION ALL
+            SELECT user_id, notify_level
+              FROM new_policies
+        )
+        SELECT DISTINCT u.id
+          FROM candidates c
+    INNER JOIN policies np ON np.user_id = c.user_id
+    INNER JOIN {user_tbl} u ON u.id = c.user_id
+    INNER JOIN {project_tbl} p ON p.id = %(project_id)s
+     LEFT JOIN {membership_tbl} m ON m.project_id = p.id AND m.user_id = u.id
+     LEFT JOIN {role_tbl} r ON r.id = m.role_id
+         WHERE (np.notify_level = %(level_all)s OR (c.involved AND np.notify_level = %(level_involved)s))
+           AND u.is_active
+           AND NOT u.is_system
+           AND NOT (u.id = ANY(%(discard_ids)s::integer[]))
+           AND (u.is_superuser
+                OR %(perm)s = ANY(p.anon_permissions)
+                OR %(perm)s = ANY(p.public_permissions)
+                OR m.is_admin
+                OR %(perm)s = ANY(r.permissions))
+    """.format(membership_tbl=membership_model._meta.db_table,
+               notify_policy_tbl=notify_policy_model._meta.db_table,
+               watched_tbl=Watched._meta.db_table,
+               user_tbl=get_user_model()._meta.db_table,
+               project_tbl=project._meta.db_table,
+               role_tbl=apps.get_model("users", "Role")._meta.db_table)
+
+    params = {
+        "project_id": project.id,
+        "content_type_id": obj_type.id,
+        "object_id": obj.id,
+        "involved_ids": _get_involved_user_ids(obj, history=history),
+        "discard_ids": [user.id for user in discard_users or []],
+        "perm": perm,
+        "level_all": NotifyLevel.all.value,
+        "level_involved": NotifyLevel.involved.value,
+        "now": timezone.now(),
+    }
 
-    candidates = set()
-    candidates.update(filter(_can_notify_hard, project.members.all()))
-    candidates.update(filter(_can_notify_hard, obj.project.get_watchers()))
-    candidates.update(filter(_can_notify_light, obj.get_watchers()))
-    candidates.update(filter(_can_notify_light, obj.get_participants()))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        user_ids = frozenset(row[0] for row in cursor.fetchall())
 
-    # If the history is an unassignment change we should notify that user too
-    if history and history.type == HistoryType.change and "assigned_to" in history.diff:
-        assigned_to_users = get_user_model().objects.filter(id__in=history.diff["assigned_to"])
-        candidates.update(filter(_can_notify_light, assigned_to_users))
+    # The notify policies cached in the project can miss the new ones
+    project.__dict__.pop("cached_notify_policies", None)
 
-    # Remove the changer from candidates
-    if discard_users:
-        candidates = candidates - set(discard_users)
+    return user_ids
 
-    # Filter by object permissions
-    candidates = set(filter(partial(_filter_by_permissions, obj), candidates))
 
-    # Filter disabled and system users
-    candidates = set(filter(partial(_filter_notificable), candidates))
+def get_users_to_notify(obj, *, history=None, discard_users=None) -> frozenset:
+    """
+    Get filtered set of users to notify for specified
+    model instance and changer.
 
-    return frozenset(candidates)
+    NOTE: see get_user_ids_to_notify.
+    """
+    user_ids = get_user_ids_to_notify(obj, history=history, discard_users=discard_users)
+    return frozenset(get_user_model().objects.filter(id__in=user_ids))
 
 
 def _resolve_template_name(model: object, *, change_type: int) -> str:
@@ -226,28 +299,23 @@ def send_notifications(obj, *, history):
 
     # Get a complete list of notifiable users for current
     # object and send the change notification to them.
-    notify_users = get_users_to_notify(obj, history=history, discard_users=[notification.owner])
-    notification.notify_users.add(*notify_users)
+    notify_user_ids = get_user_ids_to_notify(obj, history=history, discard_users=[notification.owner])
+    notification.notify_users.add(*notify_user_ids)
 
     # If we are the min interval is 0 it just work in a synchronous and spamming way
     if settings.CHANGE_NOTIFICATIONS_MIN_INTERVAL == 0:
         send_sync_notifications(notification.id)
 
 
-@transaction.atomic
-def send_sync_notifications(notification_id):
-    """
-    Given changed instance, calculate the history entry and
-    a complete list for users to notify, send
-    email to all users.
+def _make_notification_emails(notification, template_mails=None) -> list:
     """
+    Render the emails of a change notification for all its users.
 
-    notification = HistoryChangeNotification.objects.select_for_update().get(pk=notification_id)
-    # If the last modification is too recent we ignore it
-    now = timezone.now()
-    time_diff = now - notification.updated_datetime
-    if time_diff.seconds < settings.CHANGE_NOTIFICATIONS_MIN_INTERVAL:
-        return
+    template_mails works as a cache of the template mail instances by
+    template name, shared by all the notifications of a batch.
+    """
+    if template_mails is None:
+        template_mails = {}
 
     history_entries = tuple(notification.history_entries.all().order_by("created_at"))
     obj, _ = get_last_snapshot_for_key(notification.key)
@@ -261,7 +329,9 @@ def send_sync_notifications(notification_id):
 
     model = get_model_from_key(notification.key)
     template_name = _resolve_template_name(model, change_type=notification.history_type)
-    email = _make_template_mail(template_name)
+    if template_name not in template_mails:
+        template_mails[template_name] = _make_template_mail(template_name)
+    email = template_mails[template_name]
     domain = settings.SITES["api"]["domain"].split(":")[0] or settings.SITES["api"]["domain"]
 
     if "ref" in obj.snapshot:
@@ -288,17 +358,112 @@ def send_sync_notifications(notification_id):
         "Thread-Index": make_ms_thread_index("<{project_slug}/{msg_id}@{domain}>".format(**format_args), now)
     }
 
-    for user in notification.notify_users.distinct():
-        context["user"] = user
-        context["lang"] = user.lang or settings.LANGUAGE_CODE
-        email.send(user.email, context, headers=headers)
+    # The templates are rendered once by language
+    users = notification.notify_users.distinct()
+    return list(email.make_email_objects_for_users(users, context, headers=headers))
+
+
+def _send_emails(emails):
+    """
+    Send the emails through only one connection of the email backend.
+    """
+    if not emails:
+        return 0
+
+    connection = mail.get_connection()
+    return connection.send_messages(emails)
+
+
+def send_sync_notifications(notification_id):
+    """
+    Given changed instance, calculate the history entry and
+    a complete list for users to notify, send
+    email to all users.
+    """
+    with transaction.atomic():
+        notification = HistoryChangeNotification.objects.select_for_update().get(pk=notification_id)
+        # If the last modification is too recent we ignore it
+        now = timezone.now()
+        time_diff = now - notification.updated_datetime
+        if time_diff.seconds < settings.CHANGE_NOTIFICATIONS_MIN_INTERVAL:
+            return
+
+        emails = _make_notification_emails(notification)
+        notification.delete()
+
+    # The row lock is not held while the emails are sent
+    _send_emails(emails)
+
 
-    notification.delete()
+def _claim_due_notifications(batch_size:int) -> list:
+    """
+    Lock and return a batch of the notifications not modified during the
+    last CHANGE_NOTIFICATIONS_MIN_INTERVAL seconds. The notifications locked
+    by other senders are skipped (with SKIP LOCKED, from PostgreSQL 9.5), so
+    several of them can run at once.
+    """
+    due_datetime = timezone.now() - datetime.timedelta(seconds=settings.CHANGE_NOTIFICATIONS_MIN_INTERVAL)
+    sql = """
+        SELECT id
+          FROM {tbl}
+         WHERE updated_datetime <= %s
+      ORDER BY id
+         LIMIT %s
+           FOR UPDATE SKIP LOCKED
+    """.format(tbl=HistoryChangeNotification._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [due_datetime, batch_size])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def send_sync_notifications_batch(batch_size:int=100) -> int:
+    """
+    Send the emails of one batch of due notifications, returning the
+    number of processed notifications.
 
+    The notifications are claimed, rendered and deleted in one transaction
+    and the emails are sent, through only one connection, once it is
+    committed. If the sending fails the error is logged and the emails of
+    the batch are lost, use djmail as email backend to retry them.
+    """
+    template_mails = {}
+    emails = []
+
+    with transaction.atomic():
+        notification_ids = _claim_due_notifications(batch_size)
+        if not notification_ids:
+            return 0
 
-def process_sync_notifications():
-    for notification in HistoryChangeNotification.objects.all():
-        send_sync_notifications(notification.pk)
+        notifications = (HistoryChangeNotification.objects.filter(id__in=notification_ids)
+                                                          .select_related("owner", "project"))
+        for notification in notifications:
+            emails += _make_notification_emails(notification, template_mails)
+
+        HistoryChangeNotification.objects.filter(id__in=notification_ids).delete()
+
+    try:
+        _send_emails(emails)
+    except Exception:
+        logger.exception("Error sending the emails of the notifications %s", notification_ids)
+
+    return len(notification_ids)
+
+
+def process_sync_notifications(batch_size:int=None) -> int:
+    """
+    Send the emails of all the due notifications in batches, returning the
+    number of processed notifications.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, "CHANGE_NOTIFICATIONS_BATCH_SIZE", 100)
+
+    total = 0
+    while True:
+        processed = send_sync_notifications_batch(batch_size)
+        if processed == 0:
+            return total
+        total += processed
 
 
 def _get_q_watchers(obj):
@@ -398,17 +563,159 @@ def add_watcher(obj, user):
     :param obj: Any Django model instance.
     :param user: User adding the watch. :class:`~taiga.users.models.User` instance.
     """
+    add_watchers(obj, [user])
+
+
+def _get_watchers_changes_sql(obj, changes_cte, cached_watcher_ids_sql):
+    """
+    The main query of the statements that change the watchers of an object,
+    with the changed rows in the `changes_cte` CTE. It updates the cached
+    watcher ids of the object, if its model has them, and returns them with
+    the number of changed watchers.
+    """
+    if not isinstance(obj, CachedWatchersMixin):
+        return "SELECT NULL, COUNT(*) FROM {cte}".format(cte=changes_cte)
+
+    sql = """
+        UPDATE {tbl}
+           SET cached_watcher_ids = {cached_watcher_ids_sql}
+         WHERE id = %(object_id)s
+     RETURNING cached_watcher_ids, (SELECT COUNT(*) FROM {cte})
+    """
+    return sql.format(tbl=obj._meta.db_table, cte=changes_cte, cached_watcher_ids_sql=cached_watcher_ids_sql)
+
+
+def _execute_watchers_changes(obj, sql, params) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    if row is None:
+        return 0
+
+    cached_watcher_ids, changed = row
+    if isinstance(obj, CachedWatchersMixin):
+        obj.cached_watcher_ids = cached_watcher_ids
+
+    return changed
+
+
+def _add_watchers_by_id(obj, user_ids) -> int:
+    """
+    Insert the watched objects and the missing notify policies of the users
+    in one statement, returning the number of new watchers.
+    """
+    if not user_ids:
+        return 0
+
+    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
+    sql = """
+        WITH new_policies AS (
+            INSERT INTO {notify_policy_tbl} (project_id, user_id, notify_level, created_at, modified_at)
+                 SELECT %(project_id)s, u.id, %(level)s, %(now)s, %(now)s
+                   FROM {user_tbl} u
+                  WHERE u.id = ANY(%(user_ids)s::integer[])
+                    AND NOT EXISTS (SELECT 1
+                                      FROM {notify_policy_tbl} np
+                                     WHERE np.project_id = %(project_id)s
+                                       AND np.user_id = u.id)
+            ON CONFLICT DO NOTHING
+        ),
+        new_watched AS (
+            INSERT INTO {watched_tbl} (content_type_id, object_id, user_id, project_id, created_date)
+                 SELECT %(content_type_id)s, %(object_id)s, u.id, %(project_id)s, %(now)s
+                   FROM {user_tbl} u
+                  WHERE u.id = ANY(%(user_ids)s::integer[])
+                    AND NOT EXISTS (SELECT 1
+                                      FROM {watched_tbl} w
+                                     WHERE w.content_type_id = %(content_type_id)s
+                                       AND w.object_id = %(object_id)s
+                                       AND w.user_id = u.id)
+            ON CONFLICT DO NOTHING
+              RETURNING user_id
+        )
+        {changes_sql}
+    """.format(notify_policy_tbl=apps.get_model("notifications", "NotifyPolicy")._meta.db_table,
+               watched_tbl=Watched._meta.db_table,
+               user_tbl=get_user_model()._meta.db_table,
+               changes_sql=_get_watchers_changes_sql(
+                   obj, "new_watched",
+                   "cached_watcher_ids || ARRAY(SELECT user_id FROM new_watched)"))
+
+    params = {
+        "project_id": obj.project.id,
+        "content_type_id": obj_type.id,
+        "object_id": obj.id,
+        "user_ids": list(user_ids),
+        "level": NotifyLevel.involved.value,
+        "now": timezone.now(),
+    }
+    return _execute_watchers_changes(obj, sql, params)
+
+
+def _remove_watchers_by_id(obj, user_ids, *, keep=False) -> int:
+    """
+    Delete the watched objects of the users (or, with keep, of the rest of
+    the users) in one statement, returning the number of removed watchers.
+    """
     obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
-    watched, created = Watched.objects.get_or_create(
-        content_type=obj_type,
-        object_id=obj.id,
-        user=user,
-        project=obj.project)
+    sql = """
+        WITH removed_watched AS (
+            DELETE FROM {watched_tbl}
+                  WHERE content_type_id = %(content_type_id)s
+                    AND object_id = %(object_id)s
+                    AND {condition}
+              RETURNING user_id
+        )
+        {changes_sql}
+    """.format(watched_tbl=Watched._meta.db_table,
+               condition="NOT (user_id = ANY(%(user_ids)s::integer[]))" if keep else "user_id = ANY(%(user_ids)s::integer[])",
+               changes_sql=_get_watchers_changes_sql(
+                   obj, "removed_watched",
+                   "ARRAY(SELECT w.user_id FROM unnest(cached_watcher_ids) w(user_id) "
+                   "WHERE w.user_id NOT IN (SELECT user_id FROM removed_watched))"))
+
+    params = {
+        "content_type_id": obj_type.id,
+        "object_id": obj.id,
+        "user_ids": list(user_ids),
+    }
+    return _execute_watchers_changes(obj, sql, params)
+
+
+def _bump_project_data_version(obj):
+    # The raw queries don't send the signals that do it
+    from taiga.projects.services.data_version import bump_project_data_version
+    bump_project_data_version(obj.project.id)
+
+
+def add_watchers(obj, users):
+    """Add several watchers to an object.
+
+    Like add_watcher but with only one query for all the users. The users already
+    watching the object are ignored.
+
+    :param obj: Any Django model instance.
+    :param users: Users adding the watch. :class:`~taiga.users.models.User` instances.
+    """
+    if _add_watchers_by_id(obj, {user.id for user in users}):
+        _bump_project_data_version(obj)
+
 
-    notify_policy, _ = apps.get_model("notifications", "NotifyPolicy").objects.get_or_create(
-        project=obj.project, user=user, defaults={"notify_level": NotifyLevel.involved})
+def set_watchers(obj, user_ids):
+    """Set the watchers of an object.
 
-    return watched
+    The users not in user_ids stop watching the object and the new ones are added, with
+    one DELETE and one INSERT.
+
+    :param obj: Any Django model instance.
+    :param user_ids: Ids of the users that must watch the object.
+    """
+    user_ids = set(user_ids)
+    removed = _remove_watchers_by_id(obj, user_ids, keep=True)
+    added = _add_watchers_by_id(obj, user_ids)
+    if added or removed:
+        _bump_project_data_version(obj)
 
 
 def remove_watcher(obj, user):
@@ -420,12 +727,45 @@ def remove_watcher(obj, user):
     :param obj: Any Django model instance.
     :param user: User removing the watch. :class:`~taiga.users.models.User` instance.
     """
-    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
-    qs = Watched.objects.filter(content_type=obj_type, object_id=obj.id, user=user)
-    if not qs.exists():
-        return
+    if _remove_watchers_by_id(obj, [user.id]):
+        _bump_project_data_version(obj)
+
 
-    qs.delete()
+def refresh_cached_watchers(model, ids=None) -> int:
+    """
+    Recompute the cached watcher ids of all the objects of a model (with the
+    CachedWatchersMixin), or only of the ones with the given ids, that are
+    out of date, returning their number.
+    """
+    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
+    sql = """
+        WITH watchers AS (
+            SELECT o.id,
+                   ARRAY(SELECT w.user_id
+                           FROM {watched_tbl} w
+                          WHERE w.content_type_id = %s
+                            AND w.object_id = o.id
+                       ORDER BY w.id) user_ids
+              FROM {tbl} o
+             {where}
+        )
+        UPDATE {tbl}
+           SET cached_watcher_ids = watchers.user_ids
+          FROM watchers
+         WHERE {tbl}.id = watchers.id
+           AND NOT ({tbl}.cached_watcher_ids @> watchers.user_ids
+                    AND {tbl}.cached_watcher_ids <@ watchers.user_ids
+                    AND cardinality({tbl}.cached_watcher_ids) = cardinality(watchers.user_ids))
+    """.format(tbl=model._meta.db_table, watched_tbl=Watched._meta.db_table,
+               where="WHERE o.id = ANY(%s::integer[])" if ids is not None else "")
+
+    params = [obj_type.id]
+    if ids is not None:
+        params.append(list(ids))
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
 
 
 def set_notify_policy_level(notify_policy, notify_level):
@@ -18,9 +18,29 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.apps import apps
+from taiga.base.db.lateral import attach_lateral
 from .choices import NotifyLevel
+from .models import CachedWatchersMixin
 from taiga.base.utils.text import strip_lines
 
+
+def _has_cached_watchers(queryset):
+    return issubclass(queryset.model, CachedWatchersMixin)
+
+
+def _attach_watched_lateral(queryset, select):
+    # The watchers, the total of watchers and if the user is watcher are
+    # computed with the same subquery
+    model = queryset.model
+    type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
+    sql = """SELECT coalesce(array_agg(notifications_watched.user_id), ARRAY[]::integer[]) AS user_ids,
+                    count(notifications_watched.user_id) AS total
+               FROM notifications_watched
+              WHERE notifications_watched.content_type_id = %s
+                AND notifications_watched.object_id = {tbl}.id"""
+    return attach_lateral(queryset, "watched_lateral", sql, select, params=[type.id])
+
+
 def attach_watchers_to_queryset(queryset, as_field="watchers"):
     """Attach watching user ids to each object of the queryset.
 
@@ -29,17 +49,11 @@ def attach_watchers_to_queryset(queryset, as_field="watchers"):
 
     :return: Queryset object with the additional `as_field` field.
     """
-    model = queryset.model
-    type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
+    if _has_cached_watchers(queryset):
+        sql = "{tbl}.cached_watcher_ids".format(tbl=queryset.model._meta.db_table)
+        return queryset.extra(select={as_field: sql})
 
-    sql = ("""SELECT array(SELECT user_id
-                           FROM notifications_watched
-                           WHERE notifications_watched.content_type_id = {type_id}
-                           AND notifications_watched.object_id = {tbl}.id)""")
-    sql = sql.format(type_id=type.id, tbl=model._meta.db_table)
-    qs = queryset.extra(select={as_field: sql})
-
-    return qs
+    return _attach_watched_lateral(queryset, {as_field: "{alias}.user_ids"})
 
 
 def attach_is_watcher_to_queryset(queryset, user, as_field="is_watcher"):
@@ -51,22 +65,16 @@ def attach_is_watcher_to_queryset(queryset, user, as_field="is_watcher"):
 
     :return: Queryset object with the additional `as_field` field.
     """
-    model = queryset.model
-    type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
     if user is None or user.is_anonymous():
-        sql = """SELECT false"""
-    else:
-        sql = ("""SELECT CASE WHEN (SELECT count(*)
-                                      FROM notifications_watched
-                                     WHERE notifications_watched.content_type_id = {type_id}
-                                       AND notifications_watched.object_id = {tbl}.id
-                                       AND notifications_watched.user_id = {user_id}) > 0
-                              THEN TRUE
-                              ELSE FALSE
-                         END""")
-        sql = sql.format(type_id=type.id, tbl=model._meta.db_table, user_id=user.id)
-    qs = queryset.extra(select={as_field: sql})
-    return qs
+        return queryset.extra(select={as_field: "SELECT false"})
+
+    if _has_cached_watchers(queryset):
+        sql = "{tbl}.cached_watcher_ids @> ARRAY[{user_id}]".format(tbl=queryset.model._meta.db_table,
+                                                                   user_id=int(user.id))
+        return queryset.extra(select={as_field: sql})
+
+    sql = "{{alias}}.user_ids @> ARRAY[{user_id}]".format(user_id=int(user.id))
+    return _attach_watched_lateral(queryset, {as_field: sql})
 
 
 def attach_total_watchers_to_queryset(queryset, as_field="total_watchers"):
@@ -78,12 +86,8 @@ def attach_total_watchers_to_queryset(queryset, as_field="total_watchers"):
 
     :return: Queryset object with the additional `as_field` field.
     """
-    model = queryset.model
-    type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
-    sql = ("""SELECT count(*)
-                FROM notifications_watched
-               WHERE notifications_watched.content_type_id = {type_id}
-                 AND notifications_watched.object_id = {tbl}.id""")
-    sql = sql.format(type_id=type.id, tbl=model._meta.db_table)
-    qs = queryset.extra(select={as_field: sql})
-    return qs
+    if _has_cached_watchers(queryset):
+        sql = "cardinality({tbl}.cached_watcher_ids)".format(tbl=queryset.model._meta.db_table)
+        return queryset.extra(select={as_field: sql})
+
+    return _attach_watched_lateral(queryset, {as_field: "{alias}.total"})
@@ -52,7 +52,9 @@ class OCCResourceMixin(object):
     def _validate_and_update_version(self, obj):
         current_version = None
         if obj.id:
-            current_version = type(obj).objects.model.objects.get(id=obj.id).version
+            current_version = (type(obj).objects.model.objects.filter(id=obj.id)
+                                                              .values_list("version", flat=True)
+                                                              .get())
 
             # Extract param version
             param_version = self._extract_param_version()
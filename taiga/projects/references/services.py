@@ -27,3 +27,24 @@ def get_instance_by_ref(project_id, obj_ref):
         instance = None
 
     return instance
+
+
+def get_instances_by_refs(project_id, obj_refs):
+    """
+    Resolve a collection of refs of a project at once.
+
+    Returns a dict ``{ref: reference}`` with the content objects already
+    prefetched (one query per content type). Unknown refs are not included.
+
+    The result is not cached between calls: the rendered texts are already
+    cached by project and text (see `taiga.mdrender.service.cache_by_sha`),
+    and a cache of the refs would keep deleted or renamed objects.
+    """
+    obj_refs = {int(obj_ref) for obj_ref in obj_refs}
+    if not obj_refs:
+        return {}
+
+    model_cls = apps.get_model("references", "Reference")
+    queryset = model_cls.objects.filter(project_id=project_id, ref__in=obj_refs)
+    queryset = queryset.select_related("content_type").prefetch_related("content_object")
+    return {instance.ref: instance for instance in queryset}
@@ -20,6 +20,8 @@
 # is not the baddest practice ;)
 
 from .bulk_update_order import apply_order_updates
+from .bulk_update_order import get_base_orders
+from .bulk_update_order import bulk_update_catalog_order
 from .bulk_update_order import bulk_update_severity_order
 from .bulk_update_order import bulk_update_priority_order
 from .bulk_update_order import bulk_update_issue_type_order
@@ -30,6 +32,9 @@ from .bulk_update_order import bulk_update_userstory_status_order
 from .bulk_update_order import bulk_update_epic_status_order
 from .bulk_update_order import update_projects_order_in_bulk
 
+from .data_version import get_project_data_version
+from .data_version import bump_project_data_version
+
 from .filters import get_all_tags
 
 from .invitations import send_invitation
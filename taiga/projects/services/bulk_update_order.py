@@ -17,11 +17,84 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.db import transaction, connection
+from django.db.models import Q
 from django.core.exceptions import ObjectDoesNotExist
 
 from taiga.projects import models
 
+from .data_version import bump_project_data_version
+
 from contextlib import suppress
+from functools import partial
+
+
+class _OrdersIndex:
+    """
+    Elements sorted by their initial order supporting "add one to all the
+    elements with order in a range" in O(log n).
+
+    Range increments never break the sort (elements with the same order are
+    always in or out of the range together) so the elements affected by any
+    increment are always a contiguous slice of the initial sort.
+    """
+    def __init__(self, base_orders: dict):
+        self.ids = sorted(base_orders, key=lambda id: base_orders[id])
+        self.positions = {id: pos for pos, id in enumerate(self.ids)}
+        self.orders = [base_orders[id] for id in self.ids]
+        self.size = len(self.ids)
+        self.tree = [0] * (self.size + 1)  # Fenwick tree of increments
+        self.deltas = [0] * (self.size + 1)  # Plain difference array of increments
+
+    def _add(self, pos: int, value: int):
+        self.deltas[pos] += value
+        pos += 1
+        while pos <= self.size:
+            self.tree[pos] += value
+            pos += pos & -pos
+
+    def _increment_at(self, pos: int) -> int:
+        pos += 1
+        result = 0
+        while pos > 0:
+            result += self.tree[pos]
+            pos -= pos & -pos
+        return result
+
+    def order_at(self, pos: int):
+        return self.orders[pos] + self._increment_at(pos)
+
+    def bisect(self, order) -> int:
+        """
+        Return the position of the first element with current order >= `order`.
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.order_at(middle) < order:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def increment_range(self, low_order, high_order=None) -> None:
+        """
+        Add one to the elements with low_order <= order < high_order
+        (without upper limit if high_order is None).
+        """
+        start = self.bisect(low_order)
+        end = self.size if high_order is None else self.bisect(high_order)
+        if start < end:
+            self._add(start, 1)
+            self._add(end, -1)
+
+    def increments(self):
+        """
+        Iterate over (id, total increment) of all the elements in O(n).
+        """
+        increment = 0
+        for pos, id in enumerate(self.ids):
+            increment += self.deltas[pos]
+            yield id, increment
 
 
 def apply_order_updates(base_orders: dict, new_orders: dict):
@@ -34,29 +107,35 @@ def apply_order_updates(base_orders: dict, new_orders: dict):
     and the extra calculated ones applied.
     Extra order updates can be needed when moving elements to intermediate positions.
     The elements where no order update is needed will be removed.
-    """
-    updated_order_ids = set()
 
+    The elements are sorted once by their order and each moved element shifts a
+    contiguous range of them, so the cost is O(n log n + m log² n) instead of
+    O(n * m) (n elements, m moved elements).
+    """
     # Remove the elements from new_orders non existint in base_orders
     invalid_keys = new_orders.keys() - base_orders.keys()
     [new_orders.pop(id, None) for id in invalid_keys]
 
+    index = _OrdersIndex(base_orders)
+
     # We will apply the multiple order changes by the new position order
-    sorted_new_orders = [(k, v) for k, v in new_orders.items()]
-    sorted_new_orders = sorted(sorted_new_orders, key=lambda e: e[1])
-
-    for new_order in sorted_new_orders:
-        old_order = base_orders[new_order[0]]
-        new_order = new_order[1]
-        for id, order in base_orders.items():
-            # When moving forward only the elements contained in the range new_order - old_order
+    sorted_new_orders = sorted(new_orders.items(), key=lambda e: e[1])
+
+    for id, new_order in sorted_new_orders:
+        old_order = index.order_at(index.positions[id])
+        if new_order >= old_order:
+            # When moving forward all the elements from the new_order position need to be updated
+            index.increment_range(new_order)
+        else:
+            # When moving backward only the elements contained in the range new_order - old_order
             # positions need to be updated
-            moving_backward = new_order <= old_order and order >= new_order and order < old_order
-            # When moving backward all the elements from the new_order position need to bee updated
-            moving_forward = new_order >= old_order and order >= new_order
-            if moving_backward or moving_forward:
-                base_orders[id] += 1
-                updated_order_ids.add(id)
+            index.increment_range(new_order, old_order)
+
+    updated_order_ids = set()
+    for id, increment in index.increments():
+        if increment:
+            base_orders[id] += increment
+            updated_order_ids.add(id)
 
     # Overwritting the orders specified
     for id, order in new_orders.items():
@@ -69,6 +148,22 @@ def apply_order_updates(base_orders: dict, new_orders: dict):
     [base_orders.pop(id, None) for id in removing_keys]
 
 
+def get_base_orders(queryset, field: str, new_orders: dict) -> dict:
+    """
+    Return a dict {id: order} with the elements of the queryset that can be
+    affected by applying `new_orders` with `apply_order_updates`.
+
+    Elements are only shifted from the smallest new order on, so the ones
+    before it (except the moved ones) don't need to be loaded.
+    """
+    if not new_orders:
+        return {}
+
+    min_order = min(new_orders.values())
+    queryset = queryset.filter(Q(**{"{}__gte".format(field): min_order}) | Q(id__in=list(new_orders.keys())))
+    return dict(queryset.values_list("id", field))
+
+
 def update_projects_order_in_bulk(bulk_data: list, field: str, user):
     """
     Update the order of user projects in the user membership.
@@ -92,142 +187,43 @@ def update_projects_order_in_bulk(bulk_data: list, field: str, user):
 
 
 @transaction.atomic
-def bulk_update_epic_status_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_epicstatus set "order" = $1
-        where projects_epicstatus.id = $2 and
-              projects_epicstatus.project_id = $3;
-    """
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_userstory_status_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_userstorystatus set "order" = $1
-        where projects_userstorystatus.id = $2 and
-              projects_userstorystatus.project_id = $3;
-    """
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_points_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_points set "order" = $1
-        where projects_points.id = $2 and
-              projects_points.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_task_status_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_taskstatus set "order" = $1
-        where projects_taskstatus.id = $2 and
-              projects_taskstatus.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_issue_status_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_issuestatus set "order" = $1
-        where projects_issuestatus.id = $2 and
-              projects_issuestatus.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_issue_type_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_issuetype set "order" = $1
-        where projects_issuetype.id = $2 and
-              projects_issuetype.project_id = $3;
+def bulk_update_catalog_order(model, project, user, data):
     """
+    Update the "order" of some elements of a project catalog (statuses,
+    points, priorities, severities, issue types, custom attributes...)
+    in only one query.
 
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_priority_order(project, user, data):
-    cursor = connection.cursor()
+    `data` should be a list of pairs with the following format:
 
-    sql = """
-    prepare bulk_update_order as update projects_priority set "order" = $1
-        where projects_priority.id = $2 and
-              projects_priority.project_id = $3;
+    [(<id>, <order>), ...]
     """
+    if not data:
+        return 0
 
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_severity_order(project, user, data):
-    cursor = connection.cursor()
-
+    ids, orders = zip(*data)
     sql = """
-    prepare bulk_update_order as update projects_severity set "order" = $1
-        where projects_severity.id = $2 and
-              projects_severity.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.execute("DEALLOCATE bulk_update_order")
-    cursor.close()
+        UPDATE "{tbl}"
+           SET "order" = new_orders."order"
+          FROM unnest(%s::int[], %s::int[]) AS new_orders (id, "order")
+         WHERE "{tbl}"."id" = new_orders.id
+           AND "{tbl}"."project_id" = %s
+    """.format(tbl=model._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [list(ids), list(orders), project.id])
+        updated = cursor.rowcount
+
+    # The raw query doesn't send the signals that do it
+    if updated:
+        bump_project_data_version(project.id)
+    return updated
+
+
+bulk_update_epic_status_order = partial(bulk_update_catalog_order, models.EpicStatus)
+bulk_update_userstory_status_order = partial(bulk_update_catalog_order, models.UserStoryStatus)
+bulk_update_points_order = partial(bulk_update_catalog_order, models.Points)
+bulk_update_task_status_order = partial(bulk_update_catalog_order, models.TaskStatus)
+bulk_update_issue_status_order = partial(bulk_update_catalog_order, models.IssueStatus)
+bulk_update_issue_type_order = partial(bulk_update_catalog_order, models.IssueType)
+bulk_update_priority_order = partial(bulk_update_catalog_order, models.Priority)
+bulk_update_severity_order = partial(bulk_update_catalog_order, models.Severity)
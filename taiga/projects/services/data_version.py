@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _get_data_version_key(project_id):
+    return "project-data-version-{}".format(project_id)
+
+
+def _get_initial_data_version():
+    # A lost version (evicted from the cache) must not be reused, so the
+    # versions start from the current time instead of from zero
+    return int(time.time() * 1000)
+
+
+def get_project_data_version(project_id):
+    """
+    Return the version of the content of a project. It changes every time
+    something of the project is created, changed or deleted.
+    """
+    key = _get_data_version_key(project_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _get_initial_data_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_project_data_version(project_id):
+    key = _get_data_version_key(project_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _get_initial_data_version(), timeout=None)
+
+
+def bump_project_data_version(project_id):
+    """
+    Change the version of the content of a project, discarding the data
+    cached for the previous one.
+
+    It's done again after the current transaction is committed so a request
+    that reads the project before the commit can't keep old data cached.
+    """
+    _bump_project_data_version(project_id)
+    transaction.on_commit(lambda: _bump_project_data_version(project_id))
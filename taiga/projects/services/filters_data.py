@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+from collections import OrderedDict
+from contextlib import closing
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.sql.datastructures import EmptyResultSet
+from django.utils.encoding import force_bytes
+from django.utils.translation import ugettext as _
+
+from .data_version import get_project_data_version
+
+
+#####################################################
+# Facets
+#####################################################
+
+class Facet:
+    """
+    The counts of the items of a project by the values of one of their columns.
+
+    The counts of a facet are computed without its own filter, so the user can see
+    how many items would match if they choose other values.
+    """
+    def __init__(self, name, column):
+        self.name = name
+        self.column = column
+
+    def get_counters_sql(self, filters):
+        return """
+            SELECT "{name}" "id",
+                   COUNT(*) "count"
+              FROM "items"
+             WHERE {filters}
+          GROUP BY "{name}"
+        """.format(name=self.name, filters=filters)
+
+    def get_sql(self, project):
+        raise NotImplementedError
+
+    def get_result(self, rows):
+        raise NotImplementedError
+
+
+class CatalogFacet(Facet):
+    """
+    Counts by a project catalog (statuses, types, priorities...).
+    """
+    def __init__(self, name, column, table):
+        super().__init__(name, column)
+        self.table = table
+
+    def get_sql(self, project):
+        sql = """
+                 SELECT '{name}' "facet",
+                        json_build_object('id', "{table}"."id",
+                                          'name', "{table}"."name",
+                                          'color', "{table}"."color",
+                                          'order', "{table}"."order",
+                                          'count', COALESCE("{name}_counters"."count", 0)) "data"
+                   FROM "{table}"
+        LEFT OUTER JOIN "{name}_counters"
+                     ON "{name}_counters"."id" = "{table}"."id"
+                  WHERE "{table}"."project_id" = %s
+        """.format(name=self.name, table=self.table)
+        return sql, [project.id]
+
+    def get_result(self, rows):
+        result = []
+        for row in rows:
+            row["name"] = _(row["name"])
+            result.append(row)
+        return sorted(result, key=itemgetter("order"))
+
+
+class AssignedToFacet(Facet):
+    """
+    Counts by the members of the project, and of the unassigned items.
+    """
+    def get_sql(self, project):
+        sql = """
+                 SELECT '{name}' "facet",
+                        json_build_object('id', "projects_membership"."user_id",
+                                          'full_name', "users_user"."full_name",
+                                          'username', "users_user"."username",
+                                          'count', COALESCE("{name}_counters"."count", 0)) "data"
+                   FROM "projects_membership"
+             INNER JOIN "users_user"
+                     ON "projects_membership"."user_id" = "users_user"."id"
+        LEFT OUTER JOIN "{name}_counters"
+                     ON "{name}_counters"."id" = "projects_membership"."user_id"
+                  WHERE "projects_membership"."project_id" = %s AND "projects_membership"."user_id" IS NOT NULL
+
+              UNION ALL
+
+                 SELECT '{name}' "facet",
+                        json_build_object('id', NULL,
+                                          'full_name', NULL,
+                                          'username', NULL,
+                                          'count', "{name}_counters"."count") "data"
+                   FROM "{name}_counters"
+                  WHERE "{name}_counters"."id" IS NULL
+        """.format(name=self.name)
+        return sql, [project.id]
+
+    def get_result(self, rows):
+        result = []
+        none_valued_added = False
+        for row in rows:
+            result.append({
+                "id": row["id"],
+                "full_name": row["full_name"] or row["username"] or "",
+                "count": row["count"],
+            })
+
+            if row["id"] is None:
+                none_valued_added = True
+
+        # If there was no item with null assigned_to we manually add it
+        if not none_valued_added:
+            result.append({
+                "id": None,
+                "full_name": "",
+                "count": 0,
+            })
+
+        return sorted(result, key=itemgetter("full_name"))
+
+
+class OwnersFacet(Facet):
+    """
+    Counts by the members of the project and the system users.
+    """
+    def get_sql(self, project):
+        sql = """
+                 SELECT '{name}' "facet",
+                        json_build_object('id', "users_user"."id",
+                                          'full_name', "users_user"."full_name",
+                                          'username', "users_user"."username",
+                                          'count', "{name}_counters"."count") "data"
+                   FROM "{name}_counters"
+             INNER JOIN "users_user"
+                     ON "users_user"."id" = "{name}_counters"."id"
+                  WHERE "users_user"."is_system" IS TRUE
+                     OR "users_user"."id" IN (SELECT "projects_membership"."user_id"
+                                                FROM "projects_membership"
+                                               WHERE "projects_membership"."project_id" = %s)
+        """.format(name=self.name)
+        return sql, [project.id]
+
+    def get_result(self, rows):
+        result = []
+        for row in rows:
+            result.append({
+                "id": row["id"],
+                "full_name": row["full_name"] or row["username"] or "",
+                "count": row["count"],
+            })
+        return sorted(result, key=itemgetter("full_name"))
+
+
+class TagsFacet(Facet):
+    """
+    Counts by the tags of the project.
+    """
+    def get_counters_sql(self, filters):
+        return """
+            SELECT "tag" "id",
+                   COUNT(*) "count"
+              FROM "items",
+                   UNNEST("items"."{name}") "tag"
+             WHERE {filters}
+          GROUP BY "tag"
+        """.format(name=self.name, filters=filters)
+
+    def get_sql(self, project):
+        sql = """
+                 SELECT '{name}' "facet",
+                        json_build_object('name', "project_tags"."tag_color"[1],
+                                          'color', "project_tags"."tag_color"[2],
+                                          'count', COALESCE("{name}_counters"."count", 0)) "data"
+                   FROM (SELECT reduce_dim("projects_project"."tags_colors") "tag_color"
+                           FROM "projects_project"
+                          WHERE "projects_project"."id" = %s) "project_tags"
+        LEFT OUTER JOIN "{name}_counters"
+                     ON "{name}_counters"."id" = "project_tags"."tag_color"[1]
+        """.format(name=self.name)
+        return sql, [project.id]
+
+    def get_result(self, rows):
+        return sorted(rows, key=itemgetter("name"))
+
+
+class EpicsFacet(Facet):
+    """
+    Counts by the epics of the project, and of the items without epics. The column
+    is an array with the epics of every item.
+    """
+    def get_counters_sql(self, filters):
+        return """
+                 SELECT "epic_id" "id",
+                        COUNT(*) "count"
+                   FROM "items"
+        LEFT OUTER JOIN LATERAL UNNEST("items"."{name}") "epic_id"
+                     ON TRUE
+                  WHERE {filters}
+               GROUP BY "epic_id"
+        """.format(name=self.name, filters=filters)
+
+    def get_sql(self, project):
+        sql = """
+                 SELECT '{name}' "facet",
+                        json_build_object('id', NULL,
+                                          'ref', NULL,
+                                          'subject', NULL,
+                                          'order', 0,
+                                          'count', "{name}_counters"."count") "data"
+                   FROM "{name}_counters"
+                  WHERE "{name}_counters"."id" IS NULL
+
+              UNION ALL
+
+                 SELECT '{name}' "facet",
+                        json_build_object('id', "epics_epic"."id",
+                                          'ref', "epics_epic"."ref",
+                                          'subject', "epics_epic"."subject",
+                                          'order', "epics_epic"."epics_order",
+                                          'count', COALESCE("{name}_counters"."count", 0)) "data"
+                   FROM "epics_epic"
+        LEFT OUTER JOIN "{name}_counters"
+                     ON "{name}_counters"."id" = "epics_epic"."id"
+                  WHERE "epics_epic"."project_id" = %s
+        """.format(name=self.name)
+        return sql, [project.id]
+
+    def get_result(self, rows):
+        result = sorted(rows, key=lambda k: (k["order"], k["id"] or 0))
+
+        # Add row when there is no items with no epics
+        if result == [] or result[0]["id"] is not None:
+            result.insert(0, {
+                "id": None,
+                "ref": None,
+                "subject": None,
+                "order": 0,
+                "count": 0,
+            })
+        return result
+
+
+#####################################################
+# Filters data
+#####################################################
+
+def _get_where_sql(queryset):
+    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
+    try:
+        where, where_params = queryset.query.where.as_sql(compiler, connection)
+    except EmptyResultSet:
+        return "FALSE", []
+    return where or "TRUE", list(where_params)
+
+
+def _get_filters_data_sql(project, facets, queryset, facets_querysets, from_sql, group_by):
+    table = queryset.model._meta.db_table
+    columns = ['"{}"."id" "id"'.format(table)]
+    params = []
+    filtered_facets = []
+
+    for facet in facets:
+        columns.append('{} "{}"'.format(facet.column, facet.name))
+
+        if facet.name in facets_querysets:
+            filter_sql, filter_params = _get_where_sql(facets_querysets[facet.name])
+            if group_by:
+                # Any of the joined rows of the item can match the filter
+                filter_sql = "bool_or({})".format(filter_sql)
+
+            columns.append('{} "{}_filter"'.format(filter_sql, facet.name))
+            params += filter_params
+            filtered_facets.append(facet.name)
+
+    where, where_params = _get_where_sql(queryset)
+    params += where_params
+
+    items_sql = """
+        SELECT {columns}
+          FROM {from_sql}
+         WHERE {where}
+    """.format(columns=", ".join(columns), from_sql=from_sql, where=where)
+    if group_by:
+        items_sql += ' GROUP BY "{}"."id"'.format(table)
+
+    ctes = ['"items" AS ({})'.format(items_sql)]
+    selects = []
+    for facet in facets:
+        # Every facet is counted with the filters of the others
+        filters = ['"{}_filter"'.format(name) for name in filtered_facets if name != facet.name]
+        ctes.append('"{}_counters" AS ({})'.format(facet.name, facet.get_counters_sql(" AND ".join(filters) or "TRUE")))
+
+        select_sql, select_params = facet.get_sql(project)
+        selects.append(select_sql)
+        params += select_params
+
+    sql = "WITH {} {}".format(", ".join(ctes), " UNION ALL ".join(selects))
+    return sql, params
+
+
+def _get_filters_data_rows(project, sql, params):
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def get_filters_data(project, facets, queryset, facets_querysets, from_sql, group_by=False):
+    """
+    Return the counts of every facet of the items in the queryset in one query.
+
+    `queryset` is filtered with all the filters but the ones of the facets,
+    `facets_querysets` has, by facet name, a queryset filtered only with the
+    filter of the facet and `from_sql` are the tables that the filters use. If
+    the joins of `from_sql` return more than one row by item `group_by` must be
+    True.
+
+    The result is cached for FILTERS_DATA_CACHE_TIMEOUT seconds (60 by default)
+    until the data of the project changes.
+    """
+    sql, params = _get_filters_data_sql(project, facets, queryset, facets_querysets, from_sql, group_by)
+
+    timeout = getattr(settings, "FILTERS_DATA_CACHE_TIMEOUT", 60)
+    if timeout:
+        query_hash = hashlib.sha1(force_bytes(repr((sql, params)))).hexdigest()
+        key = "filters-data-{}-{}-{}".format(project.id, get_project_data_version(project.id), query_hash)
+        rows = cache.get(key)
+        if rows is None:
+            rows = _get_filters_data_rows(project, sql, params)
+            cache.set(key, rows, timeout=timeout)
+    else:
+        rows = _get_filters_data_rows(project, sql, params)
+
+    facets_rows = {facet.name: [] for facet in facets}
+    for name, data in rows:
+        facets_rows[name].append(data)
+
+    return OrderedDict((facet.name, facet.get_result(facets_rows[facet.name])) for facet in facets)
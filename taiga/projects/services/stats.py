@@ -22,6 +22,7 @@ from django.apps import apps
 import datetime
 import copy
 import collections
+from itertools import chain
 
 
 def _count_status_object(status_obj, counting_storage):
@@ -379,7 +380,9 @@ def _get_wiki_changes_per_member_stats(project):
     wiki_changes = {}
     wiki_page_keys = ["wiki.wikipage:%s"%id for id in project.wiki_pages.values_list("id", flat=True)]
     HistoryEntry = apps.get_model('history', 'HistoryEntry')
-    history_entries = HistoryEntry.objects.filter(key__in=wiki_page_keys).values('user')
+    ArchivedHistoryEntry = apps.get_model('history', 'ArchivedHistoryEntry')
+    history_entries = chain(HistoryEntry.objects.filter(key__in=wiki_page_keys).values('user'),
+                            ArchivedHistoryEntry.objects.filter(key__in=wiki_page_keys).values('user'))
     for entry in history_entries:
         editions = wiki_changes.get(entry["user"]["pk"], 0)
         wiki_changes[entry["user"]["pk"]] = editions + 1
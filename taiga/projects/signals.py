@@ -19,6 +19,7 @@
 from django.apps import apps
 from django.conf import settings
 
+from taiga.permissions.services import invalidate_project_permissions
 from taiga.projects.notifications.services import create_notify_policy_if_not_exists
 from taiga.base.utils.db import get_typename_for_model_class
 
@@ -35,6 +36,17 @@ def membership_post_delete(sender, instance, using, **kwargs):
     instance.project.update_role_points()
 
 
+## Permissions
+
+def project_invalidate_permissions(sender, instance, **kwargs):
+    invalidate_project_permissions(instance.id)
+
+
+def membership_or_role_invalidate_permissions(sender, instance, **kwargs):
+    if instance.project_id is not None:
+        invalidate_project_permissions(instance.project_id)
+
+
 ## Notify policy
 
 def create_notify_policy(sender, instance, using, **kwargs):
@@ -26,11 +26,14 @@ from django.utils.translation import ugettext_lazy as _
 from taiga.base.utils.time import timestamp_ms
 from taiga.projects.occ import OCCModelMixin
 from taiga.projects.notifications.mixins import WatchedModelMixin
+from taiga.projects.notifications.models import CachedWatchersMixin
+from taiga.projects.votes.models import CachedVotersMixin
 from taiga.projects.mixins.blocked import BlockedMixin
 from taiga.projects.tagging.models import TaggedMixin
 
 
-class Task(OCCModelMixin, WatchedModelMixin, BlockedMixin, TaggedMixin, models.Model):
+class Task(OCCModelMixin, WatchedModelMixin, BlockedMixin, TaggedMixin,
+           CachedWatchersMixin, CachedVotersMixin, models.Model):
     user_story = models.ForeignKey("userstories.UserStory", null=True, blank=True,
                                    related_name="tasks", verbose_name=_("user story"))
     ref = models.BigIntegerField(db_index=True, null=True, blank=True, default=None,
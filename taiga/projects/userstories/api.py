@@ -20,7 +20,7 @@ from django.apps import apps
 from django.db import transaction
 
 from django.utils.translation import ugettext as _
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
 from taiga.base import filters as base_filters
 from taiga.base import exceptions as exc
@@ -37,6 +37,8 @@ from taiga.projects.history.mixins import HistoryResourceMixin
 from taiga.projects.history.services import take_snapshot
 from taiga.projects.milestones.models import Milestone
 from taiga.projects.mixins.by_ref import ByRefMixin
+from taiga.projects.mixins.cache import PublicResponseCacheMixin
+from taiga.projects.mixins.conditional import ConditionalGetMixin
 from taiga.projects.models import Project, UserStoryStatus
 from taiga.projects.notifications.mixins import WatchedResourceMixin
 from taiga.projects.notifications.mixins import WatchersViewSetMixin
@@ -55,7 +57,8 @@ from . import validators
 
 
 class UserStoryViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixin, WatchedResourceMixin,
-                       ByRefMixin, TaggedResourceMixin, BlockedByProjectMixin, ModelCrudViewSet):
+                       ByRefMixin, TaggedResourceMixin, ConditionalGetMixin, PublicResponseCacheMixin,
+                       BlockedByProjectMixin, ModelCrudViewSet):
     validator_class = validators.UserStoryValidator
     queryset = models.UserStory.objects.all()
     permission_classes = (permissions.UserStoryPermission,)
@@ -280,21 +283,21 @@ class UserStoryViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixi
         project_id = request.QUERY_PARAMS.get("project", None)
         project = get_object_or_404(Project, id=project_id)
 
-        filter_backends = self.get_filter_backends()
-        statuses_filter_backends = (f for f in filter_backends if f != base_filters.StatusesFilter)
-        assigned_to_filter_backends = (f for f in filter_backends if f != base_filters.AssignedToFilter)
-        owners_filter_backends = (f for f in filter_backends if f != base_filters.OwnersFilter)
-        epics_filter_backends = (f for f in filter_backends if f != filters.EpicFilter)
-
-        queryset = self.get_queryset()
-        querysets = {
-            "statuses": self.filter_queryset(queryset, filter_backends=statuses_filter_backends),
-            "assigned_to": self.filter_queryset(queryset, filter_backends=assigned_to_filter_backends),
-            "owners": self.filter_queryset(queryset, filter_backends=owners_filter_backends),
-            "tags": self.filter_queryset(queryset),
-            "epics": self.filter_queryset(queryset, filter_backends=epics_filter_backends)
+        facets_filter_backends = {
+            "statuses": base_filters.StatusesFilter,
+            "assigned_to": base_filters.AssignedToFilter,
+            "owners": base_filters.OwnersFilter,
+            "epics": filters.EpicFilter,
         }
-        return response.Ok(services.get_userstories_filters_data(project, querysets))
+        filter_backends = (f for f in self.get_filter_backends() if f not in facets_filter_backends.values())
+        queryset = self.filter_queryset(self.get_queryset(), filter_backends=filter_backends)
+
+        facets_querysets = {}
+        for name, filter_backend in facets_filter_backends.items():
+            facets_querysets[name] = self.filter_queryset(models.UserStory.objects.all(),
+                                                          filter_backends=[filter_backend])
+
+        return response.Ok(services.get_userstories_filters_data(project, queryset, facets_querysets))
 
     @list_route(methods=["GET"])
     def csv(self, request):
@@ -304,8 +307,8 @@ class UserStoryViewSet(OCCResourceMixin, VotedResourceMixin, HistoryResourceMixi
 
         project = get_object_or_404(Project, userstories_csv_uuid=uuid)
         queryset = project.user_stories.all().order_by('ref')
-        data = services.userstories_to_csv(project, queryset)
-        csv_response = HttpResponse(data.getvalue(), content_type='application/csv; charset=utf-8')
+        data = services.iter_userstories_csv(project, queryset)
+        csv_response = StreamingHttpResponse(data, content_type='application/csv; charset=utf-8')
         csv_response['Content-Disposition'] = 'attachment; filename="userstories.csv"'
         return csv_response
 
@@ -16,25 +16,24 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import csv
 import io
-from collections import OrderedDict
-from operator import itemgetter
-from contextlib import closing
 
-from django.db import connection
 from django.utils import timezone
-from django.utils.translation import ugettext as _
 
 from taiga.base.utils import db, text
+from taiga.base.utils.iterators import iter_csv, iter_queryset_in_chunks
 from taiga.projects.history.services import take_snapshot
 from taiga.projects.services import apply_order_updates
+from taiga.projects.services import filters_data
+from taiga.projects.services import get_base_orders
 from taiga.projects.userstories.apps import connect_userstories_signals
 from taiga.projects.userstories.apps import disconnect_userstories_signals
 from taiga.events import events
 from taiga.projects.tasks.models import Task
 from taiga.projects.votes.utils import attach_total_voters_to_queryset
 from taiga.projects.notifications.utils import attach_watchers_to_queryset
+from taiga.projects.attachments.utils import attach_total_attachments
+from taiga.projects.userstories.utils import attach_task_refs
 
 from . import models
 
@@ -91,8 +90,8 @@ def update_userstories_order_in_bulk(bulk_data: list, field: str, project: objec
     if milestone is not None:
         user_stories = user_stories.filter(milestone=milestone)
 
-    us_orders = {us.id: getattr(us, field) for us in user_stories}
     new_us_orders = {e["us_id"]: e["order"] for e in bulk_data}
+    us_orders = get_base_orders(user_stories, field, new_us_orders)
     apply_order_updates(us_orders, new_us_orders)
 
     user_story_ids = us_orders.keys()
@@ -110,11 +109,9 @@ def update_userstories_milestone_in_bulk(bulk_data: list, milestone: object):
     `bulk_data` should be a list of dicts with the following format:
     [{'us_id': <value>, 'order': <value>}, ...]
     """
-    user_stories = milestone.user_stories.all()
-    us_orders = {us.id: getattr(us, "sprint_order") for us in user_stories}
-    new_us_orders = {}
+    new_us_orders = {e["us_id"]: e["order"] for e in bulk_data}
+    us_orders = get_base_orders(milestone.user_stories.all(), "sprint_order", new_us_orders)
     for e in bulk_data:
-        new_us_orders[e["us_id"]] = e["order"]
         # The base orders where we apply the new orders must containg all the values
         us_orders[e["us_id"]] = e["order"]
 
@@ -127,8 +124,12 @@ def update_userstories_milestone_in_bulk(bulk_data: list, milestone: object):
                               content_type="userstories.userstory",
                               projectid=milestone.project.pk)
 
-    db.update_attr_in_bulk_for_ids(us_milestones, "milestone_id", model=models.UserStory)
-    db.update_attr_in_bulk_for_ids(us_orders, "sprint_order", models.UserStory)
+    # The moved user stories and the shifted ones (already in the milestone) in one pass
+    us_milestones_and_orders = {id: (milestone.id, order) for id, order in us_orders.items()}
+    us_milestones_and_orders.update({e["us_id"]: (milestone.id, e["order"]) for e in bulk_data
+                                     if e["us_id"] not in us_orders})
+    db.update_attrs_in_bulk_for_ids(us_milestones_and_orders, ("milestone_id", "sprint_order"),
+                                    model=models.UserStory)
 
     # Updating the milestone for the tasks
     Task.objects.filter(user_story_id__in=[e["us_id"] for e in bulk_data]).update(milestone=milestone)
@@ -180,13 +181,17 @@ def open_userstory(us):
 # CSV
 #####################################################
 
-def userstories_to_csv(project, queryset):
-    csv_data = io.StringIO()
+def iter_userstories_csv(project, queryset, chunk_size=500):
+    """
+    Return a generator of the lines of the CSV file with the user stories of
+    the queryset. They are loaded in chunks of chunk_size, so it can be
+    streamed.
+    """
     fieldnames = ["ref", "subject", "description", "sprint", "sprint_estimated_start",
                   "sprint_estimated_finish", "owner", "owner_full_name", "assigned_to",
                   "assigned_to_full_name", "status", "is_closed"]
 
-    roles = project.roles.filter(computable=True).order_by('slug')
+    roles = list(project.roles.filter(computable=True).order_by('slug'))
     for role in roles:
         fieldnames.append("{}-points".format(role.slug))
 
@@ -198,71 +203,74 @@ def userstories_to_csv(project, queryset):
                    "generated_from_issue", "external_reference", "tasks",
                    "tags", "watchers", "voters"]
 
-    custom_attrs = project.userstorycustomattributes.all()
+    custom_attrs = list(project.userstorycustomattributes.all())
     for custom_attr in custom_attrs:
         fieldnames.append(custom_attr.name)
 
-    queryset = queryset.prefetch_related("role_points",
-                                         "role_points__points",
-                                         "role_points__role",
-                                         "tasks",
-                                         "attachments",
-                                         "custom_attributes_values")
+    queryset = queryset.prefetch_related("role_points__points")
     queryset = queryset.select_related("milestone",
                                        "project",
                                        "status",
                                        "owner",
                                        "assigned_to",
-                                       "generated_from_issue")
+                                       "generated_from_issue",
+                                       "custom_attributes_values")
 
     queryset = attach_total_voters_to_queryset(queryset)
     queryset = attach_watchers_to_queryset(queryset)
+    queryset = attach_total_attachments(queryset)
+    queryset = attach_task_refs(queryset)
+
+    def _iter_rows():
+        for us in iter_queryset_in_chunks(queryset, chunk_size):
+            row = {
+                "ref": us.ref,
+                "subject": us.subject,
+                "description": us.description,
+                "sprint": us.milestone.name if us.milestone else None,
+                "sprint_estimated_start": us.milestone.estimated_start if us.milestone else None,
+                "sprint_estimated_finish": us.milestone.estimated_finish if us.milestone else None,
+                "owner": us.owner.username if us.owner else None,
+                "owner_full_name": us.owner.get_full_name() if us.owner else None,
+                "assigned_to": us.assigned_to.username if us.assigned_to else None,
+                "assigned_to_full_name": us.assigned_to.get_full_name() if us.assigned_to else None,
+                "status": us.status.name if us.status else None,
+                "is_closed": us.is_closed,
+                "backlog_order": us.backlog_order,
+                "sprint_order": us.sprint_order,
+                "kanban_order": us.kanban_order,
+                "created_date": us.created_date,
+                "modified_date": us.modified_date,
+                "finish_date": us.finish_date,
+                "client_requirement": us.client_requirement,
+                "team_requirement": us.team_requirement,
+                "attachments": us.total_attachments_attr,
+                "generated_from_issue": us.generated_from_issue.ref if us.generated_from_issue else None,
+                "external_reference": us.external_reference,
+                "tasks": ",".join([str(ref) for ref in us.task_refs_attr]),
+                "tags": ",".join(us.tags or []),
+                "watchers": us.watchers,
+                "voters": us.total_voters
+            }
+
+            us_role_points_by_role_id = {us_rp.role_id: us_rp.points.value for us_rp in us.role_points.all()}
+            for role in roles:
+                row["{}-points".format(role.slug)] = us_role_points_by_role_id.get(role.id, 0)
+
+            row['total-points'] = us.get_total_points()
+
+            for custom_attr in custom_attrs:
+                value = us.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
+                row[custom_attr.name] = value
+
+            yield row
+
+    return iter_csv(fieldnames, _iter_rows())
 
-    writer = csv.DictWriter(csv_data, fieldnames=fieldnames)
-    writer.writeheader()
-    for us in queryset:
-        row = {
-            "ref": us.ref,
-            "subject": us.subject,
-            "description": us.description,
-            "sprint": us.milestone.name if us.milestone else None,
-            "sprint_estimated_start": us.milestone.estimated_start if us.milestone else None,
-            "sprint_estimated_finish": us.milestone.estimated_finish if us.milestone else None,
-            "owner": us.owner.username if us.owner else None,
-            "owner_full_name": us.owner.get_full_name() if us.owner else None,
-            "assigned_to": us.assigned_to.username if us.assigned_to else None,
-            "assigned_to_full_name": us.assigned_to.get_full_name() if us.assigned_to else None,
-            "status": us.status.name if us.status else None,
-            "is_closed": us.is_closed,
-            "backlog_order": us.backlog_order,
-            "sprint_order": us.sprint_order,
-            "kanban_order": us.kanban_order,
-            "created_date": us.created_date,
-            "modified_date": us.modified_date,
-            "finish_date": us.finish_date,
-            "client_requirement": us.client_requirement,
-            "team_requirement": us.team_requirement,
-            "attachments": us.attachments.count(),
-            "generated_from_issue": us.generated_from_issue.ref if us.generated_from_issue else None,
-            "external_reference": us.external_reference,
-            "tasks": ",".join([str(task.ref) for task in us.tasks.all()]),
-            "tags": ",".join(us.tags or []),
-            "watchers": us.watchers,
-            "voters": us.total_voters
-        }
-
-        us_role_points_by_role_id = {us_rp.role.id: us_rp.points.value for us_rp in us.role_points.all()}
-        for role in roles:
-            row["{}-points".format(role.slug)] = us_role_points_by_role_id.get(role.id, 0)
-
-        row['total-points'] = us.get_total_points()
-
-        for custom_attr in custom_attrs:
-            value = us.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
-            row[custom_attr.name] = value
-
-        writer.writerow(row)
 
+def userstories_to_csv(project, queryset):
+    csv_data = io.StringIO()
+    csv_data.writelines(iter_userstories_csv(project, queryset))
     return csv_data
 
 
@@ -270,335 +278,30 @@ def userstories_to_csv(project, queryset):
 # Api filter data
 #####################################################
 
-def _get_userstories_statuses(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-     WITH "us_counters" AS (
-         SELECT DISTINCT "userstories_userstory"."status_id" "status_id",
-                         "userstories_userstory"."id" "us_id"
-                    FROM "userstories_userstory"
-              INNER JOIN "projects_project"
-                      ON ("userstories_userstory"."project_id" = "projects_project"."id")
-         LEFT OUTER JOIN "epics_relateduserstory"
-                      ON "userstories_userstory"."id" = "epics_relateduserstory"."user_story_id"
-                   WHERE {where}
-            ),
-             "counters" AS (
-                  SELECT "status_id",
-                         COUNT("status_id") "count"
-                    FROM "us_counters"
-                GROUP BY "status_id"
-            )
-
-                 SELECT "projects_userstorystatus"."id",
-                        "projects_userstorystatus"."name",
-                        "projects_userstorystatus"."color",
-                        "projects_userstorystatus"."order",
-                        COALESCE("counters"."count", 0)
-                   FROM "projects_userstorystatus"
-        LEFT OUTER JOIN "counters"
-                     ON "counters"."status_id" = "projects_userstorystatus"."id"
-                  WHERE "projects_userstorystatus"."project_id" = %s
-               ORDER BY "projects_userstorystatus"."order";
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, name, color, order, count in rows:
-        result.append({
-            "id": id,
-            "name": _(name),
-            "color": color,
-            "order": order,
-            "count": count,
-        })
-    return sorted(result, key=itemgetter("order"))
-
-
-def _get_userstories_assigned_to(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-     WITH "us_counters" AS (
-         SELECT DISTINCT "userstories_userstory"."assigned_to_id" "assigned_to_id",
-                         "userstories_userstory"."id" "us_id"
-                    FROM "userstories_userstory"
-              INNER JOIN "projects_project"
-                      ON ("userstories_userstory"."project_id" = "projects_project"."id")
-         LEFT OUTER JOIN "epics_relateduserstory"
-                      ON "userstories_userstory"."id" = "epics_relateduserstory"."user_story_id"
-                   WHERE {where}
-            ),
-
-            "counters" AS (
-                 SELECT "assigned_to_id",
-                        COUNT("assigned_to_id")
-                   FROM "us_counters"
-               GROUP BY "assigned_to_id"
-            )
-
-                 SELECT "projects_membership"."user_id" "user_id",
-                        "users_user"."full_name" "full_name",
-                        "users_user"."username" "username",
-                        COALESCE("counters".count, 0) "count"
-                   FROM "projects_membership"
-        LEFT OUTER JOIN "counters"
-                     ON ("projects_membership"."user_id" = "counters"."assigned_to_id")
-             INNER JOIN "users_user"
-                     ON ("projects_membership"."user_id" = "users_user"."id")
-                  WHERE "projects_membership"."project_id" = %s AND "projects_membership"."user_id" IS NOT NULL
-
-        -- unassigned userstories
-        UNION
-
-                 SELECT NULL "user_id",
-                        NULL "full_name",
-                        NULL "username",
-                        count(coalesce("assigned_to_id", -1)) "count"
-                   FROM "userstories_userstory"
-             INNER JOIN "projects_project"
-                     ON ("userstories_userstory"."project_id" = "projects_project"."id")
-        LEFT OUTER JOIN "epics_relateduserstory"
-                     ON ("userstories_userstory"."id" = "epics_relateduserstory"."user_story_id")
-                  WHERE {where} AND "userstories_userstory"."assigned_to_id" IS NULL
-               GROUP BY "assigned_to_id"
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id] + where_params)
-        rows = cursor.fetchall()
-
-    result = []
-    none_valued_added = False
-    for id, full_name, username, count in rows:
-        result.append({
-            "id": id,
-            "full_name": full_name or username or "",
-            "count": count,
-        })
-
-        if id is None:
-            none_valued_added = True
-
-    # If there was no userstory with null assigned_to we manually add it
-    if not none_valued_added:
-        result.append({
-            "id": None,
-            "full_name": "",
-            "count": 0,
-        })
-
-    return sorted(result, key=itemgetter("full_name"))
-
-
-def _get_userstories_owners(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-     WITH "us_counters" AS(
-         SELECT DISTINCT "userstories_userstory"."owner_id" "owner_id",
-                         "userstories_userstory"."id" "us_id"
-                    FROM "userstories_userstory"
-              INNER JOIN "projects_project"
-                      ON ("userstories_userstory"."project_id" = "projects_project"."id")
-         LEFT OUTER JOIN "epics_relateduserstory"
-                      ON ("userstories_userstory"."id" = "epics_relateduserstory"."user_story_id")
-                   WHERE {where}
-            ),
-
-            "counters" AS (
-                 SELECT "owner_id",
-                        COUNT("owner_id")
-                   FROM "us_counters"
-               GROUP BY "owner_id"
-            )
-
-                 SELECT "projects_membership"."user_id" "user_id",
-                        "users_user"."full_name",
-                        "users_user"."username",
-                        COALESCE("counters".count, 0) "count"
-                   FROM "projects_membership"
-        LEFT OUTER JOIN "counters"
-                     ON ("projects_membership"."user_id" = "counters"."owner_id")
-             INNER JOIN "users_user"
-                     ON ("projects_membership"."user_id" = "users_user"."id")
-                  WHERE "projects_membership"."project_id" = %s AND "projects_membership"."user_id" IS NOT NULL
-
-        -- System users
-                  UNION
-
-                 SELECT "users_user"."id" "user_id",
-                        "users_user"."full_name" "full_name",
-                        "users_user"."username" "username",
-                        COALESCE("counters"."count", 0) "count"
-                   FROM "users_user"
-        LEFT OUTER JOIN "counters"
-                     ON ("users_user"."id" = "counters"."owner_id")
-                  WHERE ("users_user"."is_system" IS TRUE)
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, full_name, username, count in rows:
-        if count > 0:
-            result.append({
-                "id": id,
-                "full_name": full_name or username or "",
-                "count": count,
-            })
-    return sorted(result, key=itemgetter("full_name"))
-
-
-def _get_userstories_tags(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-           WITH "userstories_tags" AS (
-                       SELECT "tag",
-                              COUNT("tag") "counter"
-                         FROM (
-                          SELECT DISTINCT "userstories_userstory"."id" "us_id",
-                                           UNNEST("userstories_userstory"."tags") "tag"
-                                     FROM "userstories_userstory"
-                               INNER JOIN "projects_project"
-                                       ON ("userstories_userstory"."project_id" = "projects_project"."id")
-                          LEFT OUTER JOIN "epics_relateduserstory"
-                                       ON ("userstories_userstory"."id" = "epics_relateduserstory"."user_story_id")
-                                    WHERE {where}
-                              ) "tags"
-                     GROUP BY "tag"),
-
-                "project_tags" AS (
-                       SELECT reduce_dim("tags_colors") "tag_color"
-                         FROM "projects_project"
-                        WHERE "id"=%s)
-
-         SELECT "tag_color"[1] "tag",
-                "tag_color"[2] "color",
-                COALESCE("userstories_tags"."counter", 0) "counter"
-           FROM "project_tags"
-LEFT OUTER JOIN "userstories_tags"
-             ON "project_tags"."tag_color"[1] = "userstories_tags"."tag"
-       ORDER BY "tag"
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for name, color, count in rows:
-        result.append({
-            "name": name,
-            "color": color,
-            "count": count,
-        })
-    return sorted(result, key=itemgetter("name"))
-
-
-def _get_userstories_epics(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-    extra_sql = """
-       WITH "counters" AS (
-               SELECT "epics_relateduserstory"."epic_id" AS "epic_id",
-                      count("epics_relateduserstory"."id") AS "counter"
-                 FROM "epics_relateduserstory"
-           INNER JOIN "userstories_userstory"
-                   ON ("userstories_userstory"."id" = "epics_relateduserstory"."user_story_id")
-           INNER JOIN "projects_project"
-                   ON ("userstories_userstory"."project_id" = "projects_project"."id")
-                WHERE {where}
-             GROUP BY "epics_relateduserstory"."epic_id"
-       )
-
-         -- User stories with no epics (return results only if there are userstories)
-               SELECT NULL AS "id",
-                      NULL AS "ref",
-                      NULL AS "subject",
-                      0 AS "order",
-                      count(COALESCE("epics_relateduserstory"."epic_id", -1)) AS "counter"
-                 FROM "userstories_userstory"
-      LEFT OUTER JOIN "epics_relateduserstory"
-                   ON ("epics_relateduserstory"."user_story_id" = "userstories_userstory"."id")
-           INNER JOIN "projects_project"
-                   ON ("userstories_userstory"."project_id" = "projects_project"."id")
-                WHERE {where} AND "epics_relateduserstory"."epic_id" IS NULL
-             GROUP BY "epics_relateduserstory"."epic_id"
-
-                UNION
-
-               SELECT "epics_epic"."id" AS "id",
-                      "epics_epic"."ref" AS "ref",
-                      "epics_epic"."subject" AS "subject",
-                      "epics_epic"."epics_order" AS "order",
-                      COALESCE("counters"."counter", 0) AS "counter"
-                 FROM "epics_epic"
-      LEFT OUTER JOIN "counters"
-                   ON ("counters"."epic_id" = "epics_epic"."id")
-                WHERE "epics_epic"."project_id" = %s
-        """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, ref, subject, order, count in rows:
-        result.append({
-            "id": id,
-            "ref": ref,
-            "subject": subject,
-            "order": order,
-            "count": count,
-        })
-
-    result = sorted(result, key=lambda k: (k["order"], k["id"] or 0))
-
-    # Add row when there is no user stories with no epics
-    if result == [] or result[0]["id"] is not None:
-        result.insert(0, {
-            "id": None,
-            "ref": None,
-            "subject": None,
-            "order": 0,
-            "count": 0,
-        })
-    return result
-
-
-def get_userstories_filters_data(project, querysets):
+_FILTERS_DATA_FACETS = (
+    filters_data.CatalogFacet("statuses", '"userstories_userstory"."status_id"', "projects_userstorystatus"),
+    filters_data.AssignedToFacet("assigned_to", '"userstories_userstory"."assigned_to_id"'),
+    filters_data.OwnersFacet("owners", '"userstories_userstory"."owner_id"'),
+    filters_data.TagsFacet("tags", '"userstories_userstory"."tags"'),
+    filters_data.EpicsFacet("epics", 'array_remove(array_agg("epics_relateduserstory"."epic_id"), NULL)'),
+)
+
+_FILTERS_DATA_FROM = """
+                   "userstories_userstory"
+        INNER JOIN "projects_project"
+                ON ("userstories_userstory"."project_id" = "projects_project"."id")
+   LEFT OUTER JOIN "epics_relateduserstory"
+                ON ("userstories_userstory"."id" = "epics_relateduserstory"."user_story_id")
+"""
+
+
+def get_userstories_filters_data(project, queryset, facets_querysets):
     """
     Given a project and an userstories queryset, return a simple data structure
     of all possible filters for the userstories in the queryset.
+
+    The queryset is filtered with all the filters but the ones of the statuses,
+    assigned_to, owners and epics facets, that are in facets_querysets.
     """
-    data = OrderedDict([
-        ("statuses", _get_userstories_statuses(project, querysets["statuses"])),
-        ("assigned_to", _get_userstories_assigned_to(project, querysets["assigned_to"])),
-        ("owners", _get_userstories_owners(project, querysets["owners"])),
-        ("tags", _get_userstories_tags(project, querysets["tags"])),
-        ("epics", _get_userstories_epics(project, querysets["epics"])),
-    ])
-
-    return data
+    return filters_data.get_filters_data(project, _FILTERS_DATA_FACETS, queryset, facets_querysets,
+                                         from_sql=_FILTERS_DATA_FROM, group_by=True)
@@ -17,6 +17,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from taiga.base.db.lateral import attach_lateral
 from taiga.projects.attachments.utils import attach_basic_attachments
 from taiga.projects.notifications.utils import attach_watchers_to_queryset
 from taiga.projects.notifications.utils import attach_total_watchers_to_queryset
@@ -26,6 +27,18 @@ from taiga.projects.votes.utils import attach_total_voters_to_queryset
 from taiga.projects.votes.utils import attach_is_voter_to_queryset
 
 
+def _attach_role_points_lateral(queryset, select):
+    # The total points and the role points are computed with the same subquery
+    sql = """SELECT SUM(projects_points.value) AS total_points,
+                    coalesce(json_object_agg(userstories_rolepoints.role_id,
+                                             userstories_rolepoints.points_id),
+                             '{{}}'::json) AS role_points
+               FROM userstories_rolepoints
+    LEFT OUTER JOIN projects_points ON userstories_rolepoints.points_id = projects_points.id
+              WHERE userstories_rolepoints.user_story_id = {tbl}.id"""
+    return attach_lateral(queryset, "role_points_lateral", sql, select)
+
+
 def attach_total_points(queryset, as_field="total_points_attr"):
     """Attach total of point values to each object of the queryset.
 
@@ -34,15 +47,7 @@ def attach_total_points(queryset, as_field="total_points_attr"):
 
     :return: Queryset object with the additional `as_field` field.
     """
-    model = queryset.model
-    sql = """SELECT SUM(projects_points.value)
-                    FROM userstories_rolepoints
-                    INNER JOIN projects_points ON userstories_rolepoints.points_id = projects_points.id
-                    WHERE userstories_rolepoints.user_story_id = {tbl}.id"""
-
-    sql = sql.format(tbl=model._meta.db_table)
-    queryset = queryset.extra(select={as_field: sql})
-    return queryset
+    return _attach_role_points_lateral(queryset, {as_field: "{alias}.total_points"})
 
 
 def attach_role_points(queryset, as_field="role_points_attr"):
@@ -53,19 +58,7 @@ def attach_role_points(queryset, as_field="role_points_attr"):
 
     :return: Queryset object with the additional `as_field` field.
     """
-    model = queryset.model
-    sql = """SELECT FORMAT('{{%%s}}',
-                           STRING_AGG(format(
-                                '"%%s":%%s',
-                                TO_JSON(userstories_rolepoints.role_id),
-                                TO_JSON(userstories_rolepoints.points_id)
-                            ), ',')
-                          )::json
-                    FROM userstories_rolepoints
-                    WHERE userstories_rolepoints.user_story_id = {tbl}.id"""
-    sql = sql.format(tbl=model._meta.db_table)
-    queryset = queryset.extra(select={as_field: sql})
-    return queryset
+    return _attach_role_points_lateral(queryset, {as_field: "{alias}.role_points"})
 
 
 def attach_tasks(queryset, as_field="tasks_attr"):
@@ -100,6 +93,26 @@ def attach_tasks(queryset, as_field="tasks_attr"):
     return queryset
 
 
+def attach_task_refs(queryset, as_field="task_refs_attr"):
+    """Attach the refs of the tasks as an array column to each object of the queryset.
+
+    :param queryset: A Django user stories queryset object.
+    :param as_field: Attach the refs as an attribute with this name.
+
+    :return: Queryset object with the additional `as_field` field.
+    """
+
+    model = queryset.model
+    sql = """SELECT ARRAY(SELECT tasks_task.ref
+                            FROM tasks_task
+                           WHERE tasks_task.user_story_id = {tbl}.id
+                        ORDER BY tasks_task.created_date, tasks_task.ref)"""
+
+    sql = sql.format(tbl=model._meta.db_table)
+    queryset = queryset.extra(select={as_field: sql})
+    return queryset
+
+
 def attach_epics(queryset, as_field="epics_attr"):
     """Attach epics as json column to each object of the queryset.
 
@@ -22,6 +22,8 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
+from taiga.base.db.models.cached import CachedFieldsModelMixin
+
 
 class Votes(models.Model):
     content_type = models.ForeignKey("contenttypes.ContentType")
@@ -66,3 +68,16 @@ class Vote(models.Model):
 
     def __str__(self):
         return self.user.get_full_name()
+
+
+class CachedVotersMixin(CachedFieldsModelMixin):
+    """
+    The number of voters of the object, kept up to date by the votes
+    services, so the lists don't need to read the votes table for every row.
+    """
+    cached_total_voters = models.PositiveIntegerField(null=False, blank=True, default=0,
+                                                      editable=False, verbose_name=_("cached total voters"))
+    cached_fields = ("cached_total_voters",)
+
+    class Meta:
+        abstract = True
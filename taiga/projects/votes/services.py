@@ -18,14 +18,50 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.db.models import F
-from django.db import transaction as tx
+from django.db import connection, transaction as tx
 
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from django_pglocks import advisory_lock
 
-from .models import Votes, Vote
+from .models import CachedVotersMixin, Votes, Vote
+
+
+def _update_cached_total_voters(obj, obj_type):
+    """
+    Copy the votes count of the object to its cached total of voters, if
+    its model has it. It must run after the count is updated, in the same
+    transaction, so the lock of the Votes row serializes the updates.
+    """
+    if not isinstance(obj, CachedVotersMixin):
+        return
+
+    sql = """
+        UPDATE {tbl}
+           SET cached_total_voters = COALESCE((SELECT count
+                                                 FROM {votes_tbl}
+                                                WHERE content_type_id = %s
+                                                  AND object_id = %s), 0)
+         WHERE id = %s
+     RETURNING cached_total_voters
+    """.format(tbl=obj._meta.db_table, votes_tbl=Votes._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [obj_type.id, obj.id, obj.id])
+        row = cursor.fetchone()
+
+    if row is not None:
+        obj.cached_total_voters = row[0]
+
+
+def _bump_project_data_version(obj):
+    # The votes are in the responses of the project (total voters, is voter)
+    from taiga.projects.services.data_version import bump_project_data_version
+    project_id = getattr(obj, "project_id", None)
+    if project_id is not None:
+        bump_project_data_version(project_id)
 
 
 @tx.atomic
@@ -47,10 +83,11 @@ def add_vote(obj, user):
         votes, _ = Votes.objects.get_or_create(content_type=obj_type, object_id=obj.id)
         votes.count = F('count') + 1
         votes.save()
+        _update_cached_total_voters(obj, obj_type)
+        _bump_project_data_version(obj)
         return vote
 
 
-@tx.atomic
 def remove_vote(obj, user):
     """Remove an user vote from an object.
 
@@ -60,17 +97,126 @@ def remove_vote(obj, user):
     :param obj: Any Django model instance.
     :param user: User removing her vote. :class:`~taiga.users.models.User` instance.
     """
+    remove_votes(obj, [user])
+
+
+def add_votes(obj, users):
+    """Add the votes of several users to an object.
+
+    Like add_vote but in only one statement for all the users. The users that have
+    already voted the object are ignored.
+
+    :param obj: Any Django model instance.
+    :param users: Users adding their votes. :class:`~taiga.users.models.User` instances.
+    """
+    user_ids = list({user.id for user in users})
+    if not user_ids:
+        return
+
     obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
-    with advisory_lock("vote-{}-{}".format(obj_type.id, obj.id)):
-        qs = Vote.objects.filter(content_type=obj_type, object_id=obj.id, user=user)
-        if not qs.exists():
-            return
+    sql = """
+        WITH new_votes AS (
+            INSERT INTO {vote_tbl} (content_type_id, object_id, user_id, created_date)
+                 SELECT %(content_type_id)s, %(object_id)s, u.id, %(now)s
+                   FROM {user_tbl} u
+                  WHERE u.id = ANY(%(user_ids)s::integer[])
+            ON CONFLICT DO NOTHING
+              RETURNING id
+        )
+        INSERT INTO {votes_tbl} (content_type_id, object_id, count)
+             SELECT %(content_type_id)s, %(object_id)s, COUNT(*)
+               FROM new_votes
+             HAVING COUNT(*) > 0
+        ON CONFLICT (content_type_id, object_id)
+          DO UPDATE SET count = {votes_tbl}.count + EXCLUDED.count
+    """.format(vote_tbl=Vote._meta.db_table,
+               votes_tbl=Votes._meta.db_table,
+               user_tbl=get_user_model()._meta.db_table)
+
+    params = {
+        "content_type_id": obj_type.id,
+        "object_id": obj.id,
+        "user_ids": user_ids,
+        "now": timezone.now(),
+    }
+
+    with tx.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+        _update_cached_total_voters(obj, obj_type)
+        _bump_project_data_version(obj)
+
+
+def remove_votes(obj, users):
+    """Remove the votes of several users from an object.
+
+    Like remove_vote but in only one statement for all the users. The users that have
+    not voted the object are ignored.
+
+    :param obj: Any Django model instance.
+    :param users: Users removing their votes. :class:`~taiga.users.models.User` instances.
+    """
+    user_ids = list({user.id for user in users})
+    if not user_ids:
+        return
+
+    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
+    sql = """
+        WITH removed_votes AS (
+            DELETE FROM {vote_tbl}
+                  WHERE content_type_id = %(content_type_id)s
+                    AND object_id = %(object_id)s
+                    AND user_id = ANY(%(user_ids)s::integer[])
+              RETURNING id
+        )
+        UPDATE {votes_tbl}
+           SET count = count - (SELECT COUNT(*) FROM removed_votes)
+         WHERE content_type_id = %(content_type_id)s
+           AND object_id = %(object_id)s
+    """.format(vote_tbl=Vote._meta.db_table,
+               votes_tbl=Votes._meta.db_table)
+
+    params = {
+        "content_type_id": obj_type.id,
+        "object_id": obj.id,
+        "user_ids": user_ids,
+    }
+
+    with tx.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+        _update_cached_total_voters(obj, obj_type)
+        _bump_project_data_version(obj)
+
+
+def refresh_cached_total_voters(model, ids=None) -> int:
+    """
+    Recompute the cached total of voters of all the objects of a model (with
+    the CachedVotersMixin), or only of the ones with the given ids, that are
+    out of date, returning their number.
+    """
+    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
+    sql = """
+        UPDATE {tbl}
+           SET cached_total_voters = COALESCE(v.count, 0)
+          FROM {tbl} o
+     LEFT JOIN {votes_tbl} v ON v.content_type_id = %s
+                            AND v.object_id = o.id
+         WHERE {tbl}.id = o.id
+           AND {tbl}.cached_total_voters <> COALESCE(v.count, 0)
+           {where}
+    """.format(tbl=model._meta.db_table, votes_tbl=Votes._meta.db_table,
+               where="AND o.id = ANY(%s::integer[])" if ids is not None else "")
 
-    qs.delete()
+    params = [obj_type.id]
+    if ids is not None:
+        params.append(list(ids))
 
-    votes, _ = Votes.objects.get_or_create(content_type=obj_type, object_id=obj.id)
-    votes.count = F('count') - 1
-    votes.save()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
 
 
 def get_voters(obj):
@@ -31,6 +31,8 @@ from taiga.mdrender.service import render as mdrender
 
 from taiga.projects.history.mixins import HistoryResourceMixin
 from taiga.projects.history.services import take_snapshot
+from taiga.projects.mixins.cache import PublicResponseCacheMixin
+from taiga.projects.mixins.conditional import ConditionalGetMixin
 from taiga.projects.models import Project
 from taiga.projects.notifications.mixins import WatchedResourceMixin
 from taiga.projects.notifications.mixins import WatchersViewSetMixin
@@ -46,7 +48,8 @@ from . import utils as wiki_utils
 
 
 class WikiViewSet(OCCResourceMixin, HistoryResourceMixin, WatchedResourceMixin,
-                  BlockedByProjectMixin, ModelCrudViewSet):
+                  ConditionalGetMixin, PublicResponseCacheMixin, BlockedByProjectMixin,
+                  ModelCrudViewSet):
 
     model = models.WikiPage
     serializer_class = serializers.WikiPageSerializer
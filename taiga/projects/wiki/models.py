@@ -26,10 +26,11 @@ from django_pglocks import advisory_lock
 from taiga.base.utils.slug import slugify_uniquely_for_queryset
 from taiga.base.utils.time import timestamp_ms
 from taiga.projects.notifications.mixins import WatchedModelMixin
+from taiga.projects.notifications.models import CachedWatchersMixin
 from taiga.projects.occ import OCCModelMixin
 
 
-class WikiPage(OCCModelMixin, WatchedModelMixin, models.Model):
+class WikiPage(OCCModelMixin, WatchedModelMixin, CachedWatchersMixin, models.Model):
     project = models.ForeignKey("projects.Project", null=False, blank=False,
                                 related_name="wiki_pages", verbose_name=_("project"))
     slug = models.SlugField(max_length=500, db_index=True, null=False, blank=False,
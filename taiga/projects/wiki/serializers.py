@@ -42,7 +42,7 @@ class WikiPageSerializer(WatchedResourceSerializer, serializers.LightSerializer)
         return mdrender(obj.project, obj.content)
 
     def get_editions(self, obj):
-        return history_service.get_history_queryset_by_model_instance(obj).count() + 1  # +1 for creation
+        return history_service.count_history_by_model_instance(obj) + 1  # +1 for creation
 
 
 class WikiLinkSerializer(serializers.LightSerializer):
@@ -21,6 +21,7 @@ from django.contrib.contenttypes.models import ContentType
 
 from taiga.base import response
 from taiga.base.api import ReadOnlyListViewSet
+from taiga.projects.mixins.cache import PublicResponseCacheMixin
 
 from . import serializers
 from . import service
@@ -116,9 +117,15 @@ class UserTimeline(TimelineViewSet):
         return service.get_user_timeline(user, accessing_user=self.request.user)
 
 
-class ProjectTimeline(TimelineViewSet):
+class ProjectTimeline(PublicResponseCacheMixin, TimelineViewSet):
     content_type = "projects.project"
     permission_classes = (permissions.ProjectTimelinePermission,)
 
+    def get_project_id(self, request, **kwargs):
+        try:
+            return int(kwargs["pk"])
+        except (KeyError, ValueError, TypeError):
+            return None
+
     def get_timeline(self, project):
         return service.get_project_timeline(project, accessing_user=self.request.user)
@@ -23,6 +23,7 @@ from django.test.utils import override_settings
 
 from taiga.projects.models import Project
 from taiga.projects.history.models import HistoryEntry
+from taiga.projects.history.models import ArchivedHistoryEntry
 from .models import Timeline
 from .service import _get_impl_key_from_model, _timeline_impl_map, extract_user_info
 from .signals import on_new_history_entry, _push_to_timelines
@@ -30,6 +31,7 @@ from .signals import on_new_history_entry, _push_to_timelines
 from unittest.mock import patch
 
 import gc
+import heapq
 
 
 class BulkCreator(object):
@@ -85,15 +87,15 @@ def rebuild_timeline(initial_date, final_date, project_id):
     with patch('taiga.timeline.service._add_to_object_timeline', new=custom_add_to_object_timeline):
         # Projects api wasn't a HistoryResourceMixin so we can't interate on the HistoryEntries in this case
         projects = Project.objects.order_by("created_date")
-        history_entries = HistoryEntry.objects.order_by("created_at")
+        history_entries_filters = {}
 
         if initial_date:
             projects = projects.filter(created_date__gte=initial_date)
-            history_entries = history_entries.filter(created_at__gte=initial_date)
+            history_entries_filters["created_at__gte"] = initial_date
 
         if final_date:
             projects = projects.filter(created_date__lt=final_date)
-            history_entries = history_entries.filter(created_at__lt=final_date)
+            history_entries_filters["created_at__lt"] = final_date
 
         if project_id:
             project = Project.objects.get(id=project_id)
@@ -106,7 +108,7 @@ def rebuild_timeline(initial_date, final_date, project_id):
             keys = epic_keys + us_keys + tasks_keys + issue_keys + wiki_keys
 
             projects = projects.filter(id=project_id)
-            history_entries = history_entries.filter(key__in=keys)
+            history_entries_filters["key__in"] = keys
 
             #Memberships
             for membership in project.memberships.exclude(user=None).exclude(user=project.owner):
@@ -123,7 +125,16 @@ def rebuild_timeline(initial_date, final_date, project_id):
                                refresh_totals=False)
             del extra_data
 
-        for historyEntry in history_entries.iterator():
+        # The archived and the current entries merged by date (the entries
+        # with comments stay in the current table, so they are mixed)
+        archived_entries = ArchivedHistoryEntry.objects.filter(**history_entries_filters).order_by("created_at", "id")
+        current_entries = HistoryEntry.objects.filter(**history_entries_filters).order_by("created_at", "id")
+        history_entries = heapq.merge(
+            ((entry.created_at, 0, entry.id, entry) for entry in archived_entries.iterator()),
+            ((entry.created_at, 1, entry.id, entry) for entry in current_entries.iterator())
+        )
+
+        for _, _, _, historyEntry in history_entries:
             print("History entry:", historyEntry.created_at)
             try:
                 historyEntry.refresh_totals = False
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Short lived cache of user instances, used by the token authentication to not
+hit the users table in every API request.
+
+It has two levels:
+
+- A local LRU cache (per process) with a very short timeout
+  (USER_CACHE_LOCAL_TIMEOUT seconds, 5 by default) and USER_CACHE_LOCAL_SIZE
+  entries (1000 by default).
+- The django cache, with a short timeout (USER_CACHE_TIMEOUT seconds). The
+  entries are versioned by user so an invalidation is not undone by a
+  concurrent request that stores the old instance again.
+
+It's disabled by default (USER_CACHE_TIMEOUT is 0) and it needs a django cache
+shared by all the processes (Redis, Memcached...). With a per process cache,
+like the default LocMemCache, the invalidations are only seen by the process
+that does them and a deactivated or deleted user keeps authenticating in the
+others until the timeout. Even with a shared cache the other processes can
+return the old instance for USER_CACHE_LOCAL_TIMEOUT seconds.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+
+class LocalLRUCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, max_size):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalLRUCache()
+
+
+def _get_version_key(user_id):
+    return "user-cache-version-{}".format(user_id)
+
+
+def _get_user_key(user_id, version):
+    return "user-cache-{}-{}".format(user_id, version)
+
+
+def get_user(user_id):
+    """
+    Get the user with id `user_id` from the cache, or from the database if it
+    isn't cached.
+
+    Every call returns a new instance so it can be modified freely.
+
+    :raises DoesNotExist: If the user doesn't exist.
+    """
+    timeout = getattr(settings, "USER_CACHE_TIMEOUT", 0)
+    if not timeout:
+        return get_user_model().objects.get(pk=user_id)
+
+    # Instances are stored pickled so every request gets its own copy
+    data = local_cache.get(user_id)
+    if data is None:
+        version = cache.get(_get_version_key(user_id), 0)
+        data = cache.get(_get_user_key(user_id, version))
+
+        if data is None:
+            user = get_user_model().objects.get(pk=user_id)
+            data = pickle.dumps(user, pickle.HIGHEST_PROTOCOL)
+            cache.set(_get_user_key(user_id, version), data, timeout=timeout)
+
+        local_cache.set(user_id, data, timeout=getattr(settings, "USER_CACHE_LOCAL_TIMEOUT", 5),
+                        max_size=getattr(settings, "USER_CACHE_LOCAL_SIZE", 1000))
+
+    return pickle.loads(data)
+
+
+def _invalidate_user(user_id):
+    local_cache.delete(user_id)
+
+    version_key = _get_version_key(user_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, timeout=None)
+
+
+def invalidate_user(user_id):
+    """
+    Remove the user with id `user_id` from the cache.
+
+    It's done again after the current transaction is committed so a request
+    that reads the user before the commit can't keep the old data cached.
+    """
+    _invalidate_user(user_id)
+    transaction.on_commit(lambda: _invalidate_user(user_id))
@@ -45,6 +45,7 @@ from taiga.permissions.choices import MEMBERS_PERMISSIONS
 from taiga.projects.choices import BLOCKED_BY_OWNER_LEAVING
 from taiga.projects.notifications.choices import NotifyLevel
 
+from . import cache as users_cache
 from . import services
 
 
@@ -179,6 +180,7 @@ class User(AbstractBaseUser, PermissionsMixin):
                                                                          "each owned public project"))
 
     _cached_memberships = None
+    _cached_member_data = None
     _cached_liked_ids = None
     _cached_watched_ids = None
     _cached_notify_levels = None
@@ -348,3 +350,13 @@ def role_post_save(sender, instance, created, **kwargs):
         return
 
     instance.project.update_role_points()
+
+
+# On User object is changed or deleted, remove it from
+# the users cache used by the token authentication.
+@receiver(models.signals.post_save, sender=User,
+          dispatch_uid="user_post_save_invalidate_cache")
+@receiver(models.signals.post_delete, sender=User,
+          dispatch_uid="user_post_delete_invalidate_cache")
+def user_invalidate_cache(sender, instance, **kwargs):
+    users_cache.invalidate_user(instance.id)
@@ -118,7 +118,7 @@ class ProjectSerializer(serializers.LightSerializer):
 class HistoryDiffField(Field):
     def to_value(self, value):
         # Tip: 'value' is the object returned by
-        #      taiga.projects.history.models.HistoryEntry.values_diff()
+        #      taiga.projects.history.models.HistoryEntry.rendered_values_diff()
 
         ret = {}
         for key, val in value.items():
@@ -138,7 +138,7 @@ class HistoryEntrySerializer(serializers.LightSerializer):
     delete_comment_date = Field()
     comment_versions = Field()
     edit_comment_date = Field()
-    diff = HistoryDiffField(attr="values_diff")
+    diff = HistoryDiffField(attr="rendered_values_diff")
 
 
 ########################################################################
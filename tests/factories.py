@@ -513,6 +513,15 @@ class VotesFactory(Factory):
     content_type = factory.SubFactory("tests.factories.ContentTypeFactory")
     object_id = factory.Sequence(lambda n: n)
 
+    @factory.post_generation
+    def cached_total_voters(self, create, extracted, **kwargs):
+        # The services keep the voted object total up to date
+        from taiga.projects.votes.models import CachedVotersMixin
+        from taiga.projects.votes.services import refresh_cached_total_voters
+        model = self.content_type.model_class()
+        if create and model and issubclass(model, CachedVotersMixin):
+            refresh_cached_total_voters(model, ids=[self.object_id])
+
 
 class WatchedFactory(Factory):
     class Meta:
@@ -524,6 +533,15 @@ class WatchedFactory(Factory):
     user = factory.SubFactory("tests.factories.UserFactory")
     project = factory.SubFactory("tests.factories.ProjectFactory")
 
+    @factory.post_generation
+    def cached_watcher_ids(self, create, extracted, **kwargs):
+        # The services keep the watched object ids up to date
+        from taiga.projects.notifications.models import CachedWatchersMixin
+        from taiga.projects.notifications.services import refresh_cached_watchers
+        model = self.content_type.model_class()
+        if create and model and issubclass(model, CachedWatchersMixin):
+            refresh_cached_watchers(model, ids=[self.object_id])
+
 
 class ContentTypeFactory(Factory):
     class Meta:
@@ -20,6 +20,8 @@
 import pytest
 from django.core.urlresolvers import reverse
 
+from taiga.projects.likes import services
+
 from .. import factories as f
 
 pytestmark = pytest.mark.django_db
@@ -49,6 +51,23 @@ def test_unlike_project(client):
     assert response.status_code == 200
 
 
+def test_add_and_remove_likes():
+    project = f.create_project()
+    user1 = f.UserFactory.create()
+    user2 = f.UserFactory.create()
+
+    services.add_likes(project, [user1, user2])
+    services.add_likes(project, [user1])  # add_likes must be idempotent
+
+    assert set(services.get_fans(project)) == {user1, user2}
+    assert project.total_fans == 2
+
+    services.remove_likes(project, [user1])
+
+    assert list(services.get_fans(project)) == [user2]
+    assert project.total_fans == 1
+
+
 def test_list_project_fans(client):
     user = f.UserFactory.create()
     project = f.create_project(owner=user)
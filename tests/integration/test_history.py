@@ -29,6 +29,7 @@ from .. import factories as f
 from taiga.base.utils import json
 from taiga.projects.history import services
 from taiga.projects.history.models import HistoryEntry
+from taiga.projects.history.models import ArchivedHistoryEntry
 from taiga.projects.history.choices import HistoryType
 from taiga.projects.history.services import make_key_from_model_object
 
@@ -88,6 +89,27 @@ def test_take_two_snapshots_without_changes():
     assert qs_hidden.count() == 0
 
 
+def test_take_snapshots_store_text_source_and_render_html_on_demand():
+    issue = f.IssueFactory.create(description="**foo**")
+
+    services.take_snapshot(issue, user=issue.owner)
+    issue.description = "**bar**"
+    issue.save()
+    services.take_snapshot(issue, user=issue.owner)
+
+    created, changed = HistoryEntry.objects.order_by("created_at")
+
+    assert "description_html" not in created.snapshot
+    assert "description_hash" in created.snapshot
+    assert created.rendered_snapshot["description_html"] == "<p><strong>foo</strong></p>"
+
+    assert set(changed.diff.keys()) == {"description"}
+    assert changed.changed_fields == ["description"]
+    assert services.get_modified_fields(issue, 1) == ["description"]
+    assert changed.rendered_diff["description_html"] == ["<p><strong>foo</strong></p>",
+                                                         "<p><strong>bar</strong></p>"]
+
+
 def test_take_snapshot_from_deleted_object():
     issue = f.IssueFactory.create()
 
@@ -144,6 +166,37 @@ def test_real_snapshot_frequency(settings):
     assert qs_partials.count() == 2
 
 
+def test_archive_history_entries(settings):
+    settings.MAX_PARTIAL_DIFFS = 2
+
+    issue = f.IssueFactory.create()
+    for counter in range(5):
+        issue.subject = "test{}".format(counter)
+        issue.save()
+        services.take_snapshot(issue, user=issue.owner, comment="comment" if counter == 0 else "")
+
+    last_snapshot = HistoryEntry.objects.filter(is_snapshot=True).order_by("-created_at").first()
+    frozen_obj, _ = services.get_last_snapshot_for_key(last_snapshot.key)
+
+    moved = services.archive_history_entries(timezone.now())
+
+    # The entry with comment, the last snapshot and its partials are kept
+    assert moved == 2
+    assert HistoryEntry.objects.count() == 3
+    assert ArchivedHistoryEntry.objects.count() == 2
+    assert ArchivedHistoryEntry.objects.filter(created_at__gte=last_snapshot.created_at).count() == 0
+    assert services.get_last_snapshot_for_key(last_snapshot.key)[0] == frozen_obj
+
+    entries = services.get_history_by_model_instance(issue, types=(HistoryType.change, HistoryType.create))
+    assert len(entries) == 5
+    assert [e.created_at for e in entries] == sorted(e.created_at for e in entries)
+
+    # The OCC checks see the archived modifications too
+    all_changed_fields = [field for e in entries for field in e.changed_fields or []]
+    assert sorted(services.get_modified_fields(issue, 5)) == sorted(all_changed_fields)
+    assert ArchivedHistoryEntry.objects.exclude(changed_fields=[]).exists()
+
+
 def test_issue_resource_history_test(client):
     user = f.UserFactory.create()
     project = f.ProjectFactory.create(owner=user)
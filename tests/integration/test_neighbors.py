@@ -328,3 +328,43 @@ class TestIssues:
         assert issue1_neighbors.right == issue2
         assert issue2_neighbors.left == issue1
         assert issue2_neighbors.right is None
+
+    def test_ordering_keys_follow_related_models_ordering(self):
+        issues = Issue.objects.order_by("-status", "-id")
+
+        keys = n._get_results_set_ordering_keys(Issue, issues)
+
+        assert keys == [n.OrderingKey("status__order", True, True),
+                        n.OrderingKey("status__name", True, True),
+                        n.OrderingKey("id", True, False)]
+
+    def test_ordering_not_by_fields(self):
+        project = f.ProjectFactory.create()
+
+        issue1 = f.IssueFactory.create(project=project, subject="a")
+        issue2 = f.IssueFactory.create(project=project, subject="b")
+        issue3 = f.IssueFactory.create(project=project, subject="c")
+
+        issues = Issue.objects.filter(project=project).extra(order_by=["issues_issue.subject"])
+
+        neighbors = n.get_neighbors(issue2, results_set=issues)
+
+        assert neighbors.left == issue1
+        assert neighbors.right == issue3
+
+    def test_cached_neighbors(self, settings):
+        settings.NEIGHBORS_CACHE_TIMEOUT = 60
+        project = f.ProjectFactory.create()
+
+        issue1 = f.IssueFactory.create(project=project)
+        issue2 = f.IssueFactory.create(project=project)
+        issue3 = f.IssueFactory.create(project=project)
+
+        issues = Issue.objects.filter(project=project)
+        neighbors = n.get_cached_neighbors(issue2, results_set=issues)
+        assert neighbors.left == (issue3.id, issue3.ref, issue3.subject)
+        assert neighbors.right == (issue1.id, issue1.ref, issue1.subject)
+
+        issue1.delete()
+        assert n.get_cached_neighbors(issue2, results_set=issues).right is None
+        assert n.get_cached_neighbors(issue2, results_set=issues.exclude(id=issue3.id)).left is None
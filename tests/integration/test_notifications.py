@@ -33,6 +33,7 @@ from django.core.urlresolvers import reverse
 from django.utils import timezone
 
 from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
 from .. import factories as f
 
 from taiga.base.utils import json
@@ -92,7 +93,8 @@ def test_analize_object_for_watchers():
     history.comment = ""
 
     services.analize_object_for_watchers(issue, history.comment, history.owner)
-    assert issue.add_watcher.call_count == 2
+    assert issue.add_watchers.call_count == 1
+    assert set(issue.add_watchers.call_args[0][0]) == {user1, user2}
 
 
 def test_analize_object_for_watchers_adding_owner_non_empty_comment():
@@ -107,7 +109,7 @@ def test_analize_object_for_watchers_adding_owner_non_empty_comment():
     history.owner = user1
 
     services.analize_object_for_watchers(issue, history.comment, history.owner)
-    assert issue.add_watcher.call_count == 1
+    issue.add_watchers.assert_called_once_with([user1])
 
 
 def test_analize_object_for_watchers_no_adding_owner_empty_comment():
@@ -122,7 +124,79 @@ def test_analize_object_for_watchers_no_adding_owner_empty_comment():
     history.owner = user1
 
     services.analize_object_for_watchers(issue, history.comment, history.owner)
-    assert issue.add_watcher.call_count == 0
+    assert issue.add_watchers.call_count == 0
+
+
+def test_add_watchers():
+    project = f.ProjectFactory.create()
+    issue = f.IssueFactory.create(project=project)
+    user1 = f.UserFactory.create()
+    user2 = f.UserFactory.create()
+    services.create_notify_policy(project, user2, NotifyLevel.all)
+
+    services.add_watchers(issue, [user1, user2])
+    services.add_watchers(issue, [user1])  # add_watchers must be idempotent
+
+    assert set(issue.get_watchers()) == {user1, user2}
+    policy_model_cls = apps.get_model("notifications", "NotifyPolicy")
+    assert policy_model_cls.objects.get(project=project, user=user1).notify_level == NotifyLevel.involved
+    assert policy_model_cls.objects.get(project=project, user=user2).notify_level == NotifyLevel.all
+
+
+def test_set_watchers():
+    issue = f.IssueFactory.create()
+    user1 = f.UserFactory.create()
+    user2 = f.UserFactory.create()
+    user3 = f.UserFactory.create()
+    services.add_watchers(issue, [user1, user2])
+
+    services.set_watchers(issue, [user2.id, user3.id])
+
+    assert set(issue.get_watchers()) == {user2, user3}
+
+
+def test_cached_watcher_ids_are_kept_up_to_date():
+    us = f.UserStoryFactory.create()
+    outdated_us = us.__class__.objects.get(id=us.id)
+    user1 = f.UserFactory.create()
+    user2 = f.UserFactory.create()
+
+    services.add_watchers(us, [user1, user2])
+    assert sorted(us.cached_watcher_ids) == sorted([user1.id, user2.id])
+
+    services.remove_watcher(us, user1)
+    assert us.cached_watcher_ids == [user2.id]
+
+    # The save of an outdated instance doesn't overwrite them
+    outdated_us.subject = "New subject"
+    outdated_us.save()
+    us.refresh_from_db()
+    assert us.subject == "New subject"
+    assert us.cached_watcher_ids == [user2.id]
+
+    # The deletes made out of the services (the cascade of a deleted user...) update them
+    services.add_watchers(us, [user1])
+    user1.delete()
+    us.refresh_from_db()
+    assert us.cached_watcher_ids == [user2.id]
+
+    # The rest of changes made out of the services are fixed by the refresh
+    us.__class__.objects.filter(id=us.id).update(cached_watcher_ids=[])
+    assert services.refresh_cached_watchers(us.__class__) == 1
+    us.refresh_from_db()
+    assert us.cached_watcher_ids == [user2.id]
+
+
+def test_save_of_an_instance_with_cached_watchers_whose_row_was_deleted():
+    us = f.UserStoryFactory.create()
+    user = f.UserFactory.create()
+    services.add_watchers(us, [user])
+
+    us.__class__.objects.filter(id=us.id).delete()
+    us.save()
+
+    us.refresh_from_db()
+    assert us.cached_watcher_ids == [user.id]
 
 
 def test_users_to_notify():
@@ -186,7 +260,6 @@ def test_users_to_notify():
     policy_member1.notify_level = NotifyLevel.all
     policy_member1.save()
 
-    del project.cached_notify_policies
     users = services.get_users_to_notify(issue)
     assert len(users) == 2
     assert users == {member1.user, issue.get_owner()}
@@ -196,7 +269,6 @@ def test_users_to_notify():
     policy_member3.notify_level = NotifyLevel.all
     policy_member3.save()
 
-    del project.cached_notify_policies
     users = services.get_users_to_notify(issue)
     assert len(users) == 3
     assert users == {member1.user, member3.user, issue.get_owner()}
@@ -206,14 +278,12 @@ def test_users_to_notify():
     policy_member3.save()
 
     issue.add_watcher(member3.user)
-    del project.cached_notify_policies
     users = services.get_users_to_notify(issue)
     assert len(users) == 2
     assert users == {member1.user, issue.get_owner()}
 
     # Test with watchers without permissions
     issue.add_watcher(member5.user)
-    del project.cached_notify_policies
     users = services.get_users_to_notify(issue)
     assert len(users) == 2
     assert users == {member1.user, issue.get_owner()}
@@ -229,6 +299,23 @@ def test_users_to_notify():
     assert users == {member1.user, issue.get_owner()}
 
 
+def test_user_ids_to_notify_creates_the_missing_notify_policies():
+    project = f.ProjectFactory.create(anon_permissions=["view_issues"])
+    issue = f.IssueFactory.create(project=project)
+    content_type = ContentType.objects.get_for_model(issue)
+    watcher1 = f.WatchedFactory.create(content_type=content_type, object_id=issue.id, project=project).user
+    watcher2 = f.WatchedFactory.create(content_type=content_type, object_id=issue.id, project=project).user
+    policy_model_cls = apps.get_model("notifications", "NotifyPolicy")
+    assert not policy_model_cls.objects.filter(user__in=[watcher1, watcher2]).exists()
+
+    user_ids = services.get_user_ids_to_notify(issue, discard_users=[watcher2])
+
+    assert user_ids == {watcher1.id, issue.owner.id}
+    policies = policy_model_cls.objects.filter(project=project, user__in=[watcher1, watcher2])
+    assert {policy.notify_level for policy in policies} == {NotifyLevel.involved}
+    assert policies.count() == 2
+
+
 def test_watching_users_to_notify_on_issue_modification_1():
     # If:
     # - the user is watching the issue
@@ -442,6 +529,78 @@ def test_send_notifications_using_services_method_for_user_stories(settings, mai
         assert services.make_ms_thread_index(in_reply_to, msg_ts) == headers.get('Thread-Index')
 
 
+def test_send_notifications_renders_the_emails_once_by_language(settings, mail):
+    settings.CHANGE_NOTIFICATIONS_MIN_INTERVAL = 0
+
+    project = f.ProjectFactory.create()
+    role = f.RoleFactory.create(project=project, permissions=['view_issues', 'view_us', 'view_tasks', 'view_wiki_pages'])
+    changer = f.MembershipFactory.create(project=project, role=role).user
+    user1 = f.MembershipFactory.create(project=project, role=role, user__full_name="Ann O'Neil", user__lang="en").user
+    user2 = f.MembershipFactory.create(project=project, role=role, user__full_name="Bob <Jr>", user__lang="en").user
+    user3 = f.MembershipFactory.create(project=project, role=role, user__full_name="Carla", user__lang="es").user
+
+    us = f.UserStoryFactory.create(project=project, owner=user1)
+    us.add_watcher(user2)
+    us.add_watcher(user3)
+    history = f.HistoryEntryFactory.create(
+        project=project,
+        user={"pk": changer.id},
+        comment="",
+        type=HistoryType.change,
+        key="userstories.userstory:{}".format(us.id),
+        is_hidden=False,
+        diff=[]
+    )
+
+    take_snapshot(us, user=us.owner)
+    with patch("taiga.base.mails.premailer.transform", side_effect=lambda html: html) as transform_mock:
+        services.send_notifications(us, history=history)
+
+    assert transform_mock.call_count == 2
+    assert len(mail.outbox) == 3
+    for user in [user1, user2, user3]:
+        msg = next(msg for msg in mail.outbox if msg.to == [user.email])
+        html_body = msg.alternatives[0][0]
+        assert "taigarecipient" not in msg.subject + msg.body + html_body
+        assert user.full_name.replace("<", "&lt;").replace(">", "&gt;") in html_body
+
+
+def test_process_sync_notifications_sends_the_due_notifications_in_batches(settings, mail):
+    settings.CHANGE_NOTIFICATIONS_MIN_INTERVAL = 60
+
+    project = f.ProjectFactory.create()
+    role = f.RoleFactory.create(project=project, permissions=['view_issues', 'view_us', 'view_tasks', 'view_wiki_pages'])
+    changer = f.MembershipFactory.create(project=project, role=role).user
+    member = f.MembershipFactory.create(project=project, role=role).user
+
+    user_stories = f.UserStoryFactory.create_batch(4, project=project, owner=member)
+    for us in user_stories:
+        history = f.HistoryEntryFactory.create(
+            project=project,
+            user={"pk": changer.id},
+            comment="",
+            type=HistoryType.change,
+            key="userstories.userstory:{}".format(us.id),
+            is_hidden=False,
+            diff=[]
+        )
+        take_snapshot(us, user=us.owner)
+        services.send_notifications(us, history=history)
+
+    # The last one is too recent to be sent
+    due_datetime = timezone.now() - datetime.timedelta(seconds=61)
+    models.HistoryChangeNotification.objects.exclude(key__endswith=":{}".format(user_stories[-1].id))\
+                                            .update(updated_datetime=due_datetime)
+
+    with patch("taiga.projects.notifications.services.mail.get_connection",
+               wraps=services.mail.get_connection) as get_connection_mock:
+        assert services.process_sync_notifications(batch_size=2) == 3
+
+    assert get_connection_mock.call_count == 2
+    assert len(mail.outbox) == 3
+    assert models.HistoryChangeNotification.objects.count() == 1
+
+
 def test_send_notifications_using_services_method_for_tasks(settings, mail):
     settings.CHANGE_NOTIFICATIONS_MIN_INTERVAL = 1
 
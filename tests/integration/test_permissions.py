@@ -132,3 +132,30 @@ def test_authenticated_user_has_perm_on_project_related_object():
 def test_authenticated_user_has_perm_on_invalid_object():
     user1 = factories.UserFactory()
     assert services.user_has_perm(user1, "test", user1) is False
+
+
+def test_cached_user_project_permissions_are_invalidated(settings):
+    settings.PERMISSIONS_CACHE_TIMEOUT = 300
+    user1 = factories.UserFactory()
+    project = factories.ProjectFactory()
+    project.anon_permissions = []
+    project.public_permissions = []
+    role = factories.RoleFactory(project=project, permissions=["test1"])
+    membership = factories.MembershipFactory(user=user1, project=project, role=role)
+
+    assert services.get_user_project_permissions(user1, project) == frozenset(["test1"])
+
+    # Cached for the user instance and for the next requests
+    role.__class__.objects.filter(id=role.id).update(permissions=["test2"])
+    assert services.get_user_project_permissions(user1, project) == frozenset(["test1"])
+    user1 = user1.__class__.objects.get(id=user1.id)
+    assert services.get_user_project_permissions(user1, project) == frozenset(["test1"])
+
+    role.permissions = ["test3"]
+    role.save()
+    user1 = user1.__class__.objects.get(id=user1.id)
+    assert services.get_user_project_permissions(user1, project) == frozenset(["test3"])
+
+    membership.delete()
+    user1 = user1.__class__.objects.get(id=user1.id)
+    assert services.get_user_project_permissions(user1, project) == frozenset()
@@ -605,6 +605,48 @@ def test_create_and_use_template(client):
     assert response.status_code == 201
 
 
+def test_bulk_update_catalog_order():
+    from taiga.projects.models import IssueStatus
+    from taiga.projects.services import bulk_update_catalog_order
+
+    project = f.ProjectFactory.create()
+    status_1 = f.IssueStatusFactory.create(project=project, order=1)
+    status_2 = f.IssueStatusFactory.create(project=project, order=2)
+    other_project_status = f.IssueStatusFactory.create(order=3)
+
+    data = [(status_1.id, 2), (status_2.id, 1), (other_project_status.id, 10)]
+    updated = bulk_update_catalog_order(IssueStatus, project, project.owner, data)
+
+    assert updated == 2
+    assert IssueStatus.objects.get(id=status_1.id).order == 2
+    assert IssueStatus.objects.get(id=status_2.id).order == 1
+    assert IssueStatus.objects.get(id=other_project_status.id).order == 3
+
+
+def test_bulk_update_catalog_order_changes_the_project_etag(client, settings):
+    settings.CONDITIONAL_GET_ENABLED = True
+    project = f.create_project()
+    f.MembershipFactory.create(project=project, user=project.owner, is_admin=True)
+    status_1 = f.IssueStatusFactory.create(project=project, order=1)
+    status_2 = f.IssueStatusFactory.create(project=project, order=2)
+    detail_url = reverse("projects-detail", kwargs={"pk": project.pk})
+
+    client.login(project.owner)
+    etag = client.get(detail_url)["ETag"]
+
+    url = reverse("issue-statuses-bulk-update-order")
+    data = {
+        "bulk_issue_statuses": [(status_1.id, 2), (status_2.id, 1)],
+        "project": project.pk
+    }
+    response = client.json.post(url, json.dumps(data))
+    assert response.status_code == 204
+
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
 def test_projects_user_order(client):
     user = f.UserFactory.create(is_superuser=True)
     project_1 = f.create_project()
@@ -17,17 +17,21 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import uuid
 import csv
+import time
 import pytz
 
 from datetime import datetime, timedelta
 from urllib.parse import quote
 
 from unittest import mock
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 
-from taiga.base.utils import json
+from taiga.base.utils import db, json
+from taiga.projects.mixins.cache import PublicResponseCacheMixin
 from taiga.projects.userstories import services, models
 
 from .. import factories as f
@@ -66,6 +70,22 @@ def test_update_userstories_order_in_bulk():
                                                                 models.UserStory)
 
 
+def test_update_attrs_in_bulk_for_ids():
+    project = f.ProjectFactory.create()
+    milestone = f.MilestoneFactory.create(project=project)
+    us1 = f.UserStoryFactory.create(project=project, sprint_order=1)
+    us2 = f.UserStoryFactory.create(project=project, sprint_order=2)
+    us3 = f.UserStoryFactory.create(project=project, sprint_order=3)
+
+    values = {us2.id: (milestone.id, 10), us1.id: (milestone.id, 20)}
+    updated = db.update_attrs_in_bulk_for_ids(values, ("milestone_id", "sprint_order"), models.UserStory,
+                                              chunk_size=1)
+
+    assert updated == 2
+    uss = models.UserStory.objects.order_by("id").values_list("id", "milestone_id", "sprint_order")
+    assert list(uss) == [(us1.id, milestone.id, 20), (us2.id, milestone.id, 10), (us3.id, us3.milestone_id, 3)]
+
+
 def test_create_userstory_with_watchers(client):
     user = f.UserFactory.create()
     user_watcher = f.UserFactory.create()
@@ -140,6 +160,129 @@ def test_api_filter_by_subject_or_ref(client):
     assert number_of_stories == 1, number_of_stories
 
 
+def test_api_list_response_is_streamed(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_admin=True)
+    f.UserStoryFactory.create(project=project)
+    f.UserStoryFactory.create(project=project)
+    url = reverse("userstories-list") + "?project={}".format(project.id)
+
+    client.login(project.owner)
+    with mock.patch("taiga.base.api.views.api_settings.STREAMING_RESPONSE_MIN_ITEMS", 2):
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/json"
+    assert json.loads(b"".join(response.streaming_content)) == json.loads(json.dumps(response.data))
+
+
+def test_api_list_and_retrieve_are_conditional(client, settings):
+    settings.CONDITIONAL_GET_ENABLED = True
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_admin=True)
+    other_user = f.UserFactory.create()
+    f.MembershipFactory.create(project=project, user=other_user, is_admin=True)
+    us = f.UserStoryFactory.create(project=project)
+    list_url = reverse("userstories-list") + "?project={}".format(project.id)
+    detail_url = reverse("userstories-detail", kwargs={"pk": us.pk}) + "?include=1"
+
+    client.login(project.owner)
+
+    for url in [list_url, detail_url]:
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response["ETag"]
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        # Other query params have other ETag
+        response = client.get(url + "&other=1", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    etag = client.get(list_url)["ETag"]
+    us.subject = "New subject"
+    us.save()
+
+    response = client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+    # Other users have other ETag
+    etag = response["ETag"]
+    client.login(other_user)
+    response = client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+def test_api_list_and_retrieve_are_not_conditional_by_default(client):
+    project = f.ProjectFactory.create()
+    f.MembershipFactory.create(project=project, user=project.owner, is_admin=True)
+    f.UserStoryFactory.create(project=project)
+    url = reverse("userstories-list") + "?project={}".format(project.id)
+
+    client.login(project.owner)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert not response.has_header("ETag")
+
+
+def test_api_anonymous_responses_are_cached_until_the_project_changes(client, settings):
+    settings.PUBLIC_RESPONSES_CACHE_TIMEOUT = 60
+    project = f.ProjectFactory.create(is_private=False, anon_permissions=["view_us"],
+                                      public_permissions=["view_us"])
+    us = f.UserStoryFactory.create(project=project, subject="Old subject")
+    url = reverse("userstories-list") + "?project={}".format(project.id)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data[0]["subject"] == "Old subject"
+
+    # The queryset updates don't change the project data version
+    models.UserStory.objects.filter(id=us.id).update(subject="New subject")
+    response = client.get(url)
+    assert response.data[0]["subject"] == "Old subject"
+
+    us.refresh_from_db()
+    us.save()
+    response = client.get(url)
+    assert response.data[0]["subject"] == "New subject"
+
+    # The authenticated users are not cached
+    models.UserStory.objects.filter(id=us.id).update(subject="Other subject")
+    client.login(project.owner)
+    response = client.get(url)
+    assert response.data[0]["subject"] == "Other subject"
+
+
+def test_api_anonymous_requests_dont_wait_long_for_a_locked_response(client, settings):
+    settings.PUBLIC_RESPONSES_CACHE_TIMEOUT = 60
+    settings.PUBLIC_RESPONSES_CACHE_LOCK_WAIT = 0.2
+    project = f.ProjectFactory.create(is_private=False, anon_permissions=["view_us"],
+                                      public_permissions=["view_us"])
+    f.UserStoryFactory.create(project=project, subject="Subject")
+    url = reverse("userstories-list") + "?project={}".format(project.id)
+    key = "public-response-test"
+
+    # Other request is building the response
+    cache.set("{}-lock".format(key), True)
+    try:
+        with mock.patch.object(PublicResponseCacheMixin, "get_response_cache_key", return_value=key):
+            start = time.time()
+            response = client.get(url)
+            assert time.time() - start < 1
+
+            assert response.status_code == 200
+            assert response.data[0]["subject"] == "Subject"
+            assert cache.get(key) is None
+    finally:
+        cache.delete_many([key, "{}-lock".format(key)])
+
+
 def test_api_create_in_bulk_with_status(client):
     project = f.create_project()
     f.MembershipFactory.create(project=project, user=project.owner, is_admin=True)
@@ -838,6 +981,29 @@ def test_api_filters_data(client):
     assert next(filter(lambda i: i['id'] == epic2.id, response.data["epics"]))["count"] == 2
 
 
+def test_api_filters_data_is_cached_until_the_project_changes(client, settings):
+    settings.FILTERS_DATA_CACHE_TIMEOUT = 60
+    project = f.ProjectFactory.create()
+    user = f.UserFactory.create(is_superuser=True)
+    f.MembershipFactory.create(user=user, project=project)
+    status = f.UserStoryStatusFactory.create(project=project)
+    f.UserStoryFactory.create(project=project, owner=user, status=status)
+
+    url = reverse("userstories-filters-data") + "?project={}".format(project.id)
+
+    client.login(user)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert next(filter(lambda i: i['id'] == status.id, response.data["statuses"]))["count"] == 1
+
+    f.UserStoryFactory.create(project=project, owner=user, status=status)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert next(filter(lambda i: i['id'] == status.id, response.data["statuses"]))["count"] == 2
+    assert next(filter(lambda i: i['id'] == user.id, response.data["owners"]))["count"] == 2
+
 def test_get_invalid_csv(client):
     url = reverse("userstories-csv")
 
@@ -856,6 +1022,30 @@ def test_get_valid_csv(client):
     assert response.status_code == 200
 
 
+def test_csv_is_streamed_with_the_counts_of_every_userstory(client):
+    project = f.ProjectFactory.create(userstories_csv_uuid=uuid.uuid4().hex)
+    us1 = f.UserStoryFactory.create(project=project)
+    us2 = f.UserStoryFactory.create(project=project)
+    task1 = f.TaskFactory.create(project=project, user_story=us1)
+    task2 = f.TaskFactory.create(project=project, user_story=us1)
+    f.UserStoryAttachmentFactory.create(project=project, content_object=us2)
+
+    url = reverse("userstories-csv")
+    response = client.get("{}?uuid={}".format(url, project.userstories_csv_uuid))
+    assert response.status_code == 200
+    assert response.streaming
+
+    # Every user story in its own chunk
+    queryset = project.user_stories.all().order_by("ref")
+    content = "".join(services.iter_userstories_csv(project, queryset, chunk_size=1))
+    assert b"".join(response.streaming_content).decode("utf-8") == content
+
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [row["ref"] for row in rows] == [str(us1.ref), str(us2.ref)]
+    assert [row["tasks"] for row in rows] == ["{},{}".format(task1.ref, task2.ref), ""]
+    assert [row["attachments"] for row in rows] == ["0", "1"]
+
+
 def test_custom_fields_csv_generation():
     project = f.ProjectFactory.create(userstories_csv_uuid=uuid.uuid4().hex)
     attr = f.UserStoryCustomAttributeFactory.create(project=project, name="attr1", description="desc")
@@ -989,3 +1179,44 @@ def test_get_user_stories_including_attachments(client):
     response = client.get(url)
     assert response.status_code == 200
     assert len(response.data[0].get("attachments")) == 1
+
+
+def test_attach_extra_info_with_lateral_subqueries():
+    from taiga.projects.userstories.utils import attach_extra_info
+
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    user_story_1 = f.UserStoryFactory.create(project=project)
+    user_story_2 = f.UserStoryFactory.create(project=project)
+    role = f.RoleFactory.create(project=project)
+    points = f.PointsFactory.create(project=project, value=3)
+    f.RolePointsFactory.create(user_story=user_story_1, role=role, points=points)
+    user_story_1.add_watcher(user)
+
+    queryset = attach_extra_info(models.UserStory.objects.filter(project=project), user=user)
+
+    # The lateral subqueries are not used to count
+    assert queryset.count() == 2
+    assert models.UserStory.objects.filter(id__in=queryset.values("id")).count() == 2
+
+    def _role_points(user_story):
+        return {str(rp.role_id): rp.points_id for rp in user_story.role_points.all()}
+
+    def _total_points(user_story):
+        values = [rp.points.value for rp in user_story.role_points.all() if rp.points]
+        return sum(values) if values else None
+
+    user_story_1 = queryset.get(id=user_story_1.id)
+    assert user_story_1.watchers == [user.id]
+    assert user_story_1.total_watchers == 1
+    assert user_story_1.is_watcher is True
+    assert user_story_1.role_points_attr[str(role.id)] == points.id
+    assert user_story_1.role_points_attr == _role_points(user_story_1)
+    assert user_story_1.total_points_attr == _total_points(user_story_1)
+
+    user_story_2 = queryset.get(id=user_story_2.id)
+    assert user_story_2.watchers == []
+    assert user_story_2.total_watchers == 0
+    assert user_story_2.is_watcher is False
+    assert user_story_2.role_points_attr == _role_points(user_story_2)
+    assert user_story_2.total_points_attr == _total_points(user_story_2)
@@ -62,6 +62,42 @@ def test_remove_vote():
     assert votes_qs.get().count == 0
 
 
+def test_add_and_remove_votes():
+    project = f.ProjectFactory()
+    project_type = ContentType.objects.get_for_model(project)
+    user1 = f.UserFactory()
+    user2 = f.UserFactory()
+    user3 = f.UserFactory()
+    votes_qs = models.Votes.objects.filter(content_type=project_type, object_id=project.id)
+    votes.add_vote(project, user1)
+
+    votes.add_votes(project, [user1, user2, user3])
+
+    assert votes_qs.get().count == 3
+    assert set(votes.get_voters(project)) == {user1, user2, user3}
+
+    votes.remove_votes(project, [user1, user2])
+    votes.remove_votes(project, [user1])  # remove_votes must be idempotent
+
+    assert votes_qs.get().count == 1
+    assert list(votes.get_voters(project)) == [user3]
+
+
+def test_cached_total_voters_are_kept_up_to_date():
+    us = f.UserStoryFactory()
+    user1 = f.UserFactory()
+    user2 = f.UserFactory()
+
+    votes.add_votes(us, [user1, user2])
+    assert us.cached_total_voters == 2
+
+    votes.remove_vote(us, user1)
+    assert us.cached_total_voters == 1
+
+    us.refresh_from_db()
+    assert us.cached_total_voters == 1
+
+
 def test_get_votes():
     project = f.ProjectFactory()
     project_type = ContentType.objects.get_for_model(project)
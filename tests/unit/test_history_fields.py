@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# Copyright (C) 2014-2016 Anler Hernández <hello@anler.me>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from taiga.projects.history.fields import compact_diff, expand_diff, is_compacted_value
+
+
+def test_compact_diff_long_texts():
+    old_text = "Lorem ipsum dolor sit amet. " * 50
+    new_text = old_text + "Consectetur adipiscing elit."
+    diff = {"description": [old_text, new_text], "status": [1, 2]}
+
+    compacted = compact_diff(diff)
+
+    assert is_compacted_value(compacted["description"])
+    assert compacted["description"]["to"] == new_text
+    assert len(compacted["description"]["patch"]) < len(old_text)
+    assert compacted["status"] == [1, 2]
+    assert expand_diff(compacted) == diff
+
+
+def test_compact_diff_ignores_short_and_non_text_values():
+    diff = {"subject": ["foo", "bar"],
+            "description": [None, "Lorem ipsum dolor sit amet. " * 50],
+            "points": [{"1": 2}, {"1": 3}]}
+
+    assert compact_diff(diff) == diff
+    assert expand_diff(diff) == diff
+
+
+def test_compact_diff_empty_values():
+    assert compact_diff(None) is None
+    assert compact_diff({}) == {}
+    assert expand_diff(None) is None
+
+
+def test_compact_diff_non_dict_values():
+    assert compact_diff([]) == []
+    assert compact_diff(["subject"]) == ["subject"]
+    assert expand_diff(["subject"]) == ["subject"]
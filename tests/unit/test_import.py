@@ -22,6 +22,9 @@ from .. import factories as f
 
 from taiga.base.utils import json
 from taiga.export_import.services import render_project, store_project_from_dict
+from taiga.projects.history.choices import HistoryType
+from taiga.projects.history.models import HistoryEntry
+from taiga.projects.history.services import make_key_from_model_object
 
 pytestmark = pytest.mark.django_db
 
@@ -55,3 +58,34 @@ def test_import_epic_with_user_stories(client):
     assert related_userstory.user_story.ref == user_story.ref
     assert related_userstory.order == 55
     assert related_userstory.epic.ref == epic.ref
+
+
+def test_import_history_entry_without_diff(client):
+    project = f.ProjectFactory()
+    project.default_points = f.PointsFactory.create(project=project)
+    project.default_issue_type = f.IssueTypeFactory.create(project=project)
+    project.default_issue_status = f.IssueStatusFactory.create(project=project)
+    project.default_epic_status = f.EpicStatusFactory.create(project=project)
+    project.default_us_status = f.UserStoryStatusFactory.create(project=project)
+    project.default_task_status = f.TaskStatusFactory.create(project=project)
+    project.default_priority = f.PriorityFactory.create(project=project)
+    project.default_severity = f.SeverityFactory.create(project=project)
+
+    user_story = f.UserStoryFactory.create(project=project, status=project.default_us_status, milestone=None)
+    f.HistoryEntryFactory.create(type=HistoryType.change,
+                                 project=project,
+                                 comment="testing comment",
+                                 key=make_key_from_model_object(user_story),
+                                 diff=None,
+                                 user={"pk": project.owner.pk})
+    output = io.BytesIO()
+    render_project(user_story.project, output)
+    project_data = json.loads(output.getvalue())
+
+    user_story.project.delete()
+
+    project = store_project_from_dict(project_data)
+    user_story = project.user_stories.get(ref=user_story.ref)
+    history_entry = HistoryEntry.objects.get(key=make_key_from_model_object(user_story), comment="testing comment")
+    assert history_entry.diff == []
+    assert history_entry.changed_fields == []
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import serpy
+
+from taiga.base.api import serializers
+from taiga.base.fields import Field, MethodField
+
+
+class Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class NestedSerializer(serializers.LightSerializer):
+    id = Field()
+
+
+class AuxSerializer(serializers.LightSerializer):
+    id = Field()
+    project = Field(attr="project.id")
+    name = serpy.StrField(required=False)
+    slug = Field(attr="get_slug", call=True)
+    double_id = MethodField()
+    nested = NestedSerializer(required=False)
+
+    def get_double_id(self, obj):
+        return obj.id * 2
+
+
+def test_compiled_serializer_returns_the_same_data_than_serpy():
+    objs = [
+        Obj(id=1, project=Obj(id=10), name=1, get_slug=lambda: "slug-1", nested=Obj(id=100)),
+        Obj(id=2, project=Obj(id=20), name=None, get_slug=lambda: "slug-2", nested=None),
+    ]
+
+    data = AuxSerializer(objs, many=True).data
+
+    assert data == [serpy.Serializer._serialize(AuxSerializer(), obj, AuxSerializer._compiled_fields)
+                    for obj in objs]
+    assert data[0] == {"id": 1, "project": 10, "name": "1", "slug": "slug-1", "double_id": 2,
+                       "nested": {"id": 100}}
+    assert data[1]["name"] is None
+    assert data[1]["nested"] is None
+
+
+def test_compiled_serializer_omits_the_missing_not_required_fields():
+    objs = [
+        Obj(id=1, project=Obj(id=10), get_slug=lambda: "slug-1"),
+        {"id": 2, "name": 3},
+    ]
+
+    class AuxDictSerializer(serializers.LightDictSerializer):
+        id = Field()
+        name = serpy.StrField(required=False)
+        nested = NestedSerializer(required=False)
+
+    data = AuxSerializer(objs[0]).data
+    assert data == serpy.Serializer._serialize(AuxSerializer(), objs[0], AuxSerializer._compiled_fields)
+    assert "name" not in data
+    assert "nested" not in data
+
+    assert AuxDictSerializer(objs[1]).data == {"id": 2, "name": "3"}
+
+
+def test_compiled_serializer_is_cached():
+    assert serializers.compile_serializer(AuxSerializer) is serializers.compile_serializer(AuxSerializer)
+
+
+def test_compiled_dict_serializer():
+    class AuxDictSerializer(serializers.LightDictSerializer):
+        id = Field()
+        name = serpy.StrField()
+
+    assert AuxDictSerializer({"id": 1, "name": 2}).data == {"id": 1, "name": "2"}
@@ -44,11 +44,12 @@ def test_mentions_valid_username():
     with patch("taiga.mdrender.extensions.mentions.get_user_model") as get_user_model_mock:
         dummy_uuser = MagicMock()
         dummy_uuser.get_full_name.return_value = "Hermione Granger"
-        get_user_model_mock.return_value.objects.get = MagicMock(return_value=dummy_uuser)
+        dummy_uuser.username = "hermione"
+        get_user_model_mock.return_value.objects.filter = MagicMock(return_value=[dummy_uuser])
 
         result = render(dummy_project, "text @hermione text")
 
-        get_user_model_mock.return_value.objects.get.assert_called_with(username="hermione")
+        get_user_model_mock.return_value.objects.filter.assert_called_once_with(username__in={"hermione"})
         assert result == ('<p>text <a class="mention" href="http://localhost:9001/profile/hermione" '
                           'title="Hermione Granger">@hermione</a> text</p>')
 
@@ -57,11 +58,12 @@ def test_mentions_valid_username_with_points():
     with patch("taiga.mdrender.extensions.mentions.get_user_model") as get_user_model_mock:
         dummy_uuser = MagicMock()
         dummy_uuser.get_full_name.return_value = "Luna Lovegood"
-        get_user_model_mock.return_value.objects.get = MagicMock(return_value=dummy_uuser)
+        dummy_uuser.username = "luna.lovegood"
+        get_user_model_mock.return_value.objects.filter = MagicMock(return_value=[dummy_uuser])
 
         result = render(dummy_project, "text @luna.lovegood text")
 
-        get_user_model_mock.return_value.objects.get.assert_called_with(username="luna.lovegood")
+        get_user_model_mock.return_value.objects.filter.assert_called_once_with(username__in={"luna.lovegood"})
         assert result == ('<p>text <a class="mention" href="http://localhost:9001/profile/luna.lovegood" '
                           'title="Luna Lovegood">@luna.lovegood</a> text</p>')
 
@@ -70,57 +72,62 @@ def test_mentions_valid_username_with_dash():
     with patch("taiga.mdrender.extensions.mentions.get_user_model") as get_user_model_mock:
         dummy_uuser = MagicMock()
         dummy_uuser.get_full_name.return_value = "Ginny Weasley"
-        get_user_model_mock.return_value.objects.get = MagicMock(return_value=dummy_uuser)
+        dummy_uuser.username = "super-ginny"
+        get_user_model_mock.return_value.objects.filter = MagicMock(return_value=[dummy_uuser])
 
         result = render(dummy_project, "text @super-ginny text")
 
-        get_user_model_mock.return_value.objects.get.assert_called_with(username="super-ginny")
+        get_user_model_mock.return_value.objects.filter.assert_called_once_with(username__in={"super-ginny"})
         assert result == ('<p>text <a class="mention" href="http://localhost:9001/profile/super-ginny" '
                           'title="Ginny Weasley">@super-ginny</a> text</p>')
 
 
 def test_proccessor_valid_us_reference():
-    with patch("taiga.mdrender.extensions.references.get_instance_by_ref") as mock:
-        instance = mock.return_value
+    with patch("taiga.mdrender.extensions.references.get_instances_by_refs") as mock:
+        instance = MagicMock()
         instance.content_type.model = "userstory"
         instance.content_object.subject = "test"
+        mock.return_value = {1: instance}
         result = render(dummy_project, "**#1**")
         expected_result = '<p><strong><a class="reference user-story" href="http://localhost:9001/project/test/us/1" title="#1 test">#1</a></strong></p>'
         assert result == expected_result
 
 
 def test_proccessor_valid_issue_reference():
-    with patch("taiga.mdrender.extensions.references.get_instance_by_ref") as mock:
-        instance = mock.return_value
+    with patch("taiga.mdrender.extensions.references.get_instances_by_refs") as mock:
+        instance = MagicMock()
         instance.content_type.model = "issue"
         instance.content_object.subject = "test"
+        mock.return_value = {2: instance}
         result = render(dummy_project, "**#2**")
         expected_result = '<p><strong><a class="reference issue" href="http://localhost:9001/project/test/issue/2" title="#2 test">#2</a></strong></p>'
         assert result == expected_result
 
 
 def test_proccessor_valid_task_reference():
-    with patch("taiga.mdrender.extensions.references.get_instance_by_ref") as mock:
-        instance = mock.return_value
+    with patch("taiga.mdrender.extensions.references.get_instances_by_refs") as mock:
+        instance = MagicMock()
         instance.content_type.model = "task"
         instance.content_object.subject = "test"
+        mock.return_value = {3: instance}
         result = render(dummy_project, "**#3**")
         expected_result = '<p><strong><a class="reference task" href="http://localhost:9001/project/test/task/3" title="#3 test">#3</a></strong></p>'
         assert result == expected_result
 
 
 def test_proccessor_invalid_type_reference():
-    with patch("taiga.mdrender.extensions.references.get_instance_by_ref") as mock:
-        instance = mock.return_value
+    with patch("taiga.mdrender.extensions.references.get_instances_by_refs") as mock:
+        instance = MagicMock()
         instance.content_type.model = "other"
         instance.content_object.subject = "test"
+        mock.return_value = {4: instance}
         result = render(dummy_project, "**#4**")
         assert result == "<p><strong>#4</strong></p>"
 
 
 def test_proccessor_invalid_reference():
-    with patch("taiga.mdrender.extensions.references.get_instance_by_ref") as mock:
-        mock.return_value = None
+    with patch("taiga.mdrender.extensions.references.get_instances_by_refs") as mock:
+        mock.return_value = {}
         result = render(dummy_project, "**#5**")
         assert result == "<p><strong>#5</strong></p>"
 
@@ -246,9 +253,21 @@ def test_get_diff_of_htmls_modifications():
 
 
 def test_render_and_extract_references():
-    with patch("taiga.mdrender.extensions.references.get_instance_by_ref") as mock:
-        instance = mock.return_value
+    with patch("taiga.mdrender.extensions.references.get_instances_by_refs") as mock:
+        instance = MagicMock()
         instance.content_type.model = "issue"
         instance.content_object.subject = "test"
+        mock.return_value = {1: instance}
         (_, extracted) = render_and_extract(dummy_project, "**#1**")
         assert extracted['references'] == [instance.content_object]
+
+
+def test_render_resolves_repeated_references_once():
+    with patch("taiga.mdrender.extensions.references.get_instances_by_refs") as mock:
+        instance = MagicMock()
+        instance.content_type.model = "issue"
+        instance.content_object.subject = "test"
+        mock.return_value = {6: instance}
+        (_, extracted) = render_and_extract(dummy_project, "#6 #7 **#6**")
+        mock.assert_called_once_with(dummy_project.id, {"6", "7"})
+        assert extracted['references'] == [instance.content_object, instance.content_object]
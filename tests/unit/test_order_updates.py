@@ -16,9 +16,32 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import random
+
 from taiga.projects.services import apply_order_updates
 
 
+def _naive_apply_order_updates(base_orders: dict, new_orders: dict):
+    # One pass over all the elements per moved element
+    updated_order_ids = set()
+    new_orders = {id: order for id, order in new_orders.items() if id in base_orders}
+
+    for id, new_order in sorted(new_orders.items(), key=lambda e: e[1]):
+        old_order = base_orders[id]
+        for other_id, order in base_orders.items():
+            if (new_order < old_order and new_order <= order < old_order) or \
+               (new_order >= old_order and order >= new_order):
+                base_orders[other_id] += 1
+                updated_order_ids.add(other_id)
+
+    for id, order in new_orders.items():
+        if base_orders[id] != order:
+            base_orders[id] = order
+            updated_order_ids.add(id)
+
+    return {id: order for id, order in base_orders.items() if id in updated_order_ids}
+
+
 def test_apply_order_updates_one_element_backward():
     orders = {
         "a": 1,
@@ -186,3 +209,14 @@ def test_apply_order_invalid_new_order():
         "e": 5,
         "f": 6
     }
+
+
+def test_apply_order_updates_matches_naive_algorithm():
+    rnd = random.Random(42)
+    for _ in range(500):
+        orders = {id: rnd.randint(0, 10) for id in range(rnd.randint(0, 15))}
+        new_orders = {rnd.randint(0, 17): rnd.randint(0, 12) for _ in range(rnd.randint(0, 5))}
+
+        expected = _naive_apply_order_updates(dict(orders), new_orders)
+        apply_order_updates(orders, dict(new_orders))
+        assert orders == expected
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import decimal
+import json
+
+from collections import OrderedDict
+
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy
+
+from taiga.base.api.renderers import JSONRenderer, JSONPRenderer, StdlibJSONBackend
+
+
+DATA = [OrderedDict([
+    ("id", i),
+    ("subject", ugettext_lazy("Subject")),
+    ("created_date", datetime.datetime(2016, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)),
+    ("finish_date", datetime.date(2016, 1, 2)),
+    ("total_points", decimal.Decimal("1.5")),
+]) for i in range(250)]
+
+
+def test_json_renderer_uses_compact_separators():
+    content = JSONRenderer().render(DATA[:1])
+
+    assert content == (b'[{"id":0,"subject":"Subject","created_date":"2016-01-02T03:04:05.123Z",'
+                       b'"finish_date":"2016-01-02","total_points":"1.5"}]')
+
+
+def test_json_renderer_renders_the_same_data_in_chunks():
+    renderer = JSONRenderer()
+    content = b"".join(renderer.render_iter(DATA))
+
+    assert content == renderer.render(DATA)
+    assert len(json.loads(content.decode("utf-8"))) == 250
+    assert b"".join(renderer.render_iter([])) == b"[]"
+
+
+def test_jsonp_renderer_renders_in_chunks():
+    content = b"".join(JSONPRenderer().render_iter([1, 2], renderer_context={}))
+
+    assert content == b"callback([1,2]);"
+
+
+def test_stdlib_json_backend_with_indent():
+    assert StdlibJSONBackend().dumps({"a": [1]}, indent=2) == '{\n  "a": [\n    1\n  ]\n}'
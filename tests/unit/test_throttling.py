@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2014-2016 Andrey Antukh <niwi@niwi.nz>
+# Copyright (C) 2014-2016 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014-2016 David Barragán <bameda@dbarragan.com>
+# Copyright (C) 2014-2016 Alejandro Alonso <alejandro.alonso@kaleidos.net>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from taiga.base.api import throttling
+
+
+class FakeTimer:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_throttle(rate, now):
+    class TestingRateThrottle(throttling.SimpleRateThrottle):
+        cache = LocMemCache("throttling-tests", {})
+        timer = FakeTimer(now)
+
+        def get_cache_key(self, request, view):
+            return "throttle_testing"
+
+    TestingRateThrottle.rate = rate
+    TestingRateThrottle.cache.clear()
+    return TestingRateThrottle
+
+
+def test_throttling_counts_the_requests_of_the_period():
+    throttle_class = make_throttle("3/min", now=600)
+
+    assert throttle_class().allow_request(None, None)
+    assert throttle_class().allow_request(None, None)
+    assert throttle_class().allow_request(None, None)
+
+    throttle = throttle_class()
+    assert not throttle.allow_request(None, None)
+    assert round(throttle.wait()) == 80
+
+    # The rejected requests are not counted
+    assert throttle_class.cache.get("throttle_testing_10") == 3
+
+
+def test_throttling_weights_the_requests_of_the_previous_period():
+    throttle_class = make_throttle("3/min", now=600)
+
+    assert throttle_class().allow_request(None, None)
+    assert throttle_class().allow_request(None, None)
+    assert throttle_class().allow_request(None, None)
+
+    # At the middle of the next period the previous one counts half
+    throttle_class.timer.now = 690
+    assert throttle_class().allow_request(None, None)
+
+    throttle = throttle_class()
+    assert not throttle.allow_request(None, None)
+    assert round(throttle.wait()) == 10
+
+    # The first period has left the window
+    throttle_class.timer.now = 721
+    assert throttle_class().allow_request(None, None)
+    assert throttle_class().allow_request(None, None)
+    assert not throttle_class().allow_request(None, None)
@@ -23,6 +23,7 @@ from .. import factories as f
 
 from taiga.base import exceptions as exc
 from taiga.auth.tokens import get_token_for_user, get_user_for_token
+from taiga.users.models import User
 
 
 pytestmark = pytest.mark.django_db
@@ -53,3 +54,22 @@ def test_invalid_token_scope():
     user = f.UserFactory.create(email="old@email.com")
     token = get_token_for_user(user, "testing_scope")
     get_user_for_token(token, "testing_invalid_scope")
+
+
+def test_valid_token_with_cached_user(settings):
+    settings.USER_CACHE_TIMEOUT = 60
+    user = f.UserFactory.create(full_name="Old name")
+    token = get_token_for_user(user, "testing_scope")
+    assert get_user_for_token(token, "testing_scope", use_cache=True).full_name == "Old name"
+
+    # Changes without signals are not seen until the cache expires
+    User.objects.filter(id=user.id).update(full_name="New name")
+    assert get_user_for_token(token, "testing_scope", use_cache=True).full_name == "Old name"
+
+    user.full_name = "Newer name"
+    user.save()
+    assert get_user_for_token(token, "testing_scope", use_cache=True).full_name == "Newer name"
+
+    user.delete()
+    with pytest.raises(exc.NotAuthenticated):
+        get_user_for_token(token, "testing_scope", use_cache=True)
@@ -24,6 +24,7 @@ import re
 
 from taiga.base.utils.urls import get_absolute_url, is_absolute_url, build_url
 from taiga.base.utils.db import save_in_bulk, update_in_bulk, to_tsquery
+from taiga.base.utils.iterators import iter_csv
 
 pytestmark = pytest.mark.django_db
 
@@ -107,3 +108,11 @@ def test_to_tsquery():
         expected = re.sub("([0-9])", r"'\1':*", expected)
         actual = to_tsquery(input)
         assert actual == expected
+
+
+def test_iter_csv():
+    rows = iter([{"a": 1, "b": "x,y"}, {"a": None, "b": "z"}])
+    lines = iter_csv(["a", "b"], rows)
+
+    assert next(lines) == "a,b\r\n"
+    assert list(lines) == ['1,"x,y"\r\n', ",z\r\n"]